@@ -5,6 +5,20 @@ __email__ = "matt.larsen@connorgp.com"
 __version__ = "0.3.0"
 
 from .api import Credential, RequestService
+from .aio import AsyncRequestService
+from .cache import ResponseCache
+from .checkpoint import Checkpoint, FileCheckpointStore, ResumableCrawl
+from .deadline import Deadline
+from .errors import DeadlineExceeded, InFlightTimeout, UnresolvedLookup
+from .metrics import RequestMetrics
+from .lookup import LookupService, LookupTable
+from .mirror import InventoryMirror
+from .ratelimit import RateLimiter
+from .reconcile import Reconciler
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .type_fields import TypeFieldModels
+from .writequeue import UpdateQueue
 from .v2 import (
     ServiceItemsEndPoint,
     TicketFormFieldsEndPoint,
@@ -12,4 +26,8 @@ from .v2 import (
     AssetsEndPoint,
     AssetTypeEndPoint,
     LocationsEndPoint,
+    DepartmentsEndPoint,
+    RequestersEndPoint,
+    AgentsEndPoint,
+    GroupsEndPoint,
 )
@@ -0,0 +1,297 @@
+import logging
+import time
+from typing import Callable, List, Optional, Tuple
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ReadTimeout, Timeout
+
+from .cache import CacheEntry, ResponseCache
+from .deadline import Deadline, TimeoutValue
+from .errors import DeadlineExceeded, InFlightTimeout
+from .metrics import RequestMetrics
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class FreshServiceAdapter(HTTPAdapter):
+    """Transport adapter mounted on the RequestService session applying the policies shared by every endpoint."""
+
+    def __init__(
+            self,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            socket_options: Optional[List[Tuple[int, int, int]]] = None,
+            timeout: TimeoutValue = None,
+            cache: Optional[ResponseCache] = None,
+            metrics: Optional[RequestMetrics] = None,
+            before_request: Optional[List[Callable]] = None,
+            after_request: Optional[List[Callable]] = None,
+            single_flight: Optional[SingleFlight] = None,
+            **kwargs
+    ):
+        """Constructor for a FreshServiceAdapter object
+
+        :param rate_limiter: RateLimiter pacing the requests sent through this adapter.
+        :param retry_policy: RetryPolicy for the requests failing with a transient error.
+        :param socket_options: TCP options set on each new socket as (level, option, value) tuples.
+        :param timeout: Timeout for the requests sent without one.
+        :param cache: ResponseCache for the GET requests sent through this adapter.
+        :param metrics: RequestMetrics recording the requests sent through this adapter.
+        :param before_request: Hooks called with each request before it's sent.
+        :param after_request: Hooks called with each request, its response or None, the seconds waited for it and the
+            exception raised or None.
+        :param single_flight: SingleFlight sending identical GET requests in flight at the same time only once.
+        :param kwargs: Keyword arguments for `requests.adapters.HTTPAdapter`.
+        """
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.socket_options = socket_options
+        self.timeout = timeout
+        self.cache = cache
+        self.metrics = metrics
+        self.before_request = before_request if before_request is not None else []
+        self.after_request = after_request if after_request is not None else []
+        self.single_flight = single_flight
+        super(FreshServiceAdapter, self).__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.socket_options is not None:
+            pool_kwargs["socket_options"] = self.socket_options
+        super(FreshServiceAdapter, self).init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        for hook in self.before_request:
+            hook(request)
+        started = time.monotonic()
+        resp = None
+        error = None
+        try:
+            resp = self._send_coalesced(request, **kwargs)
+            return resp
+        except Exception as err:
+            error = err
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            if self.metrics is not None:
+                self._observe(request, resp, elapsed, kwargs.get("stream"))
+            for hook in self.after_request:
+                hook(request, resp, elapsed, error)
+
+    def _observe(self, request, resp: Optional[Response], elapsed: float, stream: bool):
+        """Record the request that went over the wire, not the cache hits and the copies of a coalesced response."""
+        if resp is not None and (
+                getattr(resp, "coalesced", False) is True
+                or (getattr(resp, "from_cache", False) is True and getattr(resp, "revalidated", False) is not True)
+        ):
+            return
+        body = request.body
+        bytes_sent = len(body.encode("utf-8") if isinstance(body, str) else body) if body else 0
+        if resp is None:
+            self.metrics.observe_request(request.method, request.url, "error", elapsed, bytes_sent)
+            return
+        if getattr(resp, "revalidated", False) is True:
+            # The server answered with a 304 without a body, the cached body isn't received again.
+            self.metrics.observe_request(request.method, request.url, 304, elapsed, bytes_sent)
+            return
+        if stream:
+            bytes_received = int(resp.headers.get("Content-Length") or 0)
+        else:
+            bytes_received = len(resp.content or b"")
+        self.metrics.observe_request(
+            request.method, request.url, resp.status_code, elapsed, bytes_sent, bytes_received
+        )
+
+    def _send_coalesced(self, request, **kwargs):
+        """Send a GET request, or wait for the response of the identical request already in flight and copy it."""
+        if self.single_flight is None or request.method != "GET" or kwargs.get("stream"):
+            return self._send_with_cache(request, **kwargs)
+
+        def send_once():
+            resp = self._send_with_cache(request, **kwargs)
+            # Read the body while the other callers wait for it.
+            resp.content
+            return resp
+
+        key = (request.url, request.headers.get("Authorization"))
+        deadline = getattr(request, "deadline", None)
+        if not isinstance(deadline, Deadline):
+            deadline = None
+        wait_limit, limited_by_deadline = _wait_limit(kwargs.get("timeout"), deadline)
+        try:
+            resp, shared = self.single_flight.do(key, send_once, timeout=wait_limit)
+        except InFlightTimeout as err:
+            if limited_by_deadline:
+                raise DeadlineExceeded(
+                    f"Waiting for the identical request in flight to '{request.url}' would pass the deadline of "
+                    f"{deadline.seconds} seconds"
+                ) from err
+            raise ReadTimeout(
+                f"The identical request in flight to '{request.url}' didn't return within {wait_limit} seconds",
+                request=request,
+            ) from err
+        if not shared:
+            return resp
+        logger.debug("Sharing the response of the request in flight for '%s'", request.url)
+        if self.metrics is not None:
+            self.metrics.observe_coalesced()
+        return _copy_response(request, resp)
+
+    def _send_with_cache(self, request, **kwargs):
+        if self.cache is None:
+            return self._send_with_policies(request, **kwargs)
+        if request.method != "GET":
+            resp = self._send_with_policies(request, **kwargs)
+            if resp.status_code < 400:
+                self.cache.invalidate(request.url)
+            return resp
+        entry, fresh = self.cache.lookup(request.url)
+        if fresh:
+            logger.debug("Using cached response for '%s'", request.url)
+            self._observe_cache("hit")
+            return self._cached_response(request, entry)
+        if entry is not None:
+            deadline = getattr(request, "deadline", None)
+            request = request.copy()
+            request.deadline = deadline
+            request.headers.update(entry.validators())
+        resp = self._send_with_policies(request, **kwargs)
+        if resp.status_code == 304 and entry is not None:
+            self.cache.revalidated(request.url, entry)
+            self._observe_cache("revalidated")
+            resp.close()
+            cached = self._cached_response(request, entry)
+            cached.revalidated = True
+            return cached
+        self._observe_cache("miss")
+        if resp.status_code == 200 and not kwargs.get("stream"):
+            self.cache.store(request.url, resp.status_code, resp.headers, resp.content, resp.encoding)
+        return resp
+
+    def _observe_cache(self, outcome: str):
+        if self.metrics is not None:
+            self.metrics.observe_cache(outcome)
+
+    def _cached_response(self, request, entry: CacheEntry) -> Response:
+        resp = Response()
+        resp.status_code = entry.status_code
+        resp.headers = entry.headers.copy()
+        resp._content = entry.content
+        resp._content_consumed = True
+        resp.encoding = entry.encoding
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK"
+        resp.connection = self
+        resp.from_cache = True
+        return resp
+
+    def _send_with_policies(self, request, **kwargs):
+        """Send the request, pacing it with the rate limiter and sending it again following the retry policy.
+
+        With a `deadline` attribute on the request, set by the endpoints, each attempt's timeout is shortened to the
+        time left, and DeadlineExceeded is raised instead of waiting or sending the request again past the deadline.
+        """
+        deadline = getattr(request, "deadline", None)
+        if not isinstance(deadline, Deadline):
+            deadline = None
+        timeout = kwargs.get("timeout")
+        attempt = 1
+        requeues = 0
+        while True:
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.acquire(deadline)
+                if self.metrics is not None:
+                    self.metrics.observe_rate_limit_wait(wait)
+            if deadline is not None:
+                kwargs["timeout"] = deadline.timeout_for(timeout)
+            try:
+                resp = super(FreshServiceAdapter, self).send(request, **kwargs)
+            except (ConnectionError, Timeout) as err:
+                delay = self._retry_delay(request, attempt)
+                if delay is None:
+                    raise
+                if deadline is not None:
+                    deadline.check_wait(delay, f"Retrying '{request.method}' request to '{request.url}' in")
+                self._notify_retry(request, attempt, delay, err)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            if resp.status_code == 429 and self.metrics is not None:
+                self.metrics.observe_throttle()
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(resp.status_code, resp.headers)
+                if resp.status_code == 429 and requeues < self.rate_limiter.max_requeues:
+                    requeues += 1
+                    logger.info("Queueing '%s' request to '%s' again after a 429 response", request.method, request.url)
+                    resp.close()
+                    continue
+            delay = self._retry_delay(request, attempt, resp)
+            if delay is None:
+                return resp
+            if deadline is not None:
+                try:
+                    deadline.check_wait(delay, f"Retrying '{request.method}' request to '{request.url}' in")
+                except DeadlineExceeded:
+                    resp.close()
+                    raise
+            self._notify_retry(request, attempt, delay, resp.status_code)
+            resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _notify_retry(self, request, attempt: int, delay: float, reason):
+        if self.metrics is not None:
+            self.metrics.observe_retry(request.method, reason)
+        self.retry_policy.notify(request.method, request.url, attempt, delay, reason)
+
+    def _retry_delay(self, request, attempt: int, resp=None) -> Optional[float]:
+        if self.retry_policy is None:
+            return None
+        if resp is None:
+            return self.retry_policy.retry_delay(request.method, attempt)
+        if resp.status_code == 429 and self.rate_limiter is not None:
+            # The rate limiter already queued the request again up to its `max_requeues`.
+            return None
+        return self.retry_policy.retry_delay(request.method, attempt, resp.status_code, resp.headers)
+
+
+def _wait_limit(timeout, deadline: Optional[Deadline]) -> Tuple[Optional[float], bool]:
+    """Seconds a request can wait for the identical request in flight, and True when its deadline is the limit.
+
+    A request waits no longer than it would have for its own response, its connect and read timeouts, nor past its
+    deadline.
+    """
+    if isinstance(timeout, tuple):
+        timeout = None if None in timeout else sum(timeout)
+    elif not isinstance(timeout, (int, float)):
+        timeout = None
+    if deadline is not None:
+        remaining = max(0.0, deadline.remaining())
+        if timeout is None or remaining < timeout:
+            return remaining, True
+    return timeout, False
+
+
+def _copy_response(request, resp: Response) -> Response:
+    """Response with the status, headers and body of a response that has been read, for another request."""
+    copy = Response()
+    copy.status_code = resp.status_code
+    copy.headers = resp.headers.copy()
+    copy._content = resp.content
+    copy._content_consumed = True
+    copy.encoding = resp.encoding
+    copy.url = resp.url
+    copy.request = request
+    copy.reason = resp.reason
+    copy.connection = getattr(resp, "connection", None)
+    copy.from_cache = getattr(resp, "from_cache", False)
+    copy.revalidated = getattr(resp, "revalidated", False)
+    copy.coalesced = True
+    return copy
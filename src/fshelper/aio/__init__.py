@@ -0,0 +1,11 @@
+"""Async versions of the RequestService and endpoints built on the optional `httpx` package."""
+from .api import AsyncRequestService
+from .endpoints import AsyncEndPointMixin, AsyncPluralEndPointMixin
+from .v2 import (
+    AsyncAssetsEndPoint,
+    AsyncAssetTypeEndPoint,
+    AsyncLocationsEndPoint,
+    AsyncServiceItemsEndPoint,
+    AsyncTicketFormFieldsEndPoint,
+    AsyncTicketsEndPoint,
+)
@@ -0,0 +1,309 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Tuple
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx is an optional dependency
+    httpx = None
+
+from ..api import Credential, RequestService
+from ..codec import JSONCodec, default_codec
+from ..deadline import Deadline, TimeoutValue
+from ..errors import DeadlineExceeded, InFlightTimeout
+from ..metrics import RequestMetrics
+from ..ratelimit import RateLimiter
+from ..retry import RetryPolicy
+from ..singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRequestService:
+    """Async sibling of RequestService using a pooled `httpx.AsyncClient` for the FreshService API.
+
+    Use this class with an async context manager or new_client() with a try, except, finally block with
+    'await AsyncRequestService.client.aclose()' in the finally block.  Requires the optional `httpx` package,
+    installed with `pip install fshelper[async]`.
+    """
+
+    def __init__(
+            self,
+            credential: Credential,
+            domain: str,
+            max_connections: Optional[int] = 100,
+            max_keepalive_connections: Optional[int] = 20,
+            transport=None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            timeout: TimeoutValue = RequestService.DEFAULT_TIMEOUT,
+            codec: Optional[JSONCodec] = None,
+            metrics: Optional[RequestMetrics] = None,
+            coalesce_requests: Optional[bool] = False,
+    ):
+        """Constructor for an AsyncRequestService object
+
+        :param credential: Credential object
+        :param domain: FreshService domain (the part before '.freshservice.com')
+        :param max_connections: Maximum number of concurrent connections the client opens.
+        :param max_keepalive_connections: Maximum number of idle connections kept open for reuse.
+        :param transport: Optional httpx transport to send the requests with instead of the default pooled transport.
+        :param rate_limiter: RateLimiter shared by every endpoint using this AsyncRequestService.  A RateLimiter
+            learning the rate limit of the account from the response headers is used when not given.
+        :param retry_policy: RetryPolicy for requests failing with a transient error.  The default RetryPolicy sends
+            idempotent requests up to 3 times.
+        :param timeout: Default timeout in seconds for each request, or a (connect timeout, read timeout) tuple.
+        :param codec: JSONCodec for the request and response bodies.  OrjsonCodec is used when `orjson` is installed,
+            JSONCodec otherwise.
+        :param metrics: RequestMetrics recording the requests of every endpoint using this AsyncRequestService.  A new
+            RequestMetrics is used when not given.
+        :param coalesce_requests: Send identical GET requests in flight at the same time from several tasks only once
+            and give each caller a copy of the response  A caller waits for the request in flight no longer than its own timeout
+            and deadline.
+        """
+        self.credential = credential
+        self.domain = domain
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.transport = transport
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.timeout = timeout
+        self.codec = codec if codec is not None else default_codec()
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self.single_flight = AsyncSingleFlight() if coalesce_requests else None
+        self.client = None
+
+    async def __aenter__(self):
+        self.new_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if any((exc_type, exc_val)):
+            logger.exception(
+                "Error encountered with httpx client. %s - %s",
+                exc_type,
+                exc_val,
+            )
+        logger.info("Closing httpx client")
+        await self.client.aclose()
+
+    def new_client(self):
+        if httpx is None:
+            raise ImportError(
+                "AsyncRequestService requires the 'httpx' package. Install it with 'pip install fshelper[async]'."
+            )
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+        )
+        transport = self.transport if self.transport is not None else httpx.AsyncHTTPTransport(limits=limits)
+        self.client = httpx.AsyncClient(
+            auth=(self.credential.username, self.credential.password),
+            timeout=httpx_timeout(self.timeout),
+            transport=FreshServiceTransport(
+                transport, rate_limiter=self.rate_limiter, retry_policy=self.retry_policy, metrics=self.metrics,
+                single_flight=self.single_flight,
+            ),
+        )
+
+
+def httpx_timeout(timeout: TimeoutValue) -> "httpx.Timeout":
+    """httpx.Timeout from a timeout in seconds or a (connect timeout, read timeout) tuple as used by `requests`."""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def _shortened_timeout(timeout: Optional[dict], deadline: Deadline) -> dict:
+    """httpx timeout extension with every timeout shortened to the time left before the deadline."""
+    timeout = timeout or {}
+    return {
+        name: deadline.timeout_for(timeout.get(name))
+        for name in ("connect", "read", "write", "pool")
+    }
+
+
+def _wait_limit(timeout: Optional[dict], deadline: Optional[Deadline]) -> Tuple[Optional[float], bool]:
+    """Seconds a request can wait for the identical request in flight, and True when its deadline is the limit.
+
+    A request waits no longer than it would have for its own response, its connect and read timeouts, nor past its
+    deadline.
+    """
+    timeout = timeout or {}
+    connect, read = timeout.get("connect"), timeout.get("read")
+    limit = None if connect is None or read is None else connect + read
+    if deadline is not None:
+        remaining = max(0.0, deadline.remaining())
+        if limit is None or remaining < limit:
+            return remaining, True
+    return limit, False
+
+
+class FreshServiceTransport(httpx.AsyncBaseTransport if httpx is not None else object):
+    """httpx transport wrapping the one sending the requests, applying the policies shared by every async endpoint."""
+
+    def __init__(
+            self,
+            transport,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            metrics: Optional[RequestMetrics] = None,
+            single_flight: Optional[AsyncSingleFlight] = None,
+    ):
+        """Constructor for a FreshServiceTransport object
+
+        The timeout of each request is set by the httpx client, and the bodies are encoded by the endpoints.
+
+        :param transport: httpx transport sending the requests.
+        :param rate_limiter: RateLimiter pacing the requests sent through this transport.
+        :param retry_policy: RetryPolicy for the requests failing with a transient error.
+        :param metrics: RequestMetrics recording the requests sent through this transport.
+        :param single_flight: AsyncSingleFlight sending identical GET requests in flight at the same time only once.
+        """
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.metrics = metrics
+        self.single_flight = single_flight
+
+    async def handle_async_request(self, request):
+        if self.metrics is None:
+            return await self._handle_coalesced(request)
+        started = time.monotonic()
+        bytes_sent = int(request.headers.get("Content-Length") or 0)
+        try:
+            resp = await self._handle_coalesced(request)
+        except Exception:
+            self.metrics.observe_request(
+                request.method, str(request.url), "error", time.monotonic() - started, bytes_sent
+            )
+            raise
+        if resp.extensions.get("coalesced"):
+            # A copy of the response of an identical request, recorded when that one was received.
+            return resp
+        self.metrics.observe_request(
+            request.method,
+            str(request.url),
+            resp.status_code,
+            time.monotonic() - started,
+            bytes_sent,
+            int(resp.headers.get("Content-Length") or 0),
+        )
+        return resp
+
+    async def _handle_coalesced(self, request):
+        """Send a GET request, or wait for the response of the identical request already in flight and copy it."""
+        if self.single_flight is None or request.method != "GET":
+            return await self._handle_with_policies(request)
+
+        async def send_once():
+            resp = await self._handle_with_policies(request)
+            # Read the body while the other callers wait for it.
+            await resp.aread()
+            return resp
+
+        key = (str(request.url), request.headers.get("Authorization"))
+        deadline = request.extensions.get("deadline")
+        if not isinstance(deadline, Deadline):
+            deadline = None
+        wait_limit, limited_by_deadline = _wait_limit(request.extensions.get("timeout"), deadline)
+        try:
+            resp, shared = await self.single_flight.do(key, send_once, timeout=wait_limit)
+        except InFlightTimeout as err:
+            if limited_by_deadline:
+                raise DeadlineExceeded(
+                    f"Waiting for the identical request in flight to '{request.url}' would pass the deadline of "
+                    f"{deadline.seconds} seconds"
+                ) from err
+            raise httpx.ReadTimeout(
+                f"The identical request in flight to '{request.url}' didn't return within {wait_limit} seconds",
+                request=request,
+            ) from err
+        if not shared:
+            return resp
+        logger.debug("Sharing the response of the request in flight for '%s'", request.url)
+        if self.metrics is not None:
+            self.metrics.observe_coalesced()
+        # The body has been decoded already, so the copy must not be decoded again.
+        headers = resp.headers.copy()
+        headers.pop("Content-Encoding", None)
+        headers["Content-Length"] = str(len(resp.content))
+        return httpx.Response(
+            resp.status_code, headers=headers, content=resp.content, request=request, extensions={"coalesced": True}
+        )
+
+    async def _handle_with_policies(self, request):
+        """Send the request, pacing it with the rate limiter and sending it again following the retry policy.
+
+        With a Deadline in the 'deadline' extension of the request, set by the async endpoints, each attempt's timeout
+        is shortened to the time left, and DeadlineExceeded is raised instead of waiting or sending the request again
+        past the deadline.
+        """
+        deadline = request.extensions.get("deadline")
+        if not isinstance(deadline, Deadline):
+            deadline = None
+        timeout = request.extensions.get("timeout")
+        attempt = 1
+        requeues = 0
+        while True:
+            if self.rate_limiter is not None:
+                wait = await self.rate_limiter.acquire_async(deadline)
+                if self.metrics is not None:
+                    self.metrics.observe_rate_limit_wait(wait)
+            if deadline is not None:
+                request.extensions["timeout"] = _shortened_timeout(timeout, deadline)
+            try:
+                resp = await self.transport.handle_async_request(request)
+            except httpx.TransportError as err:
+                delay = self._retry_delay(request, attempt)
+                if delay is None:
+                    raise
+                if deadline is not None:
+                    deadline.check_wait(delay, f"Retrying '{request.method}' request to '{request.url}' in")
+                self._notify_retry(request, attempt, delay, err)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            if resp.status_code == 429 and self.metrics is not None:
+                self.metrics.observe_throttle()
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(resp.status_code, resp.headers)
+                if resp.status_code == 429 and requeues < self.rate_limiter.max_requeues:
+                    requeues += 1
+                    logger.info("Queueing '%s' request to '%s' again after a 429 response", request.method, request.url)
+                    await resp.aclose()
+                    continue
+            delay = self._retry_delay(request, attempt, resp)
+            if delay is None:
+                return resp
+            if deadline is not None:
+                try:
+                    deadline.check_wait(delay, f"Retrying '{request.method}' request to '{request.url}' in")
+                except DeadlineExceeded:
+                    await resp.aclose()
+                    raise
+            self._notify_retry(request, attempt, delay, resp.status_code)
+            await resp.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _notify_retry(self, request, attempt: int, delay: float, reason):
+        if self.metrics is not None:
+            self.metrics.observe_retry(request.method, reason)
+        self.retry_policy.notify(request.method, str(request.url), attempt, delay, reason)
+
+    def _retry_delay(self, request, attempt: int, resp=None) -> Optional[float]:
+        if self.retry_policy is None:
+            return None
+        if resp is None:
+            return self.retry_policy.retry_delay(request.method, attempt)
+        if resp.status_code == 429 and self.rate_limiter is not None:
+            # The rate limiter already queued the request again up to its `max_requeues`.
+            return None
+        return self.retry_policy.retry_delay(request.method, attempt, resp.status_code, resp.headers)
+
+    async def aclose(self):
+        await self.transport.aclose()
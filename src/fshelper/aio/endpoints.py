@@ -0,0 +1,295 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Collection, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from ..deadline import Deadline, TimeoutValue, request_options
+from ..endpoints import _model_builder, _project
+from .api import httpx, httpx_timeout
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEndPointMixin:
+    """Async versions of the GenericEndPoint request methods.
+
+    Mix in before a GenericEndPoint subclass so the URLs and field filtering of that endpoint are reused, and use it
+    with an AsyncRequestService.
+    """
+
+    async def get(self, identifier: Any = None, timeout: TimeoutValue = None) -> Dict:
+        """Get a single resource from the FS API"""
+        _url = self.item_url(identifier)
+        response = await self.send_request(_url, timeout=timeout)
+        return response
+
+    async def create(self, data: Dict, enabled: Optional[bool] = False, timeout: TimeoutValue = None) -> Dict:
+        """Create a FreshService resource with the given data.
+
+        :param data: Data to pass to FreshService API with the values for the resource
+        :param enabled: A toggle to create the resource or not during development.
+        :param timeout: Timeout for this request instead of the default timeout of the AsyncRequestService.
+        """
+        url = self._create_url()
+        _data_to_send = self._create_data(data)
+        if self.fs_create_requests_enabled or enabled:
+            response = await self.send_request(url, method="POST", data=_data_to_send, timeout=timeout)
+        else:
+            response = self._create_disabled_response(url, data)
+        return response
+
+    async def delete(self, identifier: Any = None, timeout: TimeoutValue = None) -> Dict:
+        """Delete a resource with the FS API"""
+        _method = "DELETE"
+        _url = self.item_url(identifier)
+        response = await self.send_request(_url, method=_method, timeout=timeout)
+        return response
+
+    async def update(self, data: Dict, identifier: Any = None, timeout: TimeoutValue = None) -> Dict:
+        """Update a resource with the FS API
+
+        :param data: Dict with data to update resource.
+        :param identifier: Optional identifier to make the endpoint specific to particular resource.
+        :param timeout: Timeout for this request instead of the default timeout of the AsyncRequestService.
+        """
+        _method = "PUT"
+        _url = self.item_url(identifier)
+        response = await self.send_request(_url, method=_method, data=data, timeout=timeout)
+        return response
+
+    async def send_request(
+            self,
+            url: str,
+            method: Optional[str] = "GET",
+            data: Optional[Dict] = None,
+            timeout: TimeoutValue = None,
+            deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        """Send the HTTP request to the FreshService API using the httpx client of the AsyncRequestService.
+
+        :param timeout: Timeout for this request instead of the default timeout of the AsyncRequestService.
+        :param deadline: Deadline of the operation this request is part of.  The request isn't sent once it passed.
+        """
+        resp = await self._send(url, method=method, data=data, timeout=timeout, deadline=deadline)
+        return self._decode_response(resp)
+
+    async def _send(
+            self,
+            url: str,
+            method: Optional[str] = "GET",
+            data: Optional[Dict] = None,
+            timeout: TimeoutValue = None,
+            deadline: Optional[Deadline] = None,
+    ) -> "httpx.Response":
+        """Send the HTTP request and return the `httpx.Response` so callers can inspect the headers."""
+        if deadline is not None:
+            if timeout is None:
+                timeout = self.request_service.timeout
+            timeout = deadline.timeout_for(timeout)
+        if isinstance(data, dict):
+            data = self.codec.dumps(data)
+        logger.debug("Generating '%s' request for '%s'", method, url)
+        kwargs = {"timeout": httpx_timeout(timeout)} if timeout is not None else {}
+        if deadline is not None:
+            # Read by the FreshServiceTransport so retries and rate limit waits don't go past the deadline.
+            kwargs["extensions"] = {"deadline": deadline}
+        resp = await self.request_service.client.request(
+            method, url, headers=self.DEFAULT_HEADERS, content=data, **kwargs
+        )
+        try:
+            resp.raise_for_status()
+        except httpx.HTTPStatusError as err:
+            logger.error("Error encounter with send_request %s", err)
+            logger.warning(
+                "send_request called to url '%s' with method '%s' and data '%s'",
+                url,
+                method,
+                data,
+            )
+            logger.warning(
+                "Response: 'status_code' == '%d', 'text' == '%s'",
+                resp.status_code,
+                resp.text,
+            )
+            raise err
+        return resp
+
+
+class AsyncPluralEndPointMixin(AsyncEndPointMixin):
+    """Async version of GenericPluralEndpoint.get_all, used with `async for`."""
+
+    async def get_all(
+            self,
+            query=None,
+            workers: Optional[int] = None,
+            ordered: Optional[bool] = True,
+            timeout: TimeoutValue = None,
+            deadline: Union[Deadline, float, None] = None,
+            prefetch: Optional[int] = None,
+    ):
+        """Yields the list of dict items selected by self.plural_resource_key from each page of results.
+
+        Like the sync version, empty pages, like the page after a last full page, aren't yielded.
+
+        :param query: Optional query string added to the paginated URL.
+        :param workers: Number of pages after the first one to have in flight at once.  Pages are requested one at a
+            time when not given.
+        :param ordered: With `workers`, yield the pages in page order when True or as they complete when False.
+        :param timeout: Timeout for each page request instead of the default timeout of the AsyncRequestService.
+        :param deadline: Seconds, or a Deadline, the whole crawl must be done in.
+        :param prefetch: Request the next pages in a background task while the caller works on the current one,
+            keeping at most this many pages waiting for the caller.
+        """
+        deadline = Deadline.coerce(deadline)
+        if prefetch is not None and prefetch > 0:
+            pages = self.get_all(query, workers=workers, ordered=ordered, timeout=timeout, deadline=deadline)
+            async for items in _read_ahead(pages, prefetch):
+                yield items
+            return
+        request_kwargs = request_options(timeout, deadline)
+        if workers is not None and workers > 1:
+            async for items in self._get_all_concurrent(query, workers, ordered, request_kwargs):
+                yield items
+            return
+        page = 1
+        more_results = True
+        while more_results:
+            result = await self.send_request(self.paginate_url(query, page), **request_kwargs)
+            items = result.get(self.plural_resource_key)
+            if len(items) < self.items_per_page:
+                more_results = False
+            page += 1
+            if items:
+                yield items
+
+    async def iter_items(
+            self,
+            query=None,
+            limit: Optional[int] = None,
+            fields: Optional[Collection[str]] = None,
+            **kwargs
+    ):
+        """Yields the items of the resource one at a time, requesting the pages only as the items are consumed.
+
+        :param query: Optional query string added to the paginated URL.
+        :param limit: Maximum number of items to yield.
+        :param fields: Only keep these keys of each item, dropped as each page is received.
+        :param kwargs: Keyword arguments for `get_all`, like `workers` or `deadline`.
+        """
+        if limit is not None and limit <= 0:
+            return
+        nb_items = 0
+        pages = self.get_all(query, **kwargs)
+        try:
+            async for page in pages:
+                if fields is not None:
+                    page = [_project(item, fields) for item in page]
+                page.reverse()
+                while page:
+                    yield page.pop()
+                    nb_items += 1
+                    if limit is not None and nb_items >= limit:
+                        return
+        finally:
+            await pages.aclose()
+
+    async def iter_models(
+            self,
+            query=None,
+            trusted: Optional[bool] = False,
+            model_class: Optional[Type[BaseModel]] = None,
+            **kwargs
+    ):
+        """Yields the items of the resource as models instead of dicts, see GenericPluralEndpoint.iter_models."""
+        build = _model_builder(model_class or self.model_class, trusted, self.plural_resource_key)
+        async for item in self.iter_items(query, **kwargs):
+            yield build(item)
+
+    async def _get_all_concurrent(self, query, workers: int, ordered: bool, request_kwargs: Dict):
+        """Fetch the first page, then keep up to `workers` requests for the following pages in flight as tasks.
+
+        Like the sync version, a page without a 'next' link, or shorter than `items_per_page`, is the last page.
+        """
+        resp = await self._send(self.paginate_url(query, 1), **request_kwargs)
+        result = self._decode_response(resp)
+        items = result.get(self.plural_resource_key)
+        if items:
+            yield items
+        last_page = self._last_page(resp, result, len(items))
+        if last_page is not None and last_page <= 1:
+            return
+        next_page = 2
+        in_flight = OrderedDict()
+        """Task for each requested page, keyed by page number in the order the pages were submitted."""
+
+        def fill_window():
+            nonlocal next_page
+            while len(in_flight) < workers and (last_page is None or next_page <= last_page):
+                in_flight[next_page] = asyncio.ensure_future(
+                    self._get_page(self.paginate_url(query, next_page), request_kwargs)
+                )
+                next_page += 1
+
+        try:
+            fill_window()
+            while in_flight:
+                if ordered:
+                    first_page = next(iter(in_flight))
+                    await asyncio.wait([in_flight[first_page]])
+                    done_pages = [first_page]
+                else:
+                    done, _ = await asyncio.wait(in_flight.values(), return_when=asyncio.FIRST_COMPLETED)
+                    done_pages = [page for page, task in in_flight.items() if task in done]
+                for page in done_pages:
+                    task = in_flight.pop(page)
+                    if last_page is not None and page > last_page:
+                        continue
+                    items, has_next = task.result()
+                    is_last = has_next is False or len(items) < self.items_per_page
+                    if is_last and (last_page is None or page < last_page):
+                        last_page = page
+                        for later_page, later_task in in_flight.items():
+                            if later_page > last_page:
+                                later_task.cancel()
+                    if items:
+                        yield items
+                fill_window()
+        finally:
+            for task in in_flight.values():
+                task.cancel()
+
+    async def _get_page(self, url: str, request_kwargs: Dict) -> Tuple[List[Dict], Optional[bool]]:
+        """Items of a page, and whether the response has a 'next' link, None when it has no links at all."""
+        resp = await self._send(url, **request_kwargs)
+        items = self._decode_response(resp).get(self.plural_resource_key)
+        links = getattr(resp, "links", None)
+        return items, ("next" in links if isinstance(links, dict) else None)
+
+
+async def _read_ahead(pages, size: int):
+    """Consume the pages in a background task, keeping at most `size` pages ready ahead of the caller."""
+    buffer = asyncio.Queue(maxsize=size)
+
+    async def produce():
+        try:
+            async for page in pages:
+                await buffer.put(("page", page))
+            await buffer.put(("done", None))
+        except Exception as err:
+            await buffer.put(("error", err))
+        finally:
+            await pages.aclose()
+
+    task = asyncio.ensure_future(produce())
+    try:
+        while True:
+            kind, value = await buffer.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        task.cancel()
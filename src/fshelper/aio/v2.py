@@ -0,0 +1,166 @@
+import logging
+from typing import AsyncIterator, Dict, Iterable, List, Mapping, Optional, Union
+
+from ..bulk import BulkResult, run_bulk_async
+from ..deadline import Deadline, TimeoutValue
+from ..models import AssetCreation, AssetUpdate
+from ..v2 import (
+    AssetsEndPoint,
+    AssetTypeEndPoint,
+    LocationsEndPoint,
+    ServiceItemsEndPoint,
+    TicketFormFieldsEndPoint,
+    TicketsEndPoint,
+)
+from ..v2.asset_types import _flatten_fields
+from ..v2.assets import _asset_data
+from .endpoints import AsyncPluralEndPointMixin
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAssetsEndPoint(AsyncPluralEndPointMixin, AssetsEndPoint):
+    """Async endpoint for working with FreshService Assets"""
+
+    async def delete(
+            self,
+            display_id: Optional[int] = None,
+            permanently: Optional[bool] = False,
+            timeout: TimeoutValue = None,
+            deadline: Union[Deadline, float, None] = None,
+    ) -> Dict:
+        """Delete an asset with an option to additionally call the endpoint to permanently delete the item.
+
+        :param display_id: Display ID for the asset to be deleted
+        :param permanently: Flag to make a second call to the API to permanently delete the asset
+        :param timeout: Timeout for each request instead of the default timeout of the AsyncRequestService.
+        :param deadline: Seconds, or a Deadline, both requests must be done in.
+        """
+        _method = "DELETE"
+        deadline = Deadline.coerce(deadline)
+        if display_id is None:
+            display_id = self.identifier
+        _url = self.item_url(display_id)
+        logger.info("Deleting asset with display_id = '%d'", display_id)
+        response = await self.send_request(_url, method=_method, timeout=timeout, deadline=deadline)
+        if permanently:
+            _url = f"{self.item_url(display_id)}/delete_forever"
+            _method = "PUT"
+            logger.info(
+                "Permanently deleting asset with display_id = '%d'", display_id
+            )
+            response = await self.send_request(_url, method=_method, timeout=timeout, deadline=deadline)
+        return response
+
+    async def restore(self, display_id: Optional[int] = None, timeout: TimeoutValue = None) -> Dict:
+        _method = "PUT"
+        _url = f"{self.item_url(display_id)}/restore"
+        response = await self.send_request(_url, method=_method, timeout=timeout)
+        return response
+
+    async def get_associated_requests(self, display_id: Optional[int] = None, timeout: TimeoutValue = None) -> Dict:
+        _url = f"{self.item_url(display_id)}/requests"
+        response = await self.send_request(_url, timeout=timeout)
+        return response
+
+    async def update_changes(
+            self,
+            data: Union[Dict, AssetUpdate],
+            display_id: Optional[int] = None,
+            current: Optional[Dict] = None,
+            timeout: TimeoutValue = None,
+    ) -> Dict:
+        """Update an asset with only the fields that differ from its current state, skipping the request when none do.
+
+        :param data: dict or AssetUpdate model with the fields to set.  Its `display_id` is used when not given.
+        :param display_id: Display ID of the asset to update.
+        :param current: Last known state of the asset, as returned by the API.  Requested when not given.
+        :param timeout: Timeout for each request instead of the default timeout of the AsyncRequestService.
+        """
+        data = _asset_data(data)
+        display_id = self._update_display_id(data, display_id)
+        if current is None:
+            current = await self.send_request(self._current_url(display_id, data), timeout=timeout)
+            current = current.get(self.single_resource_key)
+        delta = self._changes(display_id, data, current)
+        if not delta:
+            return {self.single_resource_key: current}
+        return await self.send_request(self.item_url(display_id), method="PUT", data=delta, timeout=timeout)
+
+    def bulk_create(
+            self,
+            assets: Iterable[Union[Dict, AssetCreation]],
+            workers: Optional[int] = 4,
+            enabled: Optional[bool] = False,
+            ordered: Optional[bool] = False,
+    ) -> AsyncIterator[BulkResult]:
+        """Create assets with at most `workers` requests at once, yielding a BulkResult for each one.
+
+        :param assets: dicts or AssetCreation models of the assets to create.
+        :param workers: Number of requests sent at once.
+        :param enabled: A toggle to create the assets or not during development, as for `create`.  When not sending,
+            each BulkResult has `dry_run` set and no created asset.
+        :param ordered: Yield the results in the order of `assets` when True or as they complete when False.
+        """
+
+        async def create_asset(asset) -> Dict:
+            response = await self.create(_asset_data(asset), enabled=enabled)
+            return response.get(self.single_resource_key)
+
+        return run_bulk_async(create_asset, assets, workers=workers, ordered=ordered)
+
+    def bulk_update(
+            self,
+            assets: Iterable[Union[Dict, AssetUpdate]],
+            workers: Optional[int] = 4,
+            ordered: Optional[bool] = False,
+            only_changes: Optional[bool] = False,
+            current: Optional[Mapping[int, Dict]] = None,
+    ) -> AsyncIterator[BulkResult]:
+        """Update assets with at most `workers` requests at once, yielding a BulkResult for each one.
+
+        :param assets: dicts or AssetUpdate models with the `display_id` of the asset and the fields to update.
+        :param workers: Number of requests sent at once.
+        :param ordered: Yield the results in the order of `assets` when True or as they complete when False.
+        :param only_changes: Update each asset with `update_changes`, sending only the fields that changed.
+        :param current: Last known state of the assets by display ID for `update_changes`.
+        """
+
+        async def update_asset(asset) -> Dict:
+            display_id, data = self._bulk_update_data(asset)
+            if only_changes:
+                known = current.get(display_id) if current is not None else None
+                response = await self.update_changes(data, display_id, current=known)
+            else:
+                response = await self.send_request(self.item_url(display_id), method="PUT", data=data)
+            return response.get(self.single_resource_key)
+
+        return run_bulk_async(update_asset, assets, workers=workers, ordered=ordered)
+
+
+class AsyncAssetTypeEndPoint(AsyncPluralEndPointMixin, AssetTypeEndPoint):
+    async def get_fields(self, asset_type_id: int, timeout: TimeoutValue = None) -> List[Dict]:
+        """Get the definitions of the type_fields of an asset type, including the fields inherited from its parents.
+
+        :param asset_type_id: ID of the asset type.
+        :param timeout: Timeout for this request instead of the default timeout of the AsyncRequestService.
+        """
+        _url = f"{self.extended_url}/{asset_type_id}/fields"
+        response = await self.send_request(_url, timeout=timeout)
+        return _flatten_fields(response)
+
+
+class AsyncLocationsEndPoint(AsyncPluralEndPointMixin, LocationsEndPoint):
+    pass
+
+
+class AsyncServiceItemsEndPoint(AsyncPluralEndPointMixin, ServiceItemsEndPoint):
+    pass
+
+
+class AsyncTicketFormFieldsEndPoint(AsyncPluralEndPointMixin, TicketFormFieldsEndPoint):
+    pass
+
+
+class AsyncTicketsEndPoint(AsyncPluralEndPointMixin, TicketsEndPoint):
+    pass
@@ -1,6 +1,19 @@
 import logging
-
-from requests import Session
+import socket
+from typing import Callable, List, Optional, Tuple
+
+from requests import PreparedRequest, Session
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
+from urllib3.connection import HTTPConnection
+
+from .adapters import FreshServiceAdapter
+from .cache import ResponseCache
+from .codec import JSONCodec, default_codec
+from .deadline import TimeoutValue
+from .metrics import RequestMetrics
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
@@ -28,16 +41,86 @@ class RequestService:
 
     Use this class with a context manager or new_session() with a try, except, finally block with
     'RequestService.session.close() in the finally block.
+
+    One RequestService can be shared by the threads of a pool: the requests of every endpoint created from it go through
+    one connection pool per host, so workers reuse the warm connections to '<domain>.freshservice.com'.  Set
+    `pool_maxsize` to at least the number of threads sending requests at once, otherwise connections are discarded and
+    opened again, or callers wait for a free connection with `pool_block`.
     """
 
-    def __init__(self, credential: Credential, domain: str):
+    DEFAULT_TIMEOUT = (3.05, 30)
+    """Default (connect timeout, read timeout) in seconds of the requests sent to the FreshService API."""
+
+    def __init__(
+            self,
+            credential: Credential,
+            domain: str,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            pool_connections: Optional[int] = DEFAULT_POOLSIZE,
+            pool_maxsize: Optional[int] = DEFAULT_POOLSIZE,
+            pool_block: Optional[bool] = DEFAULT_POOLBLOCK,
+            keep_alive: Optional[bool] = True,
+            socket_options: Optional[List[Tuple[int, int, int]]] = None,
+            timeout: TimeoutValue = DEFAULT_TIMEOUT,
+            cache: Optional[ResponseCache] = None,
+            codec: Optional[JSONCodec] = None,
+            metrics: Optional[RequestMetrics] = None,
+            before_request: Optional[List[Callable[[PreparedRequest], None]]] = None,
+            after_request: Optional[List[Callable]] = None,
+            coalesce_requests: Optional[bool] = False,
+    ):
         """Constructor for a RequestService object
 
         :param credential: Credential object
         :param domain: FreshService domain (the part before '.freshservice.com')
+        :param rate_limiter: RateLimiter shared by every endpoint using this RequestService.  A RateLimiter learning
+            the rate limit of the account from the response headers is used when not given.
+        :param retry_policy: RetryPolicy for requests failing with a transient error.  The default RetryPolicy sends
+            idempotent requests up to 3 times.
+        :param pool_connections: Number of hosts to keep a connection pool for.
+        :param pool_maxsize: Maximum number of connections kept open to each host.
+        :param pool_block: Wait for a free connection when `pool_maxsize` connections to the host are in use instead
+            of opening a connection that is discarded after the request.
+        :param keep_alive: Keep connections open between requests.  When False every request is sent with a
+            'Connection: close' header.
+        :param socket_options: TCP options set on each new socket as (level, option, value) tuples.  Defaults to
+            TCP_NODELAY, with SO_KEEPALIVE when `keep_alive` is set so idle pooled connections aren't dropped silently.
+        :param timeout: Default timeout in seconds for each request, or a (connect timeout, read timeout) tuple.  The
+            endpoint methods take a `timeout` argument to override it for a single call.
+        :param cache: Optional ResponseCache shared by every endpoint using this RequestService for the GET requests.
+        :param codec: JSONCodec for the request and response bodies.  OrjsonCodec is used when `orjson` is installed,
+            JSONCodec otherwise.
+        :param metrics: RequestMetrics recording the requests of every endpoint using this RequestService.  A new
+            RequestMetrics is used when not given.
+        :param before_request: Hooks called with each PreparedRequest before it's sent.
+        :param after_request: Hooks called after each request with the PreparedRequest, the Response or None, the
+            seconds waited for it and the exception raised or None.  Hooks can be added to `before_request_hooks` and
+            `after_request_hooks` at any time.
+        :param coalesce_requests: Send identical GET requests in flight at the same time from several threads only once
+            and give each caller a copy of the response  A caller waits for the request in flight no longer than its own timeout
+            and deadline.
         """
         self.credential = credential
         self.domain = domain
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        if socket_options is None:
+            socket_options = list(HTTPConnection.default_socket_options)
+            if keep_alive:
+                socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        self.socket_options = socket_options
+        self.timeout = timeout
+        self.cache = cache
+        self.codec = codec if codec is not None else default_codec()
+        self.metrics = metrics if metrics is not None else RequestMetrics()
+        self.before_request_hooks = list(before_request or [])
+        self.after_request_hooks = list(after_request or [])
+        self.single_flight = SingleFlight() if coalesce_requests else None
         self.session = None
 
     def __enter__(self):
@@ -57,3 +140,20 @@ class RequestService:
     def new_session(self):
         self.session = Session()
         self.session.auth = (self.credential.username, self.credential.password)
+        if not self.keep_alive:
+            self.session.headers["Connection"] = "close"
+        adapter = FreshServiceAdapter(
+            rate_limiter=self.rate_limiter,
+            retry_policy=self.retry_policy,
+            socket_options=self.socket_options,
+            timeout=self.timeout,
+            cache=self.cache,
+            metrics=self.metrics,
+            before_request=self.before_request_hooks,
+            after_request=self.after_request_hooks,
+            single_flight=self.single_flight,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        self.session.mount("https://", adapter)
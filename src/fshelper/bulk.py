@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BulkResult:
+    """Result of one item of a bulk operation: the resource returned by the API or the error for the payload."""
+
+    def __init__(self, payload: Any, resource: Optional[Dict] = None, error: Optional[Exception] = None):
+        """Constructor for a BulkResult object
+
+        :param payload: Original item given to the bulk operation.
+        :param resource: Resource returned by the API for the item.
+        :param error: Exception raised sending the item, None when it succeeded.
+        """
+        self.payload = payload
+        self.resource = resource
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def id(self) -> Optional[int]:
+        return (self.resource or {}).get("id")
+
+    @property
+    def display_id(self) -> Optional[int]:
+        return (self.resource or {}).get("display_id")
+
+    @property
+    def dry_run(self) -> bool:
+        """True when the request wasn't sent because sending creates isn't enabled, the resource is a placeholder."""
+        return (self.resource or {}).get("dry_run") is True
+
+    def __repr__(self):
+        if self.dry_run:
+            return "BulkResult(dry_run=True)"
+        if self.ok:
+            return f"BulkResult(id={self.id}, display_id={self.display_id})"
+        return f"BulkResult(error={self.error!r})"
+
+
+def run_bulk(
+        func: Callable[[Any], Optional[Dict]],
+        items: Iterable[Any],
+        workers: Optional[int] = 4,
+        ordered: Optional[bool] = False,
+) -> Iterator[BulkResult]:
+    """Call `func` for each item on a pool of `workers` threads, yielding a BulkResult for each item.
+
+    Items are read from `items` as results are yielded, with at most two items per worker in flight, so a large
+    generator of payloads is never read into memory at once.  An item failing is reported in its BulkResult and doesn't
+    stop the other items.
+
+    :param func: Called with each item, returns the resource from the API response.
+    :param items: Payloads to process.
+    :param workers: Number of threads sending requests at once.
+    :param ordered: Yield the results in the order of `items` when True or as they complete when False.
+    """
+    items = iter(items)
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def fill_window():
+            while len(in_flight) < workers * 2:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                in_flight.append((item, executor.submit(func, item)))
+
+        fill_window()
+        while in_flight:
+            if ordered:
+                done_items = [in_flight.popleft()]
+                wait([done_items[0][1]])
+            else:
+                done, _ = wait([future for _, future in in_flight], return_when=FIRST_COMPLETED)
+                done_items = [(item, future) for item, future in in_flight if future in done]
+                for done_item in done_items:
+                    in_flight.remove(done_item)
+            for item, future in done_items:
+                error = future.exception()
+                if error is not None:
+                    logger.warning("Bulk operation failed for '%s': %s", item, error)
+                    yield BulkResult(item, error=error)
+                else:
+                    yield BulkResult(item, resource=future.result())
+            fill_window()
+
+
+async def run_bulk_async(
+        func: Callable[[Any], Awaitable[Optional[Dict]]],
+        items: Iterable[Any],
+        workers: Optional[int] = 4,
+        ordered: Optional[bool] = False,
+) -> AsyncIterator[BulkResult]:
+    """Await `func` for each item on at most `workers` tasks at once, yielding a BulkResult for each item.
+
+    The async version of `run_bulk`, with the same window of two items per worker read from `items` at a time.
+
+    :param func: Coroutine function called with each item, returns the resource from the API response.
+    :param items: Payloads to process.
+    :param workers: Number of requests sent at once.
+    :param ordered: Yield the results in the order of `items` when True or as they complete when False.
+    """
+    items = iter(items)
+    in_flight = deque()
+    semaphore = asyncio.Semaphore(workers)
+
+    async def call(item):
+        async with semaphore:
+            return await func(item)
+
+    def fill_window():
+        while len(in_flight) < workers * 2:
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            in_flight.append((item, asyncio.ensure_future(call(item))))
+
+    try:
+        fill_window()
+        while in_flight:
+            if ordered:
+                done_items = [in_flight.popleft()]
+                await asyncio.wait([done_items[0][1]])
+            else:
+                done, _ = await asyncio.wait([task for _, task in in_flight], return_when=asyncio.FIRST_COMPLETED)
+                done_items = [(item, task) for item, task in in_flight if task in done]
+                for done_item in done_items:
+                    in_flight.remove(done_item)
+            for item, task in done_items:
+                error = task.exception()
+                if error is not None:
+                    logger.warning("Bulk operation failed for '%s': %s", item, error)
+                    yield BulkResult(item, error=error)
+                else:
+                    yield BulkResult(item, resource=task.result())
+            fill_window()
+    finally:
+        for _, task in in_flight:
+            task.cancel()
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """Response to a GET request kept by the ResponseCache."""
+
+    def __init__(
+            self,
+            status_code: int,
+            headers: Mapping[str, str],
+            content: bytes,
+            encoding: Optional[str],
+            expires_at: float,
+    ):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.expires_at = expires_at
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("ETag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("Last-Modified")
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Headers to make a conditional request for this response once it has expired."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """In-memory LRU cache of the GET responses from the FreshService API, shared by the endpoints of a RequestService.
+
+    Responses are kept for `ttl` seconds, or for the TTL of the longest matching path prefix in `ttls`, so reference
+    data like locations can be kept longer than assets.  An expired response with an 'ETag' or 'Last-Modified' header is
+    revalidated with a conditional request, and reused when the API answers '304 Not Modified'.  A PUT, POST or DELETE
+    request sent through the library drops the cached responses for that resource and the lists it's part of.
+    """
+
+    def __init__(
+            self,
+            max_size: Optional[int] = 1024,
+            ttl: Optional[float] = 60,
+            ttls: Optional[Dict[str, float]] = None,
+    ):
+        """Constructor for a ResponseCache object
+
+        :param max_size: Maximum number of responses kept, the least recently used response is evicted past it.
+        :param ttl: Seconds a response is used without asking the API again.
+        :param ttls: TTL in seconds by URL path prefix, e.g. `{"/api/v2/locations": 3600}`.  The `endpoint` property of
+            an endpoint gives its path.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        """Number of requests answered from the cache without asking the API."""
+        self.misses = 0
+        """Number of GET requests sent to the API because no fresh response was cached."""
+        self.revalidations = 0
+        """Number of expired responses reused after a '304 Not Modified' response."""
+        self.evictions = 0
+        """Number of responses dropped to keep the cache under `max_size`."""
+        self.invalidations = 0
+        """Number of responses dropped because their resource was changed through the library."""
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, url: str) -> float:
+        """TTL of the longest path prefix in `ttls` matching the url, or the default `ttl`."""
+        path = urlsplit(url).path
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        if not matches:
+            return self.ttl
+        return self.ttls[max(matches, key=len)]
+
+    def lookup(self, url: str) -> Tuple[Optional[CacheEntry], bool]:
+        """Cached entry for the url and whether it's still fresh.  Counts a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(url)
+            if entry.fresh:
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            if not entry.validators():
+                del self._entries[url]
+                return None, False
+            return entry, False
+
+    def store(self, url: str, status_code: int, headers: Mapping[str, str], content: bytes, encoding=None) -> None:
+        """Keep the response to a GET request, evicting the least recently used responses past `max_size`."""
+        if "no-store" in headers.get("Cache-Control", ""):
+            return
+        ttl = self.ttl_for(url)
+        if ttl <= 0:
+            return
+        entry = CacheEntry(status_code, headers, content, encoding, time.monotonic() + ttl)
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_size:
+                evicted_url, _ = self._entries.popitem(last=False)
+                self.evictions += 1
+                logger.debug("Evicted cached response for '%s'", evicted_url)
+
+    def revalidated(self, url: str, entry: CacheEntry) -> None:
+        """Extend the life of an expired entry after a '304 Not Modified' response."""
+        with self._lock:
+            entry.expires_at = time.monotonic() + self.ttl_for(url)
+            self.revalidations += 1
+
+    def invalidate(self, url: str) -> None:
+        """Drop the cached responses for the resource in the url, and the cached lists of that type of resource.
+
+        For '/api/v2/assets/12/restore' the responses for '/api/v2/assets/12', its sub-resources and the
+        '/api/v2/assets' lists are dropped.
+        """
+        resource_path, collection_path = _resource_paths(urlsplit(url).path)
+        with self._lock:
+            for cached_url in list(self._entries):
+                path = urlsplit(cached_url).path
+                if path == collection_path or path == resource_path or path.startswith(f"{resource_path}/"):
+                    del self._entries[cached_url]
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters to tune the size and TTLs of the cache."""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+def _resource_paths(path: str) -> Tuple[str, str]:
+    """Path of the resource and path of its collection, split at the first numeric segment of the path."""
+    segments = path.rstrip("/").split("/")
+    for index, segment in enumerate(segments):
+        if segment.isdigit():
+            return "/".join(segments[:index + 1]), "/".join(segments[:index])
+    path = "/".join(segments)
+    return path, path
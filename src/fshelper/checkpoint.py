@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from .endpoints import GenericPluralEndpoint
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Progress of a crawl through the pages of a plural endpoint.
+
+    `page` is the page of the last item handed to the caller, `offset` the number of items of that page handed out and
+    `last_id` the ID of that item, so a resumed crawl requests that page again and continues right after that item.
+    """
+
+    def __init__(
+            self,
+            query: Optional[str] = None,
+            page: int = 1,
+            offset: int = 0,
+            last_id: Any = None,
+            high_water_mark: Optional[str] = None,
+            nb_items: int = 0,
+            done: bool = False,
+            saved_at: Optional[str] = None,
+    ):
+        self.query = query
+        self.page = page
+        self.offset = offset
+        self.last_id = last_id
+        self.high_water_mark = high_water_mark
+        """Latest 'updated_at' of the items handed to the caller."""
+        self.nb_items = nb_items
+        self.done = done
+        self.saved_at = saved_at
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Checkpoint":
+        return cls(**data)
+
+    def __repr__(self):
+        return (
+            f"Checkpoint(query={self.query!r}, page={self.page}, offset={self.offset}, "
+            f"nb_items={self.nb_items}, done={self.done})"
+        )
+
+
+class FileCheckpointStore:
+    """Checkpoints kept in a JSON file by key, replaced atomically on each save so a crash never leaves it corrupted."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, checkpoints: Dict[str, Dict]):
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(checkpoints, file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+
+    def load(self, key: str) -> Optional[Checkpoint]:
+        with self._lock:
+            data = self._read().get(key)
+        return Checkpoint.from_dict(data) if data is not None else None
+
+    def save(self, key: str, checkpoint: Checkpoint):
+        checkpoint.saved_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[key] = checkpoint.to_dict()
+            self._write(checkpoints)
+
+    def delete(self, key: str):
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(key, None) is not None:
+                self._write(checkpoints)
+
+
+class ResumableCrawl:
+    """Iterate over the items of a plural endpoint, saving a checkpoint to continue from after a failure.
+
+    The checkpoint is saved after each page and when iteration stops early or fails.  Iterating again after a failure
+    resumes right after the last item handed out: the page of that item is requested again and the items up to it are
+    skipped, found by ID when the page shifted since.  Once the crawl is complete its checkpoint is kept with
+    `done` set, and the next iteration starts a new crawl from the first page.
+
+    Pages are requested in order, so the order of the resource must be stable for the crawl to resume without
+    duplicates or gaps.
+    """
+
+    def __init__(
+            self,
+            end_point: GenericPluralEndpoint,
+            store: FileCheckpointStore,
+            query: Optional[str] = None,
+            key: Optional[str] = None,
+            id_field: str = "id",
+    ):
+        """Constructor for a ResumableCrawl object
+
+        :param end_point: Plural endpoint to crawl.
+        :param store: Store keeping the checkpoint, like a FileCheckpointStore.
+        :param query: Optional query string added to the paginated URL.
+        :param key: Key of the checkpoint in the store.  Defaults to the URL of the endpoint and the query.
+        :param id_field: Field identifying the items, used to find the last item handed out in a shifted page.
+        """
+        self.end_point = end_point
+        self.store = store
+        self.query = query
+        self.key = key or f"{end_point.endpoint}?{query or ''}"
+        self.id_field = id_field
+
+    @property
+    def checkpoint(self) -> Optional[Checkpoint]:
+        return self.store.load(self.key)
+
+    def reset(self):
+        """Forget the checkpoint so the next iteration starts from the first page."""
+        self.store.delete(self.key)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.items()
+
+    def items(self, **kwargs) -> Iterator[Dict]:
+        """Yields the items of the resource, continuing from the checkpoint of an unfinished crawl.
+
+        :param kwargs: Keyword arguments for `get_all`, like `timeout`, `prefetch` or `workers`.  Concurrent pages are
+            requested in order, so `ordered=False` isn't accepted.
+        """
+        if kwargs.get("ordered") is False:
+            raise ValueError("A ResumableCrawl requests its pages in order to resume from a checkpoint.")
+        checkpoint = self.checkpoint
+        if checkpoint is not None and checkpoint.query != self.query:
+            raise ValueError(f"The checkpoint '{self.key}' is for the query {checkpoint.query!r}, not {self.query!r}.")
+        if checkpoint is None or checkpoint.done:
+            checkpoint = Checkpoint(self.query, high_water_mark=checkpoint.high_water_mark if checkpoint else None)
+            resuming = False
+        else:
+            logger.info("Resuming crawl '%s' from %s", self.key, checkpoint)
+            resuming = True
+        kwargs["ordered"] = True
+        pages = self.end_point.get_all(self.query, start_page=checkpoint.page, **kwargs)
+        try:
+            for page_number, page in enumerate(pages, start=checkpoint.page):
+                start = self._resume_offset(page, checkpoint) if resuming else 0
+                resuming = False
+                for offset in range(start, len(page)):
+                    item = page[offset]
+                    checkpoint.page = page_number
+                    checkpoint.offset = offset + 1
+                    checkpoint.last_id = item.get(self.id_field)
+                    checkpoint.nb_items += 1
+                    updated_at = item.get("updated_at")
+                    if updated_at and (checkpoint.high_water_mark is None or updated_at > checkpoint.high_water_mark):
+                        checkpoint.high_water_mark = updated_at
+                    yield item
+                self.store.save(self.key, checkpoint)
+            checkpoint.done = True
+        finally:
+            pages.close()
+            self.store.save(self.key, checkpoint)
+
+    def _resume_offset(self, page: List[Dict], checkpoint: Checkpoint) -> int:
+        """Position in the page of the first item not handed out yet."""
+        if checkpoint.last_id is not None:
+            for index, item in enumerate(page):
+                if item.get(self.id_field) == checkpoint.last_id:
+                    return index + 1
+            logger.warning(
+                "Item %s of crawl '%s' is no longer on page %s, resuming at offset %s",
+                checkpoint.last_id, self.key, checkpoint.page, checkpoint.offset,
+            )
+        return min(checkpoint.offset, len(page))
@@ -0,0 +1,48 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+
+class JSONCodec:
+    """Encode request bodies and decode response bodies with the standard library `json` module."""
+
+    name = "json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data).encode("utf-8")
+
+    def loads(self, content: Union[bytes, str]) -> Any:
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    """Encode and decode with the optional `orjson` package, installed with `pip install fshelper[fast]`."""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError(
+                "OrjsonCodec requires the 'orjson' package. Install it with 'pip install fshelper[fast]'."
+            )
+
+    def dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, content: Union[bytes, str]) -> Any:
+        return orjson.loads(content)
+
+
+_default_codec = None
+
+
+def default_codec() -> JSONCodec:
+    """OrjsonCodec when `orjson` is installed, otherwise JSONCodec."""
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = OrjsonCodec() if orjson is not None else JSONCodec()
+    return _default_codec
@@ -0,0 +1,298 @@
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Type
+
+from pydantic import BaseModel
+
+from .endpoints import GenericPluralEndpoint
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - pyarrow is an optional dependency
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+NESTED_SEPARATOR = "."
+"""Separator between the name of a nested model field, like type_fields, and the name of its flattened columns."""
+
+
+def _require_pyarrow():
+    if pyarrow is None:
+        raise ImportError(
+            "Columnar export requires the 'pyarrow' package. Install it with 'pip install fshelper[arrow]'."
+        )
+
+
+def _arrow_type(python_type: Any) -> "pyarrow.DataType":
+    """Arrow type of the column for a model field, strings for the types without an Arrow equivalent."""
+    return {
+        bool: pyarrow.bool_(),
+        int: pyarrow.int64(),
+        float: pyarrow.float64(),
+        str: pyarrow.string(),
+        datetime: pyarrow.timestamp("us", tz="UTC"),
+        date: pyarrow.date32(),
+    }.get(python_type, pyarrow.string())
+
+
+def _is_model(python_type: Any) -> bool:
+    return isinstance(python_type, type) and issubclass(python_type, BaseModel)
+
+
+def arrow_schema(
+        model_class: Type[BaseModel],
+        nested_models: Optional[Dict[str, Type[BaseModel]]] = None,
+) -> "pyarrow.Schema":
+    """Arrow schema for the resources of a model, with a column for each field of its nested models.
+
+    :param model_class: Model of the resources, like AssetFullData.
+    :param nested_models: Model to use for some nested fields instead of the declared one, like the TypeField model of
+        an asset type for 'type_fields'.
+    """
+    _require_pyarrow()
+    nested_models = nested_models or {}
+    fields = []
+    for name, field in model_class.__fields__.items():
+        nested_model = nested_models.get(name, field.type_)
+        if _is_model(nested_model):
+            fields.extend(
+                pyarrow.field(f"{name}{NESTED_SEPARATOR}{nested.name}", _arrow_type(nested.type_))
+                for nested in nested_model.__fields__.values()
+            )
+        else:
+            fields.append(pyarrow.field(name, _arrow_type(field.type_)))
+    return pyarrow.schema(fields)
+
+
+def _to_array(values: List[Any], arrow_type: "pyarrow.DataType", column: str = "") -> "pyarrow.Array":
+    """Convert the values of a column, parsing strings for the types FreshService sends as strings, like dates.
+
+    Numbers are converted with a safe cast, so a value that doesn't fit the type of the column, like 10.5 in an int64
+    column, raises a ValueError instead of being truncated.
+    """
+    if pyarrow.types.is_string(arrow_type):
+        values = [
+            value if value is None or isinstance(value, str)
+            else json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+            for value in values
+        ]
+        return pyarrow.array(values, pyarrow.string())
+    if pyarrow.types.is_timestamp(arrow_type) or pyarrow.types.is_date(arrow_type):
+        return pyarrow.array(values, pyarrow.string()).cast(arrow_type)
+    try:
+        array = pyarrow.array(values)
+        if array.type.equals(arrow_type) or pyarrow.types.is_null(array.type):
+            return array.cast(arrow_type)
+        # Numbers cast to booleans lose their value, parse them as strings so anything but 0 and 1 is refused.
+        if not pyarrow.types.is_boolean(arrow_type):
+            return array.cast(arrow_type)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, pyarrow.ArrowNotImplementedError):
+        pass
+    strings = [None if value is None else str(value) for value in values]
+    try:
+        return pyarrow.array(strings, pyarrow.string()).cast(arrow_type)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, pyarrow.ArrowNotImplementedError) as err:
+        raise ValueError(
+            f"Column '{column}' has values that don't fit its {arrow_type} type: {err}.  Give the model of the "
+            f"resources, or the TypeField model of the asset type, to export it with a declared type."
+        ) from err
+
+
+def _inferred_type(values: List[Any]) -> "pyarrow.DataType":
+    """Type of a column without a declared type, from its values in the first batch.
+
+    Numbers are float64 even when the first values are integers, so later fractional values keep their precision.
+    """
+    try:
+        arrow_type = pyarrow.array(values).type
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        return pyarrow.string()
+    if pyarrow.types.is_null(arrow_type) or pyarrow.types.is_nested(arrow_type):
+        return pyarrow.string()
+    if pyarrow.types.is_integer(arrow_type) or pyarrow.types.is_floating(arrow_type):
+        return pyarrow.float64()
+    return arrow_type
+
+
+class ColumnarExporter:
+    """Export the resources of a plural endpoint to Arrow record batches, Parquet or Arrow IPC files, or a DataFrame.
+
+    The pages are converted to record batches of about `batch_size` rows as they're received, one column at a time, so
+    at most one batch of resources is held as dicts.  The schema is inferred from the model of the endpoint, with the
+    fields of nested models like type_fields flattened to 'type_fields.<name>' columns.  Nested fields without declared
+    fields, like the TypeField model, and endpoints without a model have their columns inferred from the first batch,
+    with float64 for every numeric column.  A key first seen in a later batch, like a type field of an asset type
+    missing from the first batch, and a later value that doesn't fit the type of its column raise a ValueError rather
+    than being dropped or truncated; give the `schema` of the export to keep only its columns.  Requires the optional
+    `pyarrow` package, and `pandas` for `to_dataframe`.
+    """
+
+    def __init__(
+            self,
+            end_point: GenericPluralEndpoint,
+            model_class: Optional[Type[BaseModel]] = None,
+            type_fields_model: Optional[Type[BaseModel]] = None,
+            batch_size: int = 10000,
+            schema: Optional["pyarrow.Schema"] = None,
+    ):
+        """Constructor for a ColumnarExporter object
+
+        :param end_point: Plural endpoint to export the resources of.
+        :param model_class: Model to infer the schema from instead of the model of the endpoint.
+        :param type_fields_model: TypeField model of the asset type, as returned by `TypeFieldModels.model`, for typed
+            type_fields columns.
+        :param batch_size: Number of rows of each record batch.
+        :param schema: Schema of the export, for instance from `arrow_schema`.  Keys of the resources without a column
+            in it are left out instead of raising a ValueError.
+        """
+        _require_pyarrow()
+        self.end_point = end_point
+        self.model_class = model_class or end_point.model_class
+        self.nested_models = {"type_fields": type_fields_model} if type_fields_model is not None else {}
+        self.batch_size = batch_size
+        self.schema: Optional[pyarrow.Schema] = schema
+        self.inferred = schema is None
+        """True when the schema is inferred from the first batch rather than given."""
+        self.nb_rows = 0
+
+    def iter_batches(self, query=None, **kwargs) -> Iterator["pyarrow.RecordBatch"]:
+        """Yields the resources as record batches, requesting the pages as the batches are consumed.
+
+        :param query: Optional query string added to the paginated URL.
+        :param kwargs: Keyword arguments for `get_all`, like `workers` or `deadline`.
+        """
+        rows = []
+        pages = self.end_point.get_all(query, **kwargs)
+        try:
+            for page in pages:
+                rows.extend(page)
+                if len(rows) >= self.batch_size:
+                    yield self.record_batch(rows)
+                    rows = []
+            if rows:
+                yield self.record_batch(rows)
+        finally:
+            pages.close()
+
+    def record_batch(self, rows: List[Dict]) -> "pyarrow.RecordBatch":
+        """Convert resources to a record batch with the schema of the export, inferred from them if not known yet."""
+        if self.schema is None:
+            self.schema = self._infer_schema(rows)
+        elif self.inferred:
+            unseen = [column for column in self._columns(rows) if self.schema.get_field_index(column) == -1]
+            if unseen:
+                raise ValueError(
+                    f"Keys {', '.join(unseen)} first appear after the schema was inferred from the first batch.  Give "
+                    f"the schema of the export, or the TypeField model of the asset type, to export them."
+                )
+        columns = []
+        for field in self.schema:
+            name, _, key = field.name.partition(NESTED_SEPARATOR)
+            if key:
+                values = [(row.get(name) or {}).get(key) for row in rows]
+            else:
+                values = [row.get(name) for row in rows]
+            columns.append(_to_array(values, field.type, field.name))
+        self.nb_rows += len(rows)
+        return pyarrow.RecordBatch.from_arrays(columns, schema=self.schema)
+
+    def _columns(self, rows: List[Dict]) -> List[str]:
+        """Columns of the keys without a declared type, the keys of nested fields without declared fields."""
+        if self.model_class is not None:
+            nested_names = [
+                name for name, field in self.model_class.__fields__.items()
+                if _is_model(self.nested_models.get(name, field.type_))
+                and not self.nested_models.get(name, field.type_).__fields__
+            ]
+        else:
+            nested_names = None
+        keys = {}
+        for row in rows:
+            for name, value in row.items():
+                if nested_names is not None and name not in nested_names:
+                    continue
+                if isinstance(value, dict):
+                    for key in value:
+                        keys.setdefault(f"{name}{NESTED_SEPARATOR}{key}", None)
+                else:
+                    keys.setdefault(name, None)
+        return list(keys)
+
+    def _infer_schema(self, rows: List[Dict]) -> "pyarrow.Schema":
+        if self.model_class is not None:
+            schema = arrow_schema(self.model_class, self.nested_models)
+            declared = {field.name for field in schema}
+            fields = list(schema)
+        else:
+            declared = set()
+            fields = []
+        for column in self._columns(rows):
+            if column in declared:
+                continue
+            name, _, key = column.partition(NESTED_SEPARATOR)
+            if key:
+                values = [(row.get(name) or {}).get(key) for row in rows]
+            else:
+                values = [row.get(name) for row in rows]
+            fields.append(pyarrow.field(column, _inferred_type(values)))
+        return pyarrow.schema(fields)
+
+    def write_parquet(self, path, query=None, compression: str = "snappy", **kwargs) -> int:
+        """Write the resources to a Parquet file, one row group per batch, and return the number of rows written.
+
+        :param path: Path or file object to write to.
+        :param query: Optional query string added to the paginated URL.
+        :param compression: Parquet compression codec.
+        :param kwargs: Keyword arguments for `get_all`, like `workers` or `deadline`.
+        """
+        import pyarrow.parquet
+
+        writer = None
+        nb_rows = 0
+        try:
+            for batch in self.iter_batches(query, **kwargs):
+                if writer is None:
+                    writer = pyarrow.parquet.ParquetWriter(path, batch.schema, compression=compression)
+                writer.write_batch(batch)
+                nb_rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return nb_rows
+
+    def write_ipc(self, path, query=None, **kwargs) -> int:
+        """Write the resources to an Arrow IPC file and return the number of rows written.
+
+        :param path: Path or file object to write to.
+        :param query: Optional query string added to the paginated URL.
+        :param kwargs: Keyword arguments for `get_all`, like `workers` or `deadline`.
+        """
+        import pyarrow.ipc
+
+        writer = None
+        nb_rows = 0
+        try:
+            for batch in self.iter_batches(query, **kwargs):
+                if writer is None:
+                    writer = pyarrow.ipc.new_file(path, batch.schema)
+                writer.write_batch(batch)
+                nb_rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+        return nb_rows
+
+    def to_table(self, query=None, **kwargs) -> "pyarrow.Table":
+        """All the resources as an Arrow table."""
+        batches = list(self.iter_batches(query, **kwargs))
+        if not batches:
+            if self.schema is None and self.model_class is not None:
+                return arrow_schema(self.model_class, self.nested_models).empty_table()
+            return (self.schema or pyarrow.schema([])).empty_table()
+        return pyarrow.Table.from_batches(batches)
+
+    def to_dataframe(self, query=None, **kwargs):
+        """All the resources as a pandas DataFrame, converted from the record batches."""
+        return self.to_table(query, **kwargs).to_pandas()
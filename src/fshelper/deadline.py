@@ -0,0 +1,68 @@
+import time
+from typing import Optional, Tuple, Union
+
+from .errors import DeadlineExceeded
+
+TimeoutValue = Union[float, Tuple[float, float], None]
+"""Timeout of a single request in seconds, or a (connect timeout, read timeout) tuple as used by `requests`."""
+
+
+class Deadline:
+    """Total time limit for an operation sending several requests, like `get_all` or a permanent asset delete.
+
+    The timeout of each request is shortened to the time left before the deadline, and a request is not sent at all
+    once the deadline has passed.
+    """
+
+    def __init__(self, seconds: float):
+        """Constructor for a Deadline object
+
+        :param seconds: Number of seconds from now the operation must be done in.
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def coerce(cls, deadline: Union["Deadline", float, None]) -> Optional["Deadline"]:
+        """Deadline given either as a Deadline or as a number of seconds from now."""
+        if deadline is None or isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, negative once it has passed."""
+        return self.expires_at - time.monotonic()
+
+    def check_wait(self, seconds: float, reason: str = "waiting"):
+        """Raise DeadlineExceeded when waiting this many seconds would leave no time before the deadline.
+
+        :param reason: What the wait is for, for the error message.
+        """
+        if seconds > 0 and seconds >= self.remaining():
+            raise DeadlineExceeded(
+                f"{reason} {seconds:.3f} seconds would pass the deadline of {self.seconds} seconds"
+            )
+
+    def timeout_for(self, timeout: TimeoutValue = None) -> TimeoutValue:
+        """Timeout for the next request, shortened to the time left before the deadline.
+
+        :raises DeadlineExceeded: when the deadline has passed.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.seconds} seconds exceeded by {-remaining:.3f} seconds")
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(remaining if part is None else min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+
+def request_options(timeout: TimeoutValue = None, deadline: Optional[Deadline] = None) -> dict:
+    """Keyword arguments for `send_request` with only the options that were given."""
+    options = {}
+    if timeout is not None:
+        options["timeout"] = timeout
+    if deadline is not None:
+        options["deadline"] = deadline
+    return options
@@ -0,0 +1,35 @@
+from typing import Any, Collection, Dict, Mapping
+
+NESTED_FIELDS = ("type_fields",)
+"""Fields holding a dict of their own fields, compared field by field."""
+
+
+def changed_fields(
+        current: Mapping[str, Any],
+        desired: Mapping[str, Any],
+        ignore: Collection[str] = (),
+        nested: Collection[str] = NESTED_FIELDS,
+) -> Dict[str, Any]:
+    """Fields of `desired` with a value different from `current`, the minimal data to update a resource with.
+
+    Only the fields in `desired` are compared, so a field missing from it is left unchanged rather than cleared.  A
+    field missing from `current` is the same as a None value.  The fields in `nested`, like `type_fields`, are compared
+    field by field and only their changed fields are kept.
+
+    :param current: Last known state of the resource on the server.
+    :param desired: Fields to set on the resource.
+    :param ignore: Fields never sent, like the read only fields.
+    :param nested: Fields holding a dict compared field by field.
+    """
+    delta = {}
+    for key, value in desired.items():
+        if key in ignore:
+            continue
+        current_value = current.get(key)
+        if key in nested and isinstance(value, Mapping):
+            nested_delta = changed_fields(current_value or {}, value, nested=())
+            if nested_delta:
+                delta[key] = nested_delta
+        elif value != current_value:
+            delta[key] = value
+    return delta
@@ -1,19 +1,35 @@
-import json
 import logging
 import os
+import queue
 import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 from json import JSONDecodeError
-from typing import Optional, Dict, Any, List, Union, Set, Tuple
+from typing import Optional, Dict, Any, List, Union, Set, Tuple, Collection, Iterator, Callable, Type
+from urllib.parse import parse_qs, urlparse
 
-from requests import Request
+from pydantic import BaseModel
+from requests import Request, Response
 from requests.exceptions import HTTPError
 
 from .api import RequestService
+from .codec import JSONCodec, default_codec
+from .deadline import Deadline, TimeoutValue, request_options
+from .models.lazy import construct_trusted
+from .streaming import iter_json_array
 
 logger = logging.getLogger(__name__)
 
 
 class GenericEndPoint:
+    """Base class of the endpoints for a FreshService resource.
+
+    The request methods build their URLs from their arguments and never modify the endpoint, so one instance can be
+    shared by many threads, or tasks for the async endpoints, sending requests at once.
+    """
+
     DEFAULT_HEADERS = {
         "Content-Type": "application/json",
     }
@@ -25,11 +41,13 @@ class GenericEndPoint:
         self._endpoint = ""
         """string extension from the base of the URL specific to each resource"""
         self.identifier: Any = None
-        """Identifier to make the instance of the endpoint specific to a resource."""
+        """Identifier of the resource used by the methods called without one.  The methods never change it."""
         self.create_command = None
         """Some resources extend the endpoint URL with a verb when creating the resource"""
         self.single_resource_key = None
         """dict key for a single resource when returned from the API."""
+        self.created_resource_key = None
+        """dict key of the created resource in the response of a create request, when not `single_resource_key`."""
         self.creation_fields: Union[List[str], Set[str], Tuple[str], None] = None
         """Optional collection of str to specify valid fields to send in create method."""
         self.read_only_fields: Union[List[str], Set[str], Tuple[str], None] = None
@@ -49,10 +67,21 @@ class GenericEndPoint:
 
     @property
     def item_extended_url(self):
-        if self.identifier is None:
+        return self.item_url()
+
+    def item_url(self, identifier: Any = None) -> str:
+        """URL of the resource with this identifier, or with `self.identifier` when not given."""
+        if identifier is None:
+            identifier = self.identifier
+        if identifier is None:
             return self.extended_url
-        else:
-            return f"{self.extended_url}/{self.identifier}"
+        return f"{self.extended_url}/{identifier}"
+
+    @property
+    def codec(self) -> JSONCodec:
+        """JSON codec of the RequestService, or the fastest codec installed."""
+        codec = getattr(self.request_service, "codec", None)
+        return codec if isinstance(codec, JSONCodec) else default_codec()
 
     @property
     def fs_create_requests_enabled(self):
@@ -62,86 +91,134 @@ class GenericEndPoint:
             else False
         )
 
-    def get(self, identifier: Any = None) -> Dict:
+    def get(self, identifier: Any = None, timeout: TimeoutValue = None) -> Dict:
         """Get a single resource from the FS API
 
         TODO: Check if identifier is already in the extended_url
+        :param identifier: Optional identifier to make the endpoint specific to particular resource.
+        :param timeout: Timeout for this request instead of the default timeout of the RequestService.
         """
-        if identifier is not None:
-            self.identifier = identifier
-        _url = f"{self.item_extended_url}"
-        response = self.send_request(_url)
+        _url = self.item_url(identifier)
+        response = self.send_request(_url, timeout=timeout)
         return response
 
-    def create(self, data: Dict, enabled: Optional[bool] = False) -> Dict:
+    def create(self, data: Dict, enabled: Optional[bool] = False, timeout: TimeoutValue = None) -> Dict:
         """Create a FreshService resource with the given data.
 
         :param data: Data to pass to FreshService API with the values for the resource
         :param enabled: A toggle to create the resource or not during development.
+        :param timeout: Timeout for this request instead of the default timeout of the RequestService.
         """
+        url = self._create_url()
+        _data_to_send = self._create_data(data)
+        if self.fs_create_requests_enabled or enabled:
+            response = self.send_request(url, method="POST", data=_data_to_send, timeout=timeout)
+        else:
+            response = self._create_disabled_response(url, data)
+        return response
+
+    def _create_url(self) -> str:
+        """URL for the create request, extended with `self.create_command` when the resource uses one."""
         url = self.extended_url
+        if self.create_command is not None:
+            url = f"{url}/{self.create_command}"
+        return url
+
+    def _create_data(self, data: Dict) -> Dict:
+        """Drop None values, fields not in `self.creation_fields` and read only fields from the data to create."""
         _data_to_send = _drop_none(data)
         _data_to_send = self._drop_not_in_creation_fields(_data_to_send)
         _data_to_send = self._drop_read_only_fields(_data_to_send)
-        if self.create_command is not None:
-            url = f"{url}/{self.create_command}"
-        if self.fs_create_requests_enabled or enabled:
-            response = self.send_request(url, method="POST", data=_data_to_send)
-        else:
-            logger.warning(
-                "Environment variable 'ALLOW_FS_CREATE_REQUESTS' must be set to 'True' to allow sending "
-                "FreshService create requests or call with create(enabled=True)."
-            )
+        return _data_to_send
+
+    def _create_disabled_response(self, url: str, data: Dict) -> Dict:
+        """Log the create request that would have been sent and return a placeholder response.
+
+        The placeholder resource is under the key of the created resource, like a real response, and has `dry_run` set
+        so callers can tell a request that wasn't sent from a created resource.
+        """
+        logger.warning(
+            "Environment variable 'ALLOW_FS_CREATE_REQUESTS' must be set to 'True' to allow sending "
+            "FreshService create requests or call with create(enabled=True)."
+        )
+        if logger.isEnabledFor(logging.INFO):
             logger.info(
                 "Would have sent 'POST' request to '%s' with data '%s'",
                 url,
-                json.dumps(data),
+                self.codec.dumps(data).decode("utf-8"),
             )
-            response = {"service_request": {"id": sys.maxsize}}
-        return response
+        key = self.created_resource_key or self.single_resource_key or "service_request"
+        return {key: {"id": sys.maxsize, "dry_run": True}}
 
-    def delete(self, identifier: Any = None) -> Dict:
+    def delete(self, identifier: Any = None, timeout: TimeoutValue = None) -> Dict:
         """Delete a resource with the FS API
 
         TODO: Check if the identifier is already in the extended_url
+        :param identifier: Identifier of the resource to delete.
+        :param timeout: Timeout for this request instead of the default timeout of the RequestService.
         """
         _method = "DELETE"
-        if identifier is not None:
-            self.identifier = identifier
-        _url = f"{self.extended_url}/{identifier}"
-        response = self.send_request(_url, method=_method)
+        _url = self.item_url(identifier)
+        response = self.send_request(_url, method=_method, timeout=timeout)
         return response
 
-    def update(self, data: Dict, identifier: Any = None) -> Dict:
+    def update(self, data: Dict, identifier: Any = None, timeout: TimeoutValue = None) -> Dict:
         """Update a resource with the FS API
 
         :param data: Dict with data to update resource.
         :param identifier: Optional identifier to make the endpoint specific to particular resource.
+        :param timeout: Timeout for this request instead of the default timeout of the RequestService.
         """
-        if identifier is not None:
-            self.identifier = identifier
         _method = "PUT"
-        _url = f"{self.item_extended_url}"
-        response = self.send_request(_url, method=_method, data=data)
+        _url = self.item_url(identifier)
+        response = self.send_request(_url, method=_method, data=data, timeout=timeout)
         return response
 
     def send_request(
-            self, url: str, method: Optional[str] = "GET", data: Optional[Dict] = None
+            self,
+            url: str,
+            method: Optional[str] = "GET",
+            data: Optional[Dict] = None,
+            timeout: TimeoutValue = None,
+            deadline: Optional[Deadline] = None,
     ) -> Dict:
         """Send the HTTP request to the FreshService API using a requests library session.
 
         TODO: Send query strings as a dict for parameters to the requests API.
+        :param timeout: Timeout for this request instead of the default timeout of the RequestService.
+        :param deadline: Deadline of the operation this request is part of.  The request isn't sent once it passed.
+        """
+        resp = self._send(url, method=method, data=data, timeout=timeout, deadline=deadline)
+        return self._decode_response(resp)
+
+    def _send(
+            self,
+            url: str,
+            method: Optional[str] = "GET",
+            data: Optional[Dict] = None,
+            timeout: TimeoutValue = None,
+            deadline: Optional[Deadline] = None,
+            stream: Optional[bool] = False,
+    ) -> Response:
+        """Send the HTTP request and return the `requests.Response` so callers can inspect the headers.
+
+        :param stream: Leave the body to be read from the response instead of reading it all when the response arrives.
         """
+        if deadline is not None:
+            if timeout is None:
+                timeout = getattr(self.request_service, "timeout", None)
+            timeout = deadline.timeout_for(timeout)
         try:
             if isinstance(data, dict):
-                data = json.dumps(data)
+                data = self.codec.dumps(data)
             logger.debug("Generating '%s' request for '%s'", method, url)
             req = Request(method, url, headers=self.DEFAULT_HEADERS, data=data)
             prepped_req = self.request_service.session.prepare_request(req)
-            resp = self.request_service.session.send(prepped_req)
+            # Read by the FreshServiceAdapter so retries and rate limit waits don't go past the deadline.
+            prepped_req.deadline = deadline
+            resp = self.request_service.session.send(prepped_req, timeout=timeout, stream=stream)
             resp.raise_for_status()
-            # Not all response objects have json content
-            return resp.json()
+            return resp
         except HTTPError as err:
             logger.error("Error encounter with send_request %s", err)
             logger.warning(
@@ -156,6 +233,18 @@ class GenericEndPoint:
                 err.response.text,
             )
             raise err
+
+    def _decode_response(self, resp: Response) -> Dict:
+        """Decode the json content of a response, or describe the response when it has no json content.
+
+        The body is decoded from the raw bytes with the codec of the RequestService instead of going through the text.
+        """
+        try:
+            # Not all response objects have json content
+            content = getattr(resp, "content", None)
+            if isinstance(content, bytes):
+                return self.codec.loads(content)
+            return resp.json()
         except JSONDecodeError as excp:
             logger.info(
                 "Not all response objects have json content. The warning for this exception can probably be"
@@ -201,6 +290,8 @@ class GenericEndPoint:
 
 class GenericPluralEndpoint(GenericEndPoint):
     DEFAULT_ITEMS_PER_PAGE = 30
+    STREAM_CHUNK_SIZE = 64 * 1024
+    """Number of bytes read from the body at a time when parsing a page incrementally."""
 
     def __init__(self, request_service: RequestService):
         super(GenericPluralEndpoint, self).__init__(request_service)
@@ -209,6 +300,8 @@ class GenericPluralEndpoint(GenericEndPoint):
         """Dictionary key used in the return data for a set of resources.  Used to access the resource in the return 
         data
         """
+        self.model_class: Optional[Type[BaseModel]] = None
+        """Model of a single resource, yielded by `iter_models`."""
 
     @property
     def items_per_page(self):
@@ -218,29 +311,242 @@ class GenericPluralEndpoint(GenericEndPoint):
             else self.DEFAULT_ITEMS_PER_PAGE
         )
 
-    def get_all(self, query=None):
+    def get_all(
+            self,
+            query=None,
+            workers: Optional[int] = None,
+            ordered: Optional[bool] = True,
+            timeout: TimeoutValue = None,
+            deadline: Union[Deadline, float, None] = None,
+            prefetch: Optional[int] = None,
+            start_page: int = 1,
+    ):
         """Sends a paginated get request for items of the resource type identified by self.plural_resource_key.
         From the list of dict in the response yields the items selected by self.plural_resource_key.
 
         Yields a list of dict items from the response selected by self.plural_resource_key until all page results are
-        returned in the request.
+        returned in the request.  Empty pages, like the page after a last full page, aren't yielded, whichever way the
+        pages are requested.
         TODO: an argument to automatically add "include=type_fields" to the query rather than have the user specifically
             include that.
+
+        :param query: Optional query string added to the paginated URL.
+        :param workers: Fetch the pages after the first one concurrently on a pool of this many threads.  Pages are
+            requested one at a time when not given.
+        :param ordered: With `workers`, yield the pages in page order when True or as they complete when False.
+        :param timeout: Timeout for each page request instead of the default timeout of the RequestService.
+        :param deadline: Seconds, or a Deadline, the whole crawl must be done in.  Raises DeadlineExceeded instead of
+            requesting a page once it passed.
+        :param prefetch: Request the next pages on a background thread while the caller works on the current one,
+            keeping at most this many pages waiting for the caller.
+        :param start_page: Number of the first page to request, to continue a crawl.
         """
-        page = 1
+        deadline = Deadline.coerce(deadline)
+        if prefetch is not None and prefetch > 0:
+            pages = self.get_all(
+                query, workers=workers, ordered=ordered, timeout=timeout, deadline=deadline, start_page=start_page
+            )
+            yield from _read_ahead(pages, prefetch)
+            return
+        request_kwargs = request_options(timeout, deadline)
+        if workers is not None and workers > 1:
+            yield from self._get_all_concurrent(query, workers, ordered, request_kwargs, start_page)
+            return
+        page = start_page
         url = self.paginate_url(query, page)
         more_results = True
         while more_results:
-            result = self.send_request(url)
+            result = self.send_request(url, **request_kwargs)
             items = result.get(self.plural_resource_key)
             if len(items) < self.items_per_page:
                 more_results = False
-                yield items
             else:
                 page += 1
                 url = self.paginate_url(query, page)
+            if items:
                 yield items
 
+    def _get_all_concurrent(self, query, workers: int, ordered: bool, request_kwargs: Dict, start_page: int = 1):
+        """Fetch the first page, then fan out the requests for the remaining pages on a bounded thread pool.
+
+        The last page is taken from the first response when it is given there, otherwise pages are requested
+        speculatively `workers` at a time until a page comes back without a 'next' link, or shorter than
+        `items_per_page`.  Only the pages already in flight then are requested past the last page.
+        """
+        resp = self._send(self.paginate_url(query, start_page), **request_kwargs)
+        result = self._decode_response(resp)
+        items = result.get(self.plural_resource_key)
+        if items:
+            yield items
+        last_page = self._last_page(resp, result, len(items), start_page)
+        if last_page is not None and last_page <= start_page:
+            return
+        next_page = start_page + 1
+        in_flight = OrderedDict()
+        """Future for each requested page, keyed by page number in the order the pages were submitted."""
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+        def fill_window():
+            nonlocal next_page
+            while len(in_flight) < workers and (last_page is None or next_page <= last_page):
+                in_flight[next_page] = executor.submit(
+                    self._get_page, self.paginate_url(query, next_page), request_kwargs
+                )
+                next_page += 1
+
+        try:
+            fill_window()
+            while in_flight:
+                if ordered:
+                    done_pages = [next(iter(in_flight))]
+                else:
+                    done, _ = wait(in_flight.values(), return_when=FIRST_COMPLETED)
+                    done_pages = [page for page, future in in_flight.items() if future in done]
+                for page in done_pages:
+                    future = in_flight.pop(page)
+                    if last_page is not None and page > last_page:
+                        continue
+                    items, has_next = future.result()
+                    is_last = has_next is False or len(items) < self.items_per_page
+                    if is_last and (last_page is None or page < last_page):
+                        last_page = page
+                        for later_page, later_future in in_flight.items():
+                            if later_page > last_page:
+                                later_future.cancel()
+                    if items:
+                        yield items
+                fill_window()
+        finally:
+            for future in in_flight.values():
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _get_page(self, url: str, request_kwargs: Dict) -> Tuple[List[Dict], Optional[bool]]:
+        """Items of a page, and whether the response has a 'next' link, None when it has no links at all."""
+        resp = self._send(url, **request_kwargs)
+        items = self._decode_response(resp).get(self.plural_resource_key)
+        links = getattr(resp, "links", None)
+        return items, ("next" in links if isinstance(links, dict) else None)
+
+    def _last_page(self, resp: Response, result: Dict, nb_items: int, page: int = 1) -> Optional[int]:
+        """Number of the last page given the response for the first page requested, or None when it can't be
+        determined.
+
+        FreshService only sets the 'link' header when there is a next page, so a full first page without one
+        is the last page.  A 'last' link or a 'total' count in the response data give the exact number of pages.
+        """
+        if nb_items < self.items_per_page:
+            return page
+        total = result.get("total")
+        if isinstance(total, int):
+            return max(1, -(-total // self.items_per_page))
+        links = getattr(resp, "links", None)
+        if not isinstance(links, dict):
+            return None
+        if "last" in links:
+            last_page = parse_qs(urlparse(links["last"].get("url", "")).query).get("page")
+            if last_page and last_page[0].isdigit():
+                return int(last_page[0])
+        if "next" not in links:
+            return page
+        return None
+
+    def iter_items(
+            self,
+            query=None,
+            limit: Optional[int] = None,
+            fields: Optional[Collection[str]] = None,
+            stream: Optional[bool] = False,
+            **kwargs
+    ) -> Iterator[Dict]:
+        """Yields the items of the resource one at a time instead of a page at a time.
+
+        Pages are only requested as the items are consumed, so stopping early or reaching `limit` doesn't fetch the
+        later pages.  Each item is released by the endpoint as soon as it's yielded.
+
+        :param query: Optional query string added to the paginated URL.
+        :param limit: Maximum number of items to yield.
+        :param fields: Only keep these keys of each item, dropped as each page is received.
+        :param stream: Parse each page incrementally as its body is received, yielding each item as soon as it's parsed
+            instead of decoding the whole page first.  Pages are requested one at a time, so `workers`, `ordered` and
+            `prefetch` raise a ValueError with it.
+        :param kwargs: Keyword arguments for `get_all`, like `workers` or `deadline`.
+        """
+        if stream:
+            unsupported = [name for name in ("workers", "ordered", "prefetch") if kwargs.get(name) is not None]
+            if unsupported:
+                raise ValueError(
+                    f"iter_items with stream=True requests the pages one at a time and doesn't take "
+                    f"{', '.join(unsupported)}."
+                )
+        if limit is not None and limit <= 0:
+            return
+        if stream:
+            items = self._stream_items(query, **kwargs)
+            try:
+                for item in islice(items, limit):
+                    yield _project(item, fields) if fields is not None else item
+            finally:
+                items.close()
+            return
+        nb_items = 0
+        pages = self.get_all(query, **kwargs)
+        try:
+            for page in pages:
+                if fields is not None:
+                    page = [_project(item, fields) for item in page]
+                page.reverse()
+                while page:
+                    yield page.pop()
+                    nb_items += 1
+                    if limit is not None and nb_items >= limit:
+                        return
+        finally:
+            pages.close()
+
+    def iter_models(
+            self,
+            query=None,
+            trusted: Optional[bool] = False,
+            model_class: Optional[Type[BaseModel]] = None,
+            **kwargs
+    ) -> Iterator[BaseModel]:
+        """Yields the items of the resource as models, like AssetFullData for assets, instead of dicts.
+
+        :param query: Optional query string added to the paginated URL.
+        :param trusted: Build the models from the responses without validating them.  Their date and datetime fields
+            are only parsed when they're first read.
+        :param model_class: Model to build instead of `self.model_class`.
+        :param kwargs: Keyword arguments for `iter_items`, like `limit` or `workers`.
+        """
+        build = _model_builder(model_class or self.model_class, trusted, self.plural_resource_key)
+        for item in self.iter_items(query, **kwargs):
+            yield build(item)
+
+    def _stream_items(
+            self,
+            query=None,
+            timeout: TimeoutValue = None,
+            deadline: Union[Deadline, float, None] = None,
+            start_page: int = 1,
+    ) -> Iterator[Dict]:
+        """Request the pages one at a time, parsing the items of each page from the body as it's received."""
+        request_kwargs = request_options(timeout, Deadline.coerce(deadline))
+        page = start_page
+        while True:
+            resp = self._send(self.paginate_url(query, page), stream=True, **request_kwargs)
+            nb_items = 0
+            try:
+                for item in iter_json_array(resp.iter_content(self.STREAM_CHUNK_SIZE), self.plural_resource_key):
+                    nb_items += 1
+                    yield item
+            finally:
+                resp.close()
+            links = getattr(resp, "links", None)
+            if nb_items < self.items_per_page or (isinstance(links, dict) and "next" not in links):
+                return
+            page += 1
+
     def paginate_url(self, query=None, page=1):
         """Add page and per_page parameters to the query string.
 
@@ -254,6 +560,64 @@ class GenericPluralEndpoint(GenericEndPoint):
         return url
 
 
+def _read_ahead(pages: Iterator[List[Dict]], size: int) -> Iterator[List[Dict]]:
+    """Consume the pages on a background thread, keeping at most `size` pages ready ahead of the caller.
+
+    The background thread waits while the buffer is full, so a slow caller never has more than `size` pages waiting
+    plus the page being requested.  Errors raised requesting a page are raised to the caller in page order.
+    """
+    buffer = queue.Queue(maxsize=size)
+    stop = threading.Event()
+
+    def put(kind: str, value: Any) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put((kind, value), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in pages:
+                if not put("page", page):
+                    return
+            put("done", None)
+        except Exception as err:
+            put("error", err)
+        finally:
+            pages.close()
+
+    thread = threading.Thread(target=produce, name="fshelper-read-ahead", daemon=True)
+    thread.start()
+    try:
+        while True:
+            kind, value = buffer.get()
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _model_builder(model_class: Optional[Type[BaseModel]], trusted: bool, resource: str) -> Callable[[Dict], BaseModel]:
+    """Function building a model from a resource, validating it unless it's `trusted`."""
+    if model_class is None:
+        raise ValueError(f"No model for the '{resource}' resource, give a model_class.")
+    if trusted:
+        return lambda item: construct_trusted(model_class, item)
+    return model_class.parse_obj
+
+
+def _project(item: Dict, fields: Collection[str]) -> Dict:
+    """New dict with only the keys of item given in fields."""
+    return {field: item[field] for field in fields if field in item}
+
+
 def _drop_none(data: Dict) -> Dict:
     """Filter None values from Dict
 
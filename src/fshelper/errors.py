@@ -0,0 +1,15 @@
+class DeadlineExceeded(TimeoutError):
+    """The deadline of an operation passed before one of its requests could be sent."""
+
+
+class InFlightTimeout(TimeoutError):
+    """A call coalesced with an identical call in flight gave up waiting for it, the call going on for the others."""
+
+
+class UnresolvedLookup(LookupError):
+    """A name or email given for a lookup field doesn't match any object in FreshService."""
+
+    def __init__(self, field: str, value):
+        super().__init__(f"No match for {field}={value!r}")
+        self.field = field
+        self.value = value
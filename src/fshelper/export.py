@@ -0,0 +1,206 @@
+import argparse
+import csv
+import gzip
+import io
+import logging
+import os
+import sys
+import time
+from typing import Collection, Dict, Iterable, Optional, Tuple
+
+from .api import Credential, RequestService
+from .endpoints import GenericPluralEndpoint
+from .v2 import (
+    AgentsEndPoint,
+    AssetsEndPoint,
+    AssetTypeEndPoint,
+    DepartmentsEndPoint,
+    GroupsEndPoint,
+    LocationsEndPoint,
+    RequestersEndPoint,
+    ServiceItemsEndPoint,
+    TicketsEndPoint,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+RESOURCES = {
+    "assets": AssetsEndPoint,
+    "asset_types": AssetTypeEndPoint,
+    "locations": LocationsEndPoint,
+    "tickets": TicketsEndPoint,
+    "service_items": ServiceItemsEndPoint,
+    "departments": DepartmentsEndPoint,
+    "requesters": RequestersEndPoint,
+    "agents": AgentsEndPoint,
+    "groups": GroupsEndPoint,
+}
+"""Plural endpoint exported for each resource name of the console command."""
+
+
+class ExportReport:
+    """Number of records and bytes written by an export, and its throughput."""
+
+    def __init__(self, nb_records: int, nb_bytes: int, elapsed: float):
+        self.nb_records = nb_records
+        self.nb_bytes = nb_bytes
+        """Number of bytes of the records, before compression."""
+        self.elapsed = elapsed
+
+    @property
+    def records_per_second(self) -> float:
+        return self.nb_records / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.nb_bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"Exported {self.nb_records} records ({self.nb_bytes} bytes) in {self.elapsed:.1f}s: "
+            f"{self.records_per_second:.1f} records/s, {self.bytes_per_second:.0f} bytes/s"
+        )
+
+
+def _write_ndjson(end_point: GenericPluralEndpoint, items: Iterable[Dict], output) -> Tuple[int, int]:
+    dumps = end_point.codec.dumps
+    nb_records = nb_bytes = 0
+    for item in items:
+        line = dumps(item) + b"\n"
+        output.write(line)
+        nb_records += 1
+        nb_bytes += len(line)
+    return nb_records, nb_bytes
+
+
+def _write_csv(
+        end_point: GenericPluralEndpoint,
+        items: Iterable[Dict],
+        output,
+        fields: Optional[Collection[str]],
+) -> Tuple[int, int]:
+    """Write the items as CSV rows, with nested values as JSON.
+
+    Without `fields`, the columns are the keys of the first item, and a later item with another key raises a ValueError
+    rather than losing it.
+    """
+    dumps = end_point.codec.dumps
+    buffer = io.StringIO()
+    writer = None
+    nb_records = nb_bytes = 0
+    for item in items:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(fields or item), extrasaction="ignore")
+            writer.writeheader()
+        elif not fields:
+            extra = [key for key in item if key not in writer.fieldnames]
+            if extra:
+                raise ValueError(
+                    f"Item {nb_records + 1} has keys missing from the CSV columns of the first item: "
+                    f"{', '.join(extra)}.  Give the fields to export."
+                )
+        writer.writerow({
+            key: dumps(value).decode("utf-8") if isinstance(value, (dict, list)) else value
+            for key, value in item.items()
+        })
+        line = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        output.write(line)
+        nb_records += 1
+        nb_bytes += len(line)
+    return nb_records, nb_bytes
+
+
+def export(
+        end_point: GenericPluralEndpoint,
+        output,
+        format: str = "ndjson",
+        query=None,
+        fields: Optional[Collection[str]] = None,
+        compress: Optional[bool] = None,
+        **kwargs
+) -> ExportReport:
+    """Stream the resources of a plural endpoint to an NDJSON or CSV file, one item at a time.
+
+    Only the pages being requested and the item being written are held in memory, however many resources there are.
+
+    :param end_point: Plural endpoint to export the resources of.
+    :param output: Path of the file to write, '-' for the standard output, or a binary file object.
+    :param format: 'ndjson' for one JSON object per line, or 'csv'.
+    :param query: Optional query string added to the paginated URL.
+    :param fields: Only export these keys of each item.  The CSV columns, in that order.  Without them, the CSV columns
+        are the keys of the first item and an item with another key raises a ValueError.
+    :param compress: Compress the output with gzip.  Defaults to True for a path ending with '.gz'.
+    :param kwargs: Keyword arguments for `iter_items`, like `workers` to request the pages concurrently.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Unknown export format {format!r}, use one of {FORMATS}.")
+    if compress is None:
+        compress = isinstance(output, (str, os.PathLike)) and os.fspath(output).endswith(".gz")
+    if output == "-":
+        raw, close_raw = sys.stdout.buffer, False
+    elif isinstance(output, (str, os.PathLike)):
+        raw, close_raw = open(output, "wb"), True
+    else:
+        raw, close_raw = output, False
+    file = gzip.GzipFile(fileobj=raw, mode="wb") if compress else raw
+    started = time.monotonic()
+    try:
+        items = end_point.iter_items(query, fields=fields, **kwargs)
+        if format == "csv":
+            nb_records, nb_bytes = _write_csv(end_point, items, file, fields)
+        else:
+            nb_records, nb_bytes = _write_ndjson(end_point, items, file)
+    finally:
+        if compress:
+            file.close()
+        if close_raw:
+            raw.close()
+        else:
+            raw.flush()
+    report = ExportReport(nb_records, nb_bytes, time.monotonic() - started)
+    logger.info("%s", report)
+    return report
+
+
+def main(argv=None):
+    """Console entry point exporting a FreshService resource to an NDJSON or CSV file."""
+    parser = argparse.ArgumentParser(
+        prog="fshelper-export", description="Export FreshService resources to an NDJSON or CSV file."
+    )
+    parser.add_argument("resource", choices=sorted(RESOURCES), help="Resource to export.")
+    parser.add_argument("output", help="File to write, '-' for the standard output.  Compressed when ending with .gz.")
+    parser.add_argument("--domain", default=os.getenv("FRESHSERVICE_DOMAIN"),
+                        help="FreshService domain, defaults to $FRESHSERVICE_DOMAIN.")
+    parser.add_argument("--api-key", default=os.getenv("FRESHSERVICE_API_KEY"),
+                        help="FreshService API key, defaults to $FRESHSERVICE_API_KEY.")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="Output format, defaults to csv for a .csv or .csv.gz output and ndjson otherwise.")
+    parser.add_argument("--query", default=None, help="Query string added to the URL, like 'include=type_fields'.")
+    parser.add_argument("--fields", default=None,
+                        help="Comma separated keys of the resources to export, the CSV columns in that order.  Without "
+                             "them, the CSV columns are the keys of the first resource and the export fails on a "
+                             "resource with another key.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of pages requested at once.")
+    parser.add_argument("--gzip", action="store_true", default=None, help="Compress the output with gzip.")
+    args = parser.parse_args(argv)
+    if not args.domain or not args.api_key:
+        parser.error("a domain and an API key are required")
+    export_format = args.format
+    if export_format is None:
+        export_format = "csv" if args.output.endswith((".csv", ".csv.gz")) else "ndjson"
+    fields = args.fields.split(",") if args.fields else None
+    with RequestService(Credential(args.api_key, "X"), args.domain) as request_service:
+        end_point = RESOURCES[args.resource](request_service)
+        report = export(
+            end_point, args.output, export_format, args.query, fields=fields, compress=args.gzip, workers=args.workers
+        )
+    print(report, file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from pydantic import BaseModel
+
+from .api import RequestService
+from .endpoints import GenericPluralEndpoint
+from .errors import UnresolvedLookup
+from .v2 import (
+    AgentsEndPoint,
+    AssetTypeEndPoint,
+    DepartmentsEndPoint,
+    GroupsEndPoint,
+    LocationsEndPoint,
+    RequestersEndPoint,
+)
+
+logger = logging.getLogger(__name__)
+
+LookupKey = Union[str, Callable[[Dict], Any]]
+"""Field of an object to index, or a function computing the indexed value from the object."""
+
+
+def _full_name(item: Dict) -> Optional[str]:
+    name = " ".join(part for part in (item.get("first_name"), item.get("last_name")) if part)
+    return name or None
+
+
+LOOKUP_TABLES = {
+    # validated_lookup_fields of the asset models, and the asset type
+    "location_id": (LocationsEndPoint, ("name",)),
+    "asset_type_id": (AssetTypeEndPoint, ("name",)),
+    "department_id": (DepartmentsEndPoint, ("name",)),
+    "user_id": (RequestersEndPoint, ("primary_email", "secondary_emails", _full_name)),
+    "agent_id": (AgentsEndPoint, ("email", _full_name)),
+    "group_id": (GroupsEndPoint, ("name",)),
+}
+"""Endpoint and indexed keys of the reference table used to resolve each lookup field."""
+
+
+def _normalize(value: Any) -> Any:
+    return value.strip().casefold() if isinstance(value, str) else value
+
+
+class LookupTable:
+    """Index of the objects of a plural endpoint by name, email or any other key, loaded with a single `get_all`.
+
+    String keys are compared case-insensitively and without surrounding whitespace.  The table is loaded on first use
+    and loaded again once it's older than `ttl` seconds.  When several objects share a key, the first one listed wins.
+    """
+
+    def __init__(self, end_point: GenericPluralEndpoint, keys: Sequence[LookupKey] = ("name",), ttl: float = 3600):
+        """Constructor for a LookupTable object
+
+        :param end_point: Plural endpoint listing the objects to index.
+        :param keys: Fields of the objects to index, or functions returning the value to index for an object.  List
+            values, like the secondary emails of a requester, index each of their elements.
+        :param ttl: Number of seconds after which the table is loaded again.  None to never reload it.
+        """
+        self.end_point = end_point
+        self.keys = keys
+        self.ttl = ttl
+        self._index: Dict[Any, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return self.ttl is not None and time.monotonic() - self._loaded_at >= self.ttl
+
+    def refresh(self):
+        """Load the objects from the API and rebuild the index."""
+        index = {}
+        for item in self.end_point.iter_items():
+            for key in self.keys:
+                values = key(item) if callable(key) else item.get(key)
+                if not isinstance(values, (list, tuple)):
+                    values = (values,)
+                for value in values:
+                    if value is not None:
+                        index.setdefault(_normalize(value), item["id"])
+        self._index = index
+        self._loaded_at = time.monotonic()
+        logger.debug("Loaded %s keys from %s", len(index), self.end_point.extended_url)
+
+    def ensure_loaded(self):
+        if self.stale:
+            with self._lock:
+                if self.stale:
+                    self.refresh()
+
+    def get(self, value: Any) -> Optional[int]:
+        """ID of the object matching `value`, or None."""
+        self.ensure_loaded()
+        return self._index.get(_normalize(value))
+
+    def __contains__(self, value: Any) -> bool:
+        return self.get(value) is not None
+
+    def __len__(self) -> int:
+        self.ensure_loaded()
+        return len(self._index)
+
+
+class LookupService:
+    """Resolves the names and emails given for the lookup fields of assets to the IDs expected by the API.
+
+    One `LookupTable` is kept for each field of `LOOKUP_TABLES` and only loaded when a value of that field has to be
+    resolved, so resolving any number of payloads costs at most one `get_all` per reference table and TTL.
+    """
+
+    def __init__(
+            self,
+            request_service: RequestService,
+            ttl: float = 3600,
+            tables: Optional[Dict[str, LookupTable]] = None,
+    ):
+        """Constructor for a LookupService object
+
+        :param request_service: RequestService to load the reference tables with.
+        :param ttl: Number of seconds after which a reference table is loaded again.
+        :param tables: LookupTable to use for some fields instead of the ones from `LOOKUP_TABLES`.
+        """
+        self.request_service = request_service
+        self.ttl = ttl
+        self.tables = {
+            field: LookupTable(end_point_class(request_service), keys, ttl)
+            for field, (end_point_class, keys) in LOOKUP_TABLES.items()
+        }
+        self.tables.update(tables or {})
+
+    @property
+    def fields(self):
+        return tuple(self.tables)
+
+    def refresh(self):
+        """Load again every reference table that has been used."""
+        for table in self.tables.values():
+            if table._loaded_at is not None:
+                table.refresh()
+
+    def resolve(self, field: str, value: Any) -> Optional[int]:
+        """ID for the value of a lookup field.
+
+        IDs and None are returned as is, other values are looked up in the reference table of the field.
+
+        :raises UnresolvedLookup: No object matches the value.
+        """
+        if value is None or isinstance(value, int):
+            return value
+        table = self.tables[field]
+        resolved = table.get(value)
+        if resolved is None:
+            raise UnresolvedLookup(field, value)
+        return resolved
+
+    def resolve_payload(self, payload: Union[Dict, BaseModel]) -> Dict:
+        """Copy of an asset payload with the names and emails of its lookup fields replaced by IDs."""
+        return self.resolve_payloads([payload])[0]
+
+    def resolve_payloads(self, payloads: Iterable[Union[Dict, BaseModel]]) -> List[Dict]:
+        """Copies of asset payloads with the names and emails of their lookup fields replaced by IDs.
+
+        Payloads can be dicts or pydantic models like `AssetCreation`.  The reference tables needed by the batch are
+        loaded before resolving any payload.
+
+        :raises UnresolvedLookup: A value doesn't match any object.
+        """
+        payloads = [
+            payload.dict(exclude_unset=True) if isinstance(payload, BaseModel) else dict(payload)
+            for payload in payloads
+        ]
+        needed = {
+            field
+            for payload in payloads
+            for field in self.fields
+            if payload.get(field) is not None and not isinstance(payload[field], int)
+        }
+        for field in needed:
+            self.tables[field].ensure_loaded()
+        for payload in payloads:
+            for field in needed.intersection(payload):
+                payload[field] = self.resolve(field, payload[field])
+        return payloads
+
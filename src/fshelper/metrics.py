@@ -0,0 +1,222 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+DEFAULT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+"""Upper bounds in seconds of the buckets of the latency histograms."""
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_label(url: str) -> str:
+    """Path of a URL without its query and with the IDs replaced, so the requests for every resource of a kind share a
+    label: '/api/v2/assets/12/requests' is '/api/v2/assets/:id/requests'."""
+    return _ID_SEGMENT.sub("/:id", urlsplit(url).path) or "/"
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, as a Prometheus histogram."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        """Number of observations in each bucket, the last one for the values above the highest bound."""
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate of the `q` quantile, interpolated linearly in its bucket like Prometheus' histogram_quantile."""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count > 0:
+                if index == len(self.buckets):
+                    return self.buckets[-1] if self.buckets else None
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1] if self.buckets else None
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class RequestMetrics:
+    """Counters and latency histograms of the requests sent through a RequestService, shared by every endpoint.
+
+    Latency is the time the caller waited for a response, including rate limit waits and retries, and is kept by
+    endpoint and method.  Only the requests that went over the wire are counted: responses served from the
+    ResponseCache are only counted as cache hits, a revalidation as a request with a 304 status, and the copies of a
+    coalesced response as coalesced requests.
+    `snapshot()` returns every metric as a dict and `to_prometheus()` renders them in the Prometheus text format.
+    """
+
+    def __init__(self, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS, namespace: str = "fshelper"):
+        """Constructor for a RequestMetrics object
+
+        :param latency_buckets: Upper bounds in seconds of the buckets of the latency histograms.
+        :param namespace: Prefix of the names of the Prometheus metrics.
+        """
+        self.latency_buckets = latency_buckets
+        self.namespace = namespace
+        self.requests: Dict[Tuple[str, str, str], int] = defaultdict(int)
+        """Number of requests by (endpoint, method, status code), with 'error' when no response was received."""
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.bytes_sent: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.bytes_received: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.retries: Dict[Tuple[str, str], int] = defaultdict(int)
+        """Number of retries by (method, reason), the status code or the exception class name."""
+        self.throttled = 0
+        """Number of 429 responses."""
+        self.rate_limit_waits = 0
+        self.rate_limit_wait_seconds = 0.0
+        self.cache: Dict[str, int] = defaultdict(int)
+        """Number of GET requests by cache outcome: 'hit', 'revalidated' or 'miss'."""
+        self.coalesced = 0
+        """Number of GET requests answered with the response of an identical request already in flight."""
+        self._lock = threading.Lock()
+
+    def observe_request(
+            self,
+            method: str,
+            url: str,
+            status: Union[int, str],
+            elapsed: float,
+            bytes_sent: int = 0,
+            bytes_received: int = 0,
+    ):
+        key = (endpoint_label(url), method)
+        with self._lock:
+            self.requests[key + (str(status),)] += 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(self.latency_buckets)
+            histogram.observe(elapsed)
+            self.bytes_sent[key] += bytes_sent
+            self.bytes_received[key] += bytes_received
+
+    def observe_retry(self, method: str, reason: Union[int, Exception]):
+        reason = str(reason) if isinstance(reason, int) else type(reason).__name__
+        with self._lock:
+            self.retries[(method, reason)] += 1
+
+    def observe_throttle(self):
+        with self._lock:
+            self.throttled += 1
+
+    def observe_rate_limit_wait(self, wait: float):
+        if wait <= 0:
+            return
+        with self._lock:
+            self.rate_limit_waits += 1
+            self.rate_limit_wait_seconds += wait
+
+    def observe_cache(self, outcome: str):
+        with self._lock:
+            self.cache[outcome] += 1
+
+    def observe_coalesced(self):
+        with self._lock:
+            self.coalesced += 1
+
+    def reset(self):
+        with self._lock:
+            for counters in (self.requests, self.bytes_sent, self.bytes_received, self.retries, self.cache):
+                counters.clear()
+            self.latency.clear()
+            self.throttled = 0
+            self.rate_limit_waits = 0
+            self.rate_limit_wait_seconds = 0.0
+            self.coalesced = 0
+
+    def snapshot(self) -> Dict:
+        """Every metric as plain dicts, keyed by 'METHOD endpoint' for the metrics by endpoint."""
+        with self._lock:
+            return {
+                "requests": {f"{method} {endpoint} {status}": count
+                             for (endpoint, method, status), count in self.requests.items()},
+                "latency": {f"{method} {endpoint}": histogram.snapshot()
+                            for (endpoint, method), histogram in self.latency.items()},
+                "bytes_sent": {f"{method} {endpoint}": count for (endpoint, method), count in self.bytes_sent.items()},
+                "bytes_received": {f"{method} {endpoint}": count
+                                   for (endpoint, method), count in self.bytes_received.items()},
+                "retries": {f"{method} {reason}": count for (method, reason), count in self.retries.items()},
+                "throttled": self.throttled,
+                "rate_limit_waits": self.rate_limit_waits,
+                "rate_limit_wait_seconds": self.rate_limit_wait_seconds,
+                "cache": dict(self.cache),
+                "coalesced": self.coalesced,
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        ns = self.namespace
+        lines = []
+
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {ns}_{name} {help_text}")
+            lines.append(f"# TYPE {ns}_{name} {kind}")
+
+        with self._lock:
+            header("requests_total", "counter", "Requests sent to the FreshService API.")
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f"{ns}_requests_total{_labels(endpoint=endpoint, method=method, status=status)} {count}")
+            header("request_duration_seconds", "histogram", "Time waited for a response.")
+            for (endpoint, method), histogram in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    labels = _labels(endpoint=endpoint, method=method, le=le)
+                    lines.append(f"{ns}_request_duration_seconds_bucket{labels} {cumulative}")
+                labels = _labels(endpoint=endpoint, method=method)
+                lines.append(f"{ns}_request_duration_seconds_sum{labels} {histogram.sum}")
+                lines.append(f"{ns}_request_duration_seconds_count{labels} {histogram.count}")
+            for name, counters, help_text in (
+                    ("request_bytes_total", self.bytes_sent, "Bytes sent in request bodies."),
+                    ("response_bytes_total", self.bytes_received, "Bytes received in response bodies."),
+            ):
+                header(name, "counter", help_text)
+                for (endpoint, method), count in sorted(counters.items()):
+                    lines.append(f"{ns}_{name}{_labels(endpoint=endpoint, method=method)} {count}")
+            header("retries_total", "counter", "Requests sent again after a transient error.")
+            for (method, reason), count in sorted(self.retries.items()):
+                lines.append(f"{ns}_retries_total{_labels(method=method, reason=reason)} {count}")
+            header("throttled_total", "counter", "429 responses received.")
+            lines.append(f"{ns}_throttled_total {self.throttled}")
+            header("rate_limit_waits_total", "counter", "Requests delayed by the rate limiter.")
+            lines.append(f"{ns}_rate_limit_waits_total {self.rate_limit_waits}")
+            header("rate_limit_wait_seconds_total", "counter", "Time spent waiting for the rate limiter.")
+            lines.append(f"{ns}_rate_limit_wait_seconds_total {self.rate_limit_wait_seconds}")
+            header("cache_requests_total", "counter", "GET requests by response cache outcome.")
+            for outcome, count in sorted(self.cache.items()):
+                lines.append(f"{ns}_cache_requests_total{_labels(outcome=outcome)} {count}")
+            header("coalesced_requests_total", "counter", "GET requests sharing the response of a request in flight.")
+            lines.append(f"{ns}_coalesced_requests_total {self.coalesced}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: str) -> str:
+    escaped = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,259 @@
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Optional, Set
+from urllib.parse import quote
+
+from requests.exceptions import HTTPError
+
+from .api import RequestService
+from .codec import JSONCodec, default_codec
+from .v2 import AssetsEndPoint, AssetTypeEndPoint, LocationsEndPoint
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    display_id INTEGER PRIMARY KEY,
+    id INTEGER,
+    name TEXT,
+    asset_tag TEXT,
+    asset_type_id INTEGER,
+    location_id INTEGER,
+    updated_at TEXT,
+    deleted INTEGER NOT NULL DEFAULT 0,  -- 0 live, 1 in the trash, 2 purged from the trash
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS assets_asset_tag ON assets (asset_tag);
+CREATE INDEX IF NOT EXISTS assets_updated_at ON assets (updated_at);
+CREATE TABLE IF NOT EXISTS locations (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS asset_types (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    resource TEXT PRIMARY KEY,
+    high_water_mark TEXT,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+class InventoryMirror:
+    """Local SQLite copy of the assets of a FreshService account, with their locations and asset types.
+
+    The first `sync()` downloads every asset.  Later syncs only request the assets updated since the high-water mark,
+    the latest 'updated_at' stored, and the whole trash to mark deleted assets with a tombstone.  An asset with a
+    tombstone missing from the trash is requested again: a restored asset is updated and loses its tombstone, a purged
+    one is marked purged.  An asset deleted and purged between two syncs is in neither list, so only a full sync, which
+    sees every asset, marks it purged.  Locations and asset types are small and downloaded again on every sync.
+
+    Use this class with a context manager or call close() when done.
+    """
+
+    BATCH_SIZE = 500
+    """Number of rows written between commits during a sync."""
+
+    def __init__(self, path: str, request_service: RequestService):
+        """Constructor for an InventoryMirror object
+
+        :param path: Path of the SQLite database file, created when it doesn't exist.  ':memory:' for a database in
+            memory.
+        :param request_service: RequestService to download the inventory with.
+        """
+        self.path = path
+        self.request_service = request_service
+        codec = getattr(request_service, "codec", None)
+        self.codec = codec if isinstance(codec, JSONCodec) else default_codec()
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @property
+    def high_water_mark(self) -> Optional[str]:
+        """Latest 'updated_at' of the assets stored by the previous syncs."""
+        row = self.connection.execute(
+            "SELECT high_water_mark FROM sync_state WHERE resource = 'assets'"
+        ).fetchone()
+        return row["high_water_mark"] if row is not None else None
+
+    def sync(self, full: Optional[bool] = False) -> Dict[str, int]:
+        """Bring the mirror up to date with FreshService and return the number of rows written for each table.
+
+        :param full: Download every asset again instead of the assets updated since the high-water mark, marking the
+            stored assets missing from both the inventory and the trash as purged.
+        """
+        counts = {
+            "locations": self._replace_reference_table("locations", LocationsEndPoint(self.request_service)),
+            "asset_types": self._replace_reference_table("asset_types", AssetTypeEndPoint(self.request_service)),
+        }
+        high_water_mark = None if full else self.high_water_mark
+        counts["assets"], new_high_water_mark, seen = self._sync_assets(high_water_mark)
+        counts["deleted"], counts["restored"] = self._sync_tombstones(seen)
+        self._set_sync_state("assets", new_high_water_mark or high_water_mark)
+        logger.info("Inventory mirror synced: %s", counts)
+        return counts
+
+    def assets(self, include_deleted: Optional[bool] = False) -> Iterator[Dict]:
+        """Yields the stored assets, without the deleted ones unless `include_deleted` is set."""
+        sql = "SELECT data FROM assets" if include_deleted else "SELECT data FROM assets WHERE deleted = 0"
+        for row in self.connection.execute(sql):
+            yield self.codec.loads(row["data"])
+
+    def asset(self, display_id: int) -> Optional[Dict]:
+        row = self.connection.execute("SELECT data FROM assets WHERE display_id = ?", (display_id,)).fetchone()
+        return self.codec.loads(row["data"]) if row is not None else None
+
+    def locations(self) -> Iterator[Dict]:
+        for row in self.connection.execute("SELECT data FROM locations"):
+            yield self.codec.loads(row["data"])
+
+    def asset_types(self) -> Iterator[Dict]:
+        for row in self.connection.execute("SELECT data FROM asset_types"):
+            yield self.codec.loads(row["data"])
+
+    def updated_since_query(self, high_water_mark: str) -> str:
+        """Query string for the assets updated since the high-water mark.
+
+        The FreshService filter compares dates, so the assets of the day before the high-water mark are requested again
+        to not miss updates made the same second; storing them again is harmless.
+        """
+        since = (_parse_datetime(high_water_mark) - timedelta(days=1)).strftime("%Y-%m-%d")
+        return "include=type_fields&filter=" + quote(f"\"updated_at:>'{since}'\"")
+
+    def _sync_assets(self, high_water_mark: Optional[str]):
+        """Store the assets updated since the high-water mark, or every asset and the set of their display IDs."""
+        query = self.updated_since_query(high_water_mark) if high_water_mark else "include=type_fields"
+        nb_assets = 0
+        new_high_water_mark = high_water_mark
+        seen = set() if high_water_mark is None else None
+        rows = []
+        for asset in AssetsEndPoint(self.request_service).iter_items(query):
+            rows.append(_asset_row(asset, self.codec))
+            if seen is not None:
+                seen.add(asset.get("display_id"))
+            updated_at = asset.get("updated_at")
+            if updated_at and (new_high_water_mark is None or updated_at > new_high_water_mark):
+                new_high_water_mark = updated_at
+            if len(rows) >= self.BATCH_SIZE:
+                nb_assets += self._upsert_assets(rows)
+                rows = []
+        nb_assets += self._upsert_assets(rows)
+        return nb_assets, new_high_water_mark, seen
+
+    def _upsert_assets(self, rows) -> int:
+        with self.connection:
+            self._write_assets(rows)
+        return len(rows)
+
+    def _write_assets(self, rows):
+        """Store live assets, in the transaction of the caller."""
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO assets "
+            "(display_id, id, name, asset_tag, asset_type_id, location_id, updated_at, deleted, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+            rows,
+        )
+
+    def _sync_tombstones(self, seen: Optional[Set[int]] = None):
+        """Mark the assets in the trash as deleted and clear the tombstone of the restored ones.
+
+        :param seen: Display IDs of every asset in the inventory, after a full sync, to mark the other stored assets as
+            purged.
+        :return: The number of assets marked deleted or purged, and of assets restored.
+        """
+        end_point = AssetsEndPoint(self.request_service)
+        trashed = list(end_point.iter_items("trashed=true"))
+        trashed_ids = {asset.get("display_id") for asset in trashed}
+        restored, purged = [], []
+        for row in self.connection.execute("SELECT display_id FROM assets WHERE deleted = 1").fetchall():
+            if row["display_id"] in trashed_ids:
+                continue
+            asset = self._current_asset(end_point, row["display_id"])
+            if asset is not None:
+                restored.append(_asset_row(asset, self.codec))
+            else:
+                purged.append((row["display_id"],))
+        if seen is not None:
+            purged.extend(
+                (row["display_id"],)
+                for row in self.connection.execute("SELECT display_id FROM assets WHERE deleted = 0").fetchall()
+                if row["display_id"] not in seen and row["display_id"] not in trashed_ids
+            )
+        nb_deleted = 0
+        with self.connection:
+            for asset in trashed:
+                cursor = self.connection.execute(
+                    "UPDATE assets SET deleted = 1 WHERE display_id = ? AND deleted <> 1", (asset.get("display_id"),)
+                )
+                if cursor.rowcount == 0:
+                    cursor = self.connection.execute(
+                        "INSERT OR IGNORE INTO assets "
+                        "(display_id, id, name, asset_tag, asset_type_id, location_id, updated_at, deleted, data) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)",
+                        _asset_row(asset, self.codec),
+                    )
+                nb_deleted += cursor.rowcount
+            self.connection.executemany("UPDATE assets SET deleted = 2 WHERE display_id = ?", purged)
+            self._write_assets(restored)
+        return nb_deleted + len(purged), len(restored)
+
+    def _current_asset(self, end_point: AssetsEndPoint, display_id: int) -> Optional[Dict]:
+        """Current state of an asset missing from the trash, None when it was purged from the trash."""
+        try:
+            response = end_point.send_request(f"{end_point.item_url(display_id)}?include=type_fields")
+        except HTTPError as err:
+            if err.response is not None and err.response.status_code == 404:
+                return None
+            raise
+        return response.get(end_point.single_resource_key)
+
+    def _replace_reference_table(self, table: str, end_point) -> int:
+        rows = [
+            (item.get("id"), item.get("name"), self.codec.dumps(item).decode("utf-8"))
+            for item in end_point.iter_items()
+        ]
+        with self.connection:
+            self.connection.execute(f"DELETE FROM {table}")
+            self.connection.executemany(f"INSERT INTO {table} (id, name, data) VALUES (?, ?, ?)", rows)
+        self._set_sync_state(table, None)
+        return len(rows)
+
+    def _set_sync_state(self, resource: str, high_water_mark: Optional[str]):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (resource, high_water_mark, synced_at) VALUES (?, ?, ?)",
+                (resource, high_water_mark, datetime.now(timezone.utc).isoformat()),
+            )
+
+
+def _asset_row(asset: Dict, codec: JSONCodec):
+    return (
+        asset.get("display_id"),
+        asset.get("id"),
+        asset.get("name"),
+        asset.get("asset_tag"),
+        asset.get("asset_type_id"),
+        asset.get("location_id"),
+        asset.get("updated_at"),
+        codec.dumps(asset).decode("utf-8"),
+    )
+
+
+def _parse_datetime(value: str) -> datetime:
+    """datetime from the ISO 8601 timestamps of the FreshService API, like '2023-05-26T07:19:06Z'."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
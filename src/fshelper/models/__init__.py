@@ -4,5 +4,9 @@ from .asset import (
     AssetUpdate,
     AssetFullData,
     TypeField,
+    create_type_field_model,
     validated_lookup_fields,
 )
+from .asset_type import AssetTypeData
+from .location import LocationData
+from .lazy import construct_trusted
@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Type, Union
 
 from pydantic import BaseModel, Extra, create_model
 
@@ -62,7 +62,7 @@ class AssetFullData(AssetUpdate):
     updated_at: Optional[datetime] = None
 
 
-def __create_type_field_model(*args, **kwargs) -> TypeField:
+def __create_type_field_model(*args, **kwargs) -> Type[TypeField]:
     """Dynamically create a TypeField model.
 
     :param __model_name: name of the created model
@@ -82,11 +82,51 @@ def __create_type_field_model(*args, **kwargs) -> TypeField:
     __cls_kwargs__ – a dict for class creation
     field_definitions – fields of the model (or extra fields if a base is supplied) in the format ` =( ,  )` or ` = , e.g. `foobar=(str, ...)` or `foobar=123`, or, for complex use-cases, in the format ` = `, e.g. `foo=Field(default_factory=datetime.utcnow, alias='bar')`
     """
-    kwargs["__base__"] == "TypeFields"
+    kwargs.setdefault("__base__", TypeField)
     dynamic_type_field_model = create_model(*args, **kwargs)
     return dynamic_type_field_model
 
 
+type_field_data_types = {
+    "text": str,
+    "paragraph": str,
+    "dropdown": str,
+    "number": int,
+    "decimal": float,
+    "checkbox": bool,
+    "date": Union[datetime, date],
+    "lookup": int,
+}
+"""Python type of the values for each 'data_type' of the asset type fields.  Other data types accept any value.
+
+Date fields keep the shape of their value: a timestamp is a datetime and a date without a time stays a date, so the
+value written back is the one read.
+"""
+
+
+def create_type_field_model(
+        asset_type_id: int,
+        fields: Iterable[Dict],
+        for_update: Optional[bool] = False,
+) -> Type[TypeField]:
+    """Create the TypeField model validating the type_fields of the assets of an asset type.
+
+    :param asset_type_id: ID of the asset type, used to name the model.
+    :param fields: Field definitions of the asset type, as returned by `AssetTypeEndPoint.get_fields`.
+    :param for_update: Model for the type_fields of an update, with every field optional so an update can set only
+        some of them.  The mandatory fields are required otherwise, as when creating an asset.
+    """
+    field_definitions = {}
+    for field in fields:
+        python_type = type_field_data_types.get(field.get("data_type"), Any)
+        if not for_update and (field.get("mandatory") or field.get("required")):
+            field_definitions[field["name"]] = (python_type, ...)
+        else:
+            field_definitions[field["name"]] = (Optional[python_type], None)
+    model_name = f"TypeField{asset_type_id}Update" if for_update else f"TypeField{asset_type_id}"
+    return __create_type_field_model(model_name, **field_definitions)
+
+
 validated_lookup_fields = (
     "user_id",
     "department_id",
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Extra
+
+
+class AssetTypeData(BaseModel):
+    """Model for a FreshService asset type as returned by the API.
+
+    https://api.freshservice.com/#asset_types
+    """
+
+    id: int
+    name: str
+    description: Optional[str] = None
+    parent_asset_type_id: Optional[int] = None
+    visible: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        extra = Extra.allow
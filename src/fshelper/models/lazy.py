@@ -0,0 +1,58 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Type, TypeVar
+
+from pydantic import BaseModel, Extra
+from pydantic.datetime_parse import parse_date, parse_datetime
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_parsers = {datetime: parse_datetime, date: parse_date}
+
+
+class _LazyDateField:
+    """Parse the value of a date or datetime field the first time it's read, and keep the parsed value."""
+
+    def __init__(self, name: str, parse):
+        self.name = name
+        self.parse = parse
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = instance.__dict__.get(self.name)
+        if isinstance(value, (str, int, float)):
+            value = self.parse(value)
+            instance.__dict__[self.name] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+
+
+@lru_cache(maxsize=None)
+def lazy_model(model_class: Type[Model]) -> Type[Model]:
+    """Subclass of a model parsing its date and datetime fields when they're first read, for `construct_trusted`."""
+    lazy_class = type(model_class.__name__, (model_class,), {"__module__": model_class.__module__})
+    for name, field in model_class.__fields__.items():
+        parse = _parsers.get(field.type_)
+        if parse is not None:
+            setattr(lazy_class, name, _LazyDateField(name, parse))
+    return lazy_class
+
+
+def construct_trusted(model_class: Type[Model], data: Dict) -> Model:
+    """Build a model from data trusted to be valid, like a response from the API, without validating it.
+
+    Nested models are built the same way.  Date and datetime fields are parsed when they're first read, so `dict()`
+    returns the original strings of the ones that haven't been read.
+    """
+    if model_class.__config__.extra == Extra.allow:
+        values = dict(data)
+    else:
+        values = {name: value for name, value in data.items() if name in model_class.__fields__}
+    for name, field in model_class.__fields__.items():
+        value = values.get(name)
+        if isinstance(value, dict) and isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            values[name] = construct_trusted(field.type_, value)
+    return lazy_model(model_class).construct(**values)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, Extra
+
+
+class LocationData(BaseModel):
+    """Model for a FreshService location as returned by the API.
+
+    https://api.freshservice.com/#locations
+    """
+
+    id: int
+    name: str
+    parent_location_id: Optional[int] = None
+    primary_contact_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        extra = Extra.allow
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from .deadline import Deadline
+from .errors import DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket pacing the requests sent with a RequestService to the FreshService rate limit.
+
+    https://api.freshservice.com/#ratelimit
+    The bucket starts with `requests_per_minute` tokens and refills at `requests_per_minute / 60` tokens a second.  When
+    `requests_per_minute` isn't given, requests aren't paced until the 'X-RateLimit-Total' header of a response gives
+    the limit for the account.  The bucket is also drained to the 'X-RateLimit-Remaining' header so requests sent with
+    other tools against the same account are accounted for.  A 429 response pauses every caller until its
+    'Retry-After' has passed.
+
+    Callers take a token with `acquire()` and are queued in the order they called by letting the bucket go negative, so
+    one instance can be shared by every thread sending requests with the same RequestService.
+    """
+
+    DEFAULT_RETRY_AFTER = 60
+    """Seconds to pause when a 429 response has no usable 'Retry-After' header."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, max_requeues: Optional[int] = 3):
+        """Constructor for a RateLimiter object
+
+        :param requests_per_minute: Rate limit of the FreshService account.  Learned from the response headers when not
+            given.
+        :param max_requeues: Number of times a request answered with a 429 response is queued and sent again before the
+            429 response is returned to the caller.
+        """
+        self.max_requeues = max_requeues
+        self.requests_per_minute = requests_per_minute
+        self._tokens = float(requests_per_minute) if requests_per_minute else 0.0
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.nb_waits = 0
+        """Number of times a caller had to wait for a token."""
+        self.total_wait = 0.0
+        """Total seconds callers have waited for a token."""
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Tokens currently left in the bucket, or None while the rate limit isn't known."""
+        if not self.requests_per_minute:
+            return None
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def acquire(self, deadline: Optional[Deadline] = None) -> float:
+        """Take a token, sleeping until it's available.  Returns the number of seconds waited.
+
+        :param deadline: Deadline of the request.  Raises DeadlineExceeded instead of waiting past it, giving the token
+            back so the callers queued after it don't wait for a request that isn't sent.
+        """
+        wait = self.reserve()
+        if deadline is not None:
+            try:
+                deadline.check_wait(wait, "Waiting for the FreshService rate limit for")
+            except DeadlineExceeded:
+                self.release(wait)
+                raise
+        if wait > 0:
+            logger.debug("Waiting %.3f seconds for the FreshService rate limit", wait)
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, deadline: Optional[Deadline] = None) -> float:
+        """Take a token, awaiting until it's available.  Returns the number of seconds waited.
+
+        :param deadline: Deadline of the request.  Raises DeadlineExceeded instead of waiting past it, giving the token
+            back so the callers queued after it don't wait for a request that isn't sent.
+        """
+        wait = self.reserve()
+        if deadline is not None:
+            try:
+                deadline.check_wait(wait, "Waiting for the FreshService rate limit for")
+            except DeadlineExceeded:
+                self.release(wait)
+                raise
+        if wait > 0:
+            logger.debug("Waiting %.3f seconds for the FreshService rate limit", wait)
+            await asyncio.sleep(wait)
+        return wait
+
+    def reserve(self) -> float:
+        """Take a token and return the number of seconds to wait before sending the request."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait = max(0.0, self._blocked_until - now)
+            if self.requests_per_minute:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens * 60 / self.requests_per_minute)
+            if wait > 0:
+                self.nb_waits += 1
+                self.total_wait += wait
+            return wait
+
+    def release(self, wait: float = 0.0) -> None:
+        """Give back a token taken by `reserve()` for a request that isn't sent.
+
+        :param wait: Seconds to wait returned by `reserve()`, removed from the wait statistics.
+        """
+        with self._lock:
+            if self.requests_per_minute:
+                self._tokens += 1
+            if wait > 0:
+                self.nb_waits -= 1
+                self.total_wait -= wait
+
+    def update(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adjust the bucket to the rate limit headers of a FreshService response."""
+        total = _int_header(headers, "X-RateLimit-Total")
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if total and total != self.requests_per_minute:
+                if not self.requests_per_minute:
+                    self._tokens = float(total)
+                self.requests_per_minute = total
+            if remaining is not None:
+                # 'X-RateLimit-Remaining' already counts the requests the server received, ours included, so it
+                # replaces the bucket when lower instead of being subtracted from it and those requests aren't counted
+                # twice.  Our requests still in flight that the server hasn't received yet are in neither, so the bucket
+                # can be over by their number until their responses arrive; a 429 then pauses every caller.
+                self._tokens = min(self._tokens, float(remaining))
+            if status_code == 429:
+                retry_after = _retry_after(headers.get("Retry-After"), self.DEFAULT_RETRY_AFTER)
+                logger.warning("FreshService rate limit reached, pausing requests for %s seconds", retry_after)
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self._tokens = min(self._tokens, 0.0)
+
+    def _refill(self, now: float) -> None:
+        if self.requests_per_minute:
+            refill = (now - self._updated_at) * self.requests_per_minute / 60
+            self._tokens = min(float(self.requests_per_minute), self._tokens + refill)
+        self._updated_at = now
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_after(value: Optional[str], default: float) -> float:
+    """Seconds to wait from a 'Retry-After' header given either as a number of seconds or an HTTP date."""
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
@@ -0,0 +1,257 @@
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .bulk import BulkResult, run_bulk
+from .diff import changed_fields
+from .models import AssetCreation
+from .v2 import AssetsEndPoint
+from .v2.assets import _asset_data
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+RESTORE = "restore"
+DELETE = "delete"
+
+
+class ReconciliationPlan:
+    """Changes bringing the assets of FreshService to the desired state, computed by `Reconciler.plan`."""
+
+    def __init__(self):
+        self.creates: List[Dict] = []
+        """Data of the assets to create."""
+        self.updates: List[Tuple[int, Dict]] = []
+        """(display_id, changed fields) of the assets to update."""
+        self.restores: List[Tuple[int, Dict]] = []
+        """(display_id, changed fields) of the assets to restore from the trash, then update when there are changes."""
+        self.deletes: List[int] = []
+        """Display IDs of the assets missing from the desired state, when deleting them."""
+        self.unchanged = 0
+        self.invalid: List[Dict] = []
+        """Desired assets without a key."""
+
+    def actions(self) -> Iterable[Tuple[str, Optional[int], Optional[Dict]]]:
+        """(action, display_id, data) for each request to send, the restores first and the deletes last."""
+        for display_id, delta in self.restores:
+            yield RESTORE, display_id, delta
+        for data in self.creates:
+            yield CREATE, None, data
+        for display_id, delta in self.updates:
+            yield UPDATE, display_id, delta
+        for display_id in self.deletes:
+            yield DELETE, display_id, None
+
+    def __len__(self):
+        return len(self.creates) + len(self.updates) + len(self.restores) + len(self.deletes)
+
+    def __repr__(self):
+        return (
+            f"ReconciliationPlan(creates={len(self.creates)}, updates={len(self.updates)}, "
+            f"restores={len(self.restores)}, deletes={len(self.deletes)}, unchanged={self.unchanged})"
+        )
+
+
+class ReconciliationReport:
+    """Outcome of a reconciliation: the number of assets in each state and the errors of the failed actions."""
+
+    def __init__(self, plan: ReconciliationPlan, dry_run: bool):
+        self.plan = plan
+        self.dry_run = dry_run
+        """True when the plan wasn't sent, the counts are then the planned actions."""
+        self.created = 0
+        self.updated = 0
+        self.restored = 0
+        self.deleted = 0
+        self.unchanged = plan.unchanged
+        self.invalid = len(plan.invalid)
+        self.failures: List[BulkResult] = []
+        """Result of each failed action, with the (action, display_id, data) payload and the error."""
+        self.elapsed = 0.0
+
+    @property
+    def failed(self) -> int:
+        return len(self.failures)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def count(self, action: str):
+        if action == CREATE:
+            self.created += 1
+        elif action == UPDATE:
+            self.updated += 1
+        elif action == RESTORE:
+            self.restored += 1
+        elif action == DELETE:
+            self.deleted += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "dry_run": self.dry_run,
+            "created": self.created,
+            "updated": self.updated,
+            "restored": self.restored,
+            "deleted": self.deleted,
+            "unchanged": self.unchanged,
+            "invalid": self.invalid,
+            "failed": self.failed,
+            "elapsed": self.elapsed,
+        }
+
+    def __str__(self):
+        prefix = "Dry run, would have " if self.dry_run else ""
+        return (
+            f"{prefix}created {self.created}, updated {self.updated}, restored {self.restored}, deleted {self.deleted} "
+            f"assets, {self.unchanged} unchanged, {self.invalid} invalid, {self.failed} failed in {self.elapsed:.1f}s"
+        )
+
+
+class Reconciler:
+    """Bring the assets of FreshService to a desired state, like the hardware of a CMDB export.
+
+    The desired assets are matched to the current ones by `key`, `asset_tag` by default.  The current inventory and
+    the trash are read once into an index by key, so planning is linear in the number of assets:
+
+    - a desired asset missing from FreshService is created,
+    - a desired asset in the trash is restored, and updated when it differs,
+    - a desired asset differing from its current state is updated with only the changed fields,
+    - a current asset missing from the desired state is deleted when `delete_missing` is set.
+
+    The plan is executed on a pool of threads sharing the rate limiter of the RequestService.  Like `create`, nothing is
+    sent unless the environment variable 'ALLOW_FS_CREATE_REQUESTS' is 'True' or `enabled` is given, and the report
+    then counts the planned actions.
+    """
+
+    def __init__(
+            self,
+            end_point: AssetsEndPoint,
+            key: str = "asset_tag",
+            delete_missing: Optional[bool] = False,
+            workers: Optional[int] = 4,
+            query: Optional[str] = "include=type_fields",
+    ):
+        """Constructor for a Reconciler object
+
+        :param end_point: AssetsEndPoint to read and update the assets with.
+        :param key: Field identifying an asset in both the desired and current states.
+        :param delete_missing: Delete the current assets with a key that are missing from the desired state.
+        :param workers: Number of threads sending requests at once.
+        :param query: Query string for reading the current assets, with their type_fields by default.
+        """
+        self.end_point = end_point
+        self.key = key
+        self.delete_missing = delete_missing
+        self.workers = workers
+        self.query = query
+
+    def index(self) -> Tuple[Dict, Dict]:
+        """Current assets and assets in the trash by key.  Assets without a key are left out."""
+        current = {}
+        for asset in self.end_point.iter_items(self.query):
+            value = asset.get(self.key)
+            if value is not None:
+                current[value] = asset
+        trashed = {}
+        trash_query = f"{self.query}&trashed=true" if self.query else "trashed=true"
+        for asset in self.end_point.iter_items(trash_query):
+            value = asset.get(self.key)
+            if value is not None and value not in current:
+                trashed[value] = asset
+        logger.info("Indexed %d current and %d trashed assets by '%s'", len(current), len(trashed), self.key)
+        return current, trashed
+
+    def plan(
+            self,
+            desired: Iterable[Union[Dict, AssetCreation]],
+            current: Optional[Dict] = None,
+            trashed: Optional[Dict] = None,
+    ) -> ReconciliationPlan:
+        """Changes bringing the assets to the desired state.
+
+        :param desired: dicts or AssetCreation models of the assets that should exist.  When a key appears more than
+            once, the last asset wins.
+        :param current: Current assets by key, read with `index()` when not given.
+        :param trashed: Assets in the trash by key, read with `index()` when `current` isn't given.
+        """
+        if current is None:
+            current, trashed = self.index()
+        trashed = trashed or {}
+        ignore = tuple(self.end_point.read_only_fields or ())
+        plan = ReconciliationPlan()
+        by_key = {}
+        for asset in desired:
+            data = _asset_data(asset)
+            value = data.get(self.key)
+            if value is None:
+                plan.invalid.append(data)
+                continue
+            if value in by_key:
+                logger.warning("Desired state has '%s' = %r more than once, keeping the last one", self.key, value)
+            by_key[value] = data
+        for value, data in by_key.items():
+            if value in current:
+                existing = current[value]
+                delta = changed_fields(existing, data, ignore=ignore)
+                if delta:
+                    plan.updates.append((existing["display_id"], delta))
+                else:
+                    plan.unchanged += 1
+            elif value in trashed:
+                existing = trashed[value]
+                plan.restores.append((existing["display_id"], changed_fields(existing, data, ignore=ignore)))
+            else:
+                plan.creates.append(data)
+        if self.delete_missing:
+            plan.deletes.extend(
+                asset["display_id"] for value, asset in current.items() if value not in by_key
+            )
+        logger.info("Planned %s", plan)
+        return plan
+
+    def execute(self, plan: ReconciliationPlan, enabled: Optional[bool] = False) -> ReconciliationReport:
+        """Send the requests of a plan, or only report them when sending isn't enabled.
+
+        :param plan: Plan from `plan()`.
+        :param enabled: A toggle to send the requests or not during development, as for `create`.
+        """
+        started = time.monotonic()
+        dry_run = not (enabled or self.end_point.fs_create_requests_enabled)
+        report = ReconciliationReport(plan, dry_run)
+        if dry_run:
+            for action, display_id, data in plan.actions():
+                logger.info("Would have sent '%s' for asset %s with data '%s'", action, display_id, data)
+                report.count(action)
+        else:
+            for result in run_bulk(self._apply, plan.actions(), workers=self.workers):
+                if result.ok:
+                    report.count(result.payload[0])
+                else:
+                    report.failures.append(result)
+        report.elapsed = time.monotonic() - started
+        logger.info("%s", report)
+        return report
+
+    def reconcile(
+            self,
+            desired: Iterable[Union[Dict, AssetCreation]],
+            enabled: Optional[bool] = False,
+    ) -> ReconciliationReport:
+        """Plan the changes bringing the assets to the desired state and execute them."""
+        return self.execute(self.plan(desired), enabled=enabled)
+
+    def _apply(self, action: Tuple[str, Optional[int], Optional[Dict]]) -> Optional[Dict]:
+        kind, display_id, data = action
+        end_point = self.end_point
+        if kind == CREATE:
+            return end_point.create(data, enabled=True).get(end_point.single_resource_key)
+        if kind == DELETE:
+            end_point.delete(display_id)
+            return {"display_id": display_id}
+        if kind == RESTORE:
+            end_point.restore(display_id)
+            if not data:
+                return {"display_id": display_id}
+        return end_point.update(data, display_id).get(end_point.single_resource_key)
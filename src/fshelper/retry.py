@@ -0,0 +1,92 @@
+import logging
+import random
+from typing import Callable, Collection, Mapping, Optional, Union
+
+from .ratelimit import _retry_after
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"))
+
+
+class RetryPolicy:
+    """Policy for sending a request again after a transient error, with exponential backoff and jitter.
+
+    The delay before attempt `n + 1` is `min(backoff_cap, backoff_base * 2 ** (n - 1))` seconds, drawn uniformly between
+    0 and that value when `jitter` is set, and never shorter than the 'Retry-After' header of the response.
+    """
+
+    DEFAULT_RETRY_STATUSES = (429, 502, 503, 504)
+
+    def __init__(
+            self,
+            max_attempts: Optional[int] = 3,
+            backoff_base: Optional[float] = 0.5,
+            backoff_cap: Optional[float] = 30.0,
+            jitter: Optional[bool] = True,
+            retry_statuses: Collection[int] = DEFAULT_RETRY_STATUSES,
+            retry_non_idempotent: Optional[bool] = False,
+            on_retry: Optional[Callable[[str, str, int, float, Union[int, Exception]], None]] = None,
+    ):
+        """Constructor for a RetryPolicy object
+
+        :param max_attempts: Total number of times a request is sent, including the first one.  1 disables retries.
+        :param backoff_base: Seconds to wait before the first retry, doubled for each following retry.
+        :param backoff_cap: Maximum number of seconds to wait before a retry.
+        :param jitter: Draw the delay uniformly between 0 and the backoff so concurrent callers don't retry in step.
+        :param retry_statuses: HTTP status codes of the responses to retry.  Connection errors are always retried.  A
+            429 response is only retried when the RequestService has no RateLimiter, which queues the request again up
+            to its `max_requeues` instead.
+        :param retry_non_idempotent: Also retry POST requests, like the `place_request` of ServiceItemsEndPoint, which
+            can create the resource twice when the first request reached FreshService.
+        :param on_retry: Hook called before waiting for each retry with the method, url, number of the attempt that
+            failed, the delay in seconds and the status code or exception of the failed attempt.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.on_retry = on_retry
+
+    def retry_delay(
+            self,
+            method: str,
+            attempt: int,
+            status_code: Optional[int] = None,
+            headers: Optional[Mapping[str, str]] = None,
+    ) -> Optional[float]:
+        """Seconds to wait before sending the request again, or None when the request isn't retried.
+
+        :param method: HTTP method of the request.
+        :param attempt: Number of the attempt that failed, starting at 1.
+        :param status_code: Status code of the failed response, None for a connection error.
+        :param headers: Headers of the failed response.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if method.upper() not in IDEMPOTENT_METHODS and not self.retry_non_idempotent:
+            return None
+        if status_code is not None and status_code not in self.retry_statuses:
+            return None
+        delay = min(self.backoff_cap, self.backoff_base * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if headers is not None and "Retry-After" in headers:
+            delay = max(delay, _retry_after(headers["Retry-After"], delay))
+        return delay
+
+    def notify(self, method: str, url: str, attempt: int, delay: float, reason: Union[int, Exception]) -> None:
+        """Log the retry and call the `on_retry` hook."""
+        logger.warning(
+            "Attempt %d of %d for '%s' request to '%s' failed with '%s', retrying in %.3f seconds",
+            attempt,
+            self.max_attempts,
+            method,
+            url,
+            reason,
+            delay,
+        )
+        if self.on_retry is not None:
+            self.on_retry(method, url, attempt, delay, reason)
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .errors import InFlightTimeout
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """Run a function once for concurrent callers asking for the same key, handing its result to all of them.
+
+    Only calls overlapping in time are coalesced: a call starting after the previous one for its key returned runs the
+    function again.  An exception raised by the function is raised to every caller waiting for it.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        """Number of times the function actually ran."""
+        self.coalesced = 0
+        """Number of callers that got the result of a call already in flight."""
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """Result of `func`, and True when it was shared from a call already in flight for `key`.
+
+        :param timeout: Maximum number of seconds to wait for the call already in flight.  Raises InFlightTimeout when
+            it isn't done by then, the call going on for the other callers.
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+                leader = True
+        if not leader:
+            if not call.done.wait(timeout):
+                raise InFlightTimeout(f"The call in flight for {key!r} didn't return within {timeout:.3f} seconds")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines: concurrent tasks asking for the same key await one call of the coroutine function.
+
+    The call runs in a task of its own, so cancelling the task that started it doesn't cancel it for the other tasks
+    awaiting it.  Use one instance per event loop.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(
+            self,
+            key: Hashable,
+            func: Callable[[], Awaitable[Any]],
+            timeout: Optional[float] = None,
+    ) -> Tuple[Any, bool]:
+        """Result of awaiting `func()`, and True when it was shared from a call already in flight for `key`.
+
+        :param timeout: Maximum number of seconds to wait for the call already in flight.  Raises InFlightTimeout when
+            it isn't done by then, the call going on for the other tasks.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda done: self._done(key, done))
+            self.calls += 1
+            return await asyncio.shield(task), False
+        self.coalesced += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout), True
+        except asyncio.TimeoutError:
+            if task.done():
+                # Raised by the call itself, like a DeadlineExceeded.
+                raise
+            raise InFlightTimeout(
+                f"The call in flight for {key!r} didn't return within {timeout:.3f} seconds"
+            ) from None
+
+    def _done(self, key: Hashable, task: asyncio.Future):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every task awaiting it was cancelled.
+            task.exception()
@@ -0,0 +1,66 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+_SEPARATORS = " \t\n\r,"
+
+
+def iter_json_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """Yields the items of the array under `key` of a JSON object as each one is parsed from the chunks of the body.
+
+    Only the text of the items not parsed yet is kept, so neither the whole body nor the whole decoded array is held
+    in memory.  Made for the FreshService list responses, where the array of resources is the first key of the object,
+    like '{"assets": [{...}, {...}]}'.  Nothing is yielded when the key isn't found.
+
+    :param chunks: Body of the response in chunks of UTF-8 bytes, like `requests.Response.iter_content()`.
+    :param key: Key of the array in the JSON object.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    array_start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    exhausted = False
+
+    def read_more() -> bool:
+        nonlocal buffer, pos, exhausted
+        if exhausted:
+            return False
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            exhausted = True
+            buffer += text_decoder.decode(b"", final=True)
+            return False
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        return True
+
+    match = array_start.search(buffer)
+    while match is None:
+        if not read_more():
+            return
+        match = array_start.search(buffer)
+    pos = match.end()
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos >= len(buffer):
+            if not read_more():
+                raise ValueError(f"JSON array under '{key}' is not terminated")
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if not read_more():
+                raise
+            continue
+        if end >= len(buffer) and not isinstance(item, (dict, list, str)) and read_more():
+            # a number or literal at the end of the buffer may continue in the next chunk
+            continue
+        pos = end
+        yield item
@@ -0,0 +1,112 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+
+from .api import RequestService
+from .models import AssetCreation, AssetUpdate, TypeField, create_type_field_model
+from .v2 import AssetTypeEndPoint
+
+logger = logging.getLogger(__name__)
+
+
+class TypeFieldModels:
+    """Typed validation of the type_fields of assets, with TypeField models compiled for each asset type.
+
+    The field definitions of an asset type are requested from the API the first time one of its assets is validated
+    and compiled to two pydantic models, one for creations with the mandatory fields required and one for updates with
+    every field optional, kept in an LRU of `max_size` asset types shared by every thread.
+    """
+
+    def __init__(self, request_service: RequestService, max_size: int = 128):
+        """Constructor for a TypeFieldModels object
+
+        :param request_service: RequestService to request the field definitions with.
+        :param max_size: Maximum number of asset types the models are kept for.
+        """
+        self.end_point = AssetTypeEndPoint(request_service)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._models: "OrderedDict[int, Tuple[Type[TypeField], Type[TypeField]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __contains__(self, asset_type_id: int) -> bool:
+        return asset_type_id in self._models
+
+    def model(self, asset_type_id: int, for_update: Optional[bool] = False) -> Type[TypeField]:
+        """TypeField model for the assets of an asset type.
+
+        :param for_update: Model for the type_fields of an update, with every field optional.
+        """
+        with self._lock:
+            models = self._models.get(asset_type_id)
+            if models is not None:
+                self._models.move_to_end(asset_type_id)
+                self.hits += 1
+                return models[bool(for_update)]
+            self.misses += 1
+        # Requested outside the lock so other asset types can be validated meanwhile.
+        fields = self.end_point.get_fields(asset_type_id)
+        models = (
+            create_type_field_model(asset_type_id, fields),
+            create_type_field_model(asset_type_id, fields, for_update=True),
+        )
+        with self._lock:
+            models = self._models.setdefault(asset_type_id, models)
+            self._models.move_to_end(asset_type_id)
+            while len(self._models) > self.max_size:
+                evicted, _ = self._models.popitem(last=False)
+                logger.debug("Evicted the type_fields models of asset type %s", evicted)
+        return models[bool(for_update)]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def validate(
+            self,
+            payload: Union[Dict, BaseModel],
+            model_class: Type[AssetCreation] = AssetCreation,
+    ) -> AssetCreation:
+        """Validate an asset payload, including its type_fields against the fields of its asset type.
+
+        :param payload: dict or model of the asset.
+        :param model_class: Model of the payload, like AssetCreation or AssetUpdate.  The mandatory type_fields are only
+            required for a creation.
+        :raises ValidationError: The payload or its type_fields aren't valid.
+        """
+        data = payload.dict(exclude_unset=True) if isinstance(payload, BaseModel) else payload
+        asset = model_class(**data)
+        type_fields = data.get("type_fields")
+        if type_fields is None:
+            return asset
+        if isinstance(type_fields, BaseModel):
+            type_fields = type_fields.dict()
+        type_fields_model = self.model(asset.asset_type_id, for_update=issubclass(model_class, AssetUpdate))
+        return asset.copy(update={"type_fields": type_fields_model(**type_fields)})
+
+    def validate_many(
+            self,
+            payloads: Iterable[Union[Dict, BaseModel]],
+            model_class: Type[AssetCreation] = AssetCreation,
+    ) -> Tuple[List[AssetCreation], List[Tuple[int, ValidationError]]]:
+        """Validate a batch of asset payloads, returning the valid assets and the errors of the invalid ones.
+
+        :param payloads: dicts or models of the assets.
+        :param model_class: Model of the payloads, like AssetCreation or AssetUpdate.
+        :return: The validated assets, and the index in `payloads` and validation error of each invalid payload.
+        """
+        valid = []
+        errors = []
+        for index, payload in enumerate(payloads):
+            try:
+                valid.append(self.validate(payload, model_class))
+            except ValidationError as error:
+                errors.append((index, error))
+        return valid, errors
@@ -4,3 +4,7 @@ from .tickets_endpoint import TicketsEndPoint
 from .assets import AssetsEndPoint
 from .asset_types import AssetTypeEndPoint
 from .locations import LocationsEndPoint
+from .departments import DepartmentsEndPoint
+from .requesters import RequestersEndPoint
+from .agents import AgentsEndPoint
+from .groups import GroupsEndPoint
@@ -0,0 +1,13 @@
+from typing import Any
+
+from ..api import RequestService
+from ..endpoints import GenericPluralEndpoint
+
+
+class AgentsEndPoint(GenericPluralEndpoint):
+    def __init__(self, request_service: RequestService, identifier: Any = None):
+        super(AgentsEndPoint, self).__init__(request_service=request_service)
+        self._endpoint = "/api/v2/agents"
+        self.plural_resource_key = "agents"
+        self.single_resource_key = "agent"
+        self.identifier = identifier
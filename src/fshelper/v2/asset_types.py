@@ -1,7 +1,9 @@
-from typing import Any
+from typing import Any, Dict, List
 
 from ..api import RequestService
+from ..deadline import TimeoutValue
 from ..endpoints import GenericPluralEndpoint
+from ..models import AssetTypeData
 
 
 class AssetTypeEndPoint(GenericPluralEndpoint):
@@ -11,3 +13,19 @@ class AssetTypeEndPoint(GenericPluralEndpoint):
         self.plural_resource_key = "asset_types"
         self.single_resource_key = "asset_type"
         self.identifier = identifier
+        self.model_class = AssetTypeData
+
+    def get_fields(self, asset_type_id: int, timeout: TimeoutValue = None) -> List[Dict]:
+        """Get the definitions of the type_fields of an asset type, including the fields inherited from its parents.
+
+        :param asset_type_id: ID of the asset type.
+        :param timeout: Timeout for this request instead of the default timeout of the RequestService.
+        """
+        _url = f"{self.extended_url}/{asset_type_id}/fields"
+        response = self.send_request(_url, timeout=timeout)
+        return _flatten_fields(response)
+
+
+def _flatten_fields(response: Dict) -> List[Dict]:
+    """Fields of every section of an asset type fields response."""
+    return [field for section in response.get("asset_type_fields", []) for field in section.get("fields", [])]
@@ -1,8 +1,15 @@
 import logging
-from typing import Dict, Optional
+import threading
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from pydantic import BaseModel
 
 from ..api import RequestService
+from ..bulk import BulkResult, run_bulk
+from ..deadline import Deadline, TimeoutValue
+from ..diff import changed_fields
 from ..endpoints import GenericPluralEndpoint
+from ..models import AssetCreation, AssetFullData, AssetUpdate
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +24,7 @@ class AssetsEndPoint(GenericPluralEndpoint):
         self.single_resource_key = "asset"
         self.identifier = identifier
         self._items_per_page = 100
+        self.model_class = AssetFullData
         # https://api.freshservice.com/#create_an_asset
         self.read_only_fields = (
             "author_type",  # from documentation
@@ -41,43 +49,172 @@ class AssetsEndPoint(GenericPluralEndpoint):
             "group_id",
             "type_fields",  # custom fields defined by the customer
         )
+        self.updates_sent = 0
+        """Number of updates sent by `update_changes`."""
+        self.updates_skipped = 0
+        """Number of updates `update_changes` didn't send because nothing changed."""
+        self._stats_lock = threading.Lock()
 
     def delete(
-            self, display_id: Optional[int] = None, permanently: Optional[bool] = False
+            self,
+            display_id: Optional[int] = None,
+            permanently: Optional[bool] = False,
+            timeout: TimeoutValue = None,
+            deadline: Union[Deadline, float, None] = None,
     ) -> Dict:
         """Delete an asset with an option to additionally call the endpoint to permanently delete the item.
 
         Overriding the inherited method to include the option for a second API request to permanently delete the asset.
         :param display_id: Display ID for the asset to be deleted
         :param permanently: Flag to make a second call to the API to permanently delete the asset
+        :param timeout: Timeout for each request instead of the default timeout of the RequestService.
+        :param deadline: Seconds, or a Deadline, both requests must be done in.
         """
         _method = "DELETE"
-        if display_id is not None:
-            self.identifier = display_id
-        _url = f"{self.item_extended_url}"
-        logger.info("Deleting asset with display_id = '%d'", self.identifier)
-        response = self.send_request(_url, method=_method)
+        deadline = Deadline.coerce(deadline)
+        if display_id is None:
+            display_id = self.identifier
+        _url = self.item_url(display_id)
+        logger.info("Deleting asset with display_id = '%d'", display_id)
+        response = self.send_request(_url, method=_method, timeout=timeout, deadline=deadline)
         if permanently:
-            _url = f"{self.item_extended_url}/delete_forever"
+            _url = f"{self.item_url(display_id)}/delete_forever"
             _method = "PUT"
             logger.info(
-                "Permanently deleting asset with display_id = '%d'", self.identifier
+                "Permanently deleting asset with display_id = '%d'", display_id
             )
-            response = self.send_request(_url, method=_method)
-            self.identifier = None
+            response = self.send_request(_url, method=_method, timeout=timeout, deadline=deadline)
         return response
 
-    def restore(self, display_id: Optional[int] = None) -> Dict:
-        if display_id is not None:
-            self.identifier = display_id
+    def restore(self, display_id: Optional[int] = None, timeout: TimeoutValue = None) -> Dict:
         _method = "PUT"
-        _url = f"{self.item_extended_url}/restore"
-        response = self.send_request(_url, method=_method)
+        _url = f"{self.item_url(display_id)}/restore"
+        response = self.send_request(_url, method=_method, timeout=timeout)
         return response
 
-    def get_associated_requests(self, display_id: Optional[int] = None) -> Dict:
-        if display_id is not None:
-            self.identifier = display_id
-        _url = f"{self.item_extended_url}/requests"
-        response = self.send_request(_url)
+    def get_associated_requests(self, display_id: Optional[int] = None, timeout: TimeoutValue = None) -> Dict:
+        _url = f"{self.item_url(display_id)}/requests"
+        response = self.send_request(_url, timeout=timeout)
         return response
+
+    def update_changes(
+            self,
+            data: Union[Dict, AssetUpdate],
+            display_id: Optional[int] = None,
+            current: Optional[Dict] = None,
+            timeout: TimeoutValue = None,
+    ) -> Dict:
+        """Update an asset with only the fields that differ from its current state, skipping the request when none do.
+
+        The current state is requested, with its type_fields when `data` has some, unless it's given.  With a
+        ResponseCache on the RequestService that request can be answered from the cache.  The skipped requests are
+        counted in `updates_skipped`.
+        :param data: dict or AssetUpdate model with the fields to set.  Its `display_id` is used when not given.
+        :param display_id: Display ID of the asset to update.
+        :param current: Last known state of the asset, as returned by the API.
+        :param timeout: Timeout for each request instead of the default timeout of the RequestService.
+        :return: The response of the update, or the current state of the asset in the same shape when nothing changed.
+        """
+        data = _asset_data(data)
+        display_id = self._update_display_id(data, display_id)
+        if current is None:
+            current = self.send_request(self._current_url(display_id, data), timeout=timeout)
+            current = current.get(self.single_resource_key)
+        delta = self._changes(display_id, data, current)
+        if not delta:
+            return {self.single_resource_key: current}
+        return self.send_request(self.item_url(display_id), method="PUT", data=delta, timeout=timeout)
+
+    def _update_display_id(self, data: Dict, display_id: Optional[int]) -> int:
+        if display_id is None:
+            display_id = data.get("display_id", self.identifier)
+        if display_id is None:
+            raise ValueError("An asset to update must have a 'display_id'.")
+        return display_id
+
+    def _current_url(self, display_id: int, data: Dict) -> str:
+        """URL of the current state of an asset, with its type_fields when the update sets some."""
+        url = self.item_url(display_id)
+        if data.get("type_fields"):
+            url = f"{url}?include=type_fields"
+        return url
+
+    def _changes(self, display_id: int, data: Dict, current: Dict) -> Dict:
+        """Fields of `data` differing from `current`, counting the update as sent or skipped."""
+        delta = changed_fields(current, data, ignore=self.read_only_fields)
+        with self._stats_lock:
+            if delta:
+                self.updates_sent += 1
+            else:
+                self.updates_skipped += 1
+        if not delta:
+            logger.debug("Skipping update of asset with display_id = '%s' without changes", display_id)
+        return delta
+
+    def bulk_create(
+            self,
+            assets: Iterable[Union[Dict, AssetCreation]],
+            workers: Optional[int] = 4,
+            enabled: Optional[bool] = False,
+            ordered: Optional[bool] = False,
+    ) -> Iterator[BulkResult]:
+        """Create assets on a pool of threads, yielding a BulkResult with the created asset or the error for each one.
+
+        The requests share the rate limiter of the RequestService, and one asset failing doesn't stop the others.
+        :param assets: dicts or AssetCreation models of the assets to create.
+        :param workers: Number of threads sending requests at once.
+        :param enabled: A toggle to create the assets or not during development, as for `create`.  When not sending,
+            each BulkResult has `dry_run` set and no created asset.
+        :param ordered: Yield the results in the order of `assets` when True or as they complete when False.
+        """
+
+        def create_asset(asset) -> Dict:
+            response = self.create(_asset_data(asset), enabled=enabled)
+            return response.get(self.single_resource_key)
+
+        return run_bulk(create_asset, assets, workers=workers, ordered=ordered)
+
+    def bulk_update(
+            self,
+            assets: Iterable[Union[Dict, AssetUpdate]],
+            workers: Optional[int] = 4,
+            ordered: Optional[bool] = False,
+            only_changes: Optional[bool] = False,
+            current: Optional[Mapping[int, Dict]] = None,
+    ) -> Iterator[BulkResult]:
+        """Update assets on a pool of threads, yielding a BulkResult with the updated asset or the error for each one.
+
+        Each asset is updated by its `display_id`, and only the fields set on it are sent, without the read only fields.
+        :param assets: dicts or AssetUpdate models with the `display_id` of the asset and the fields to update.
+        :param workers: Number of threads sending requests at once.
+        :param ordered: Yield the results in the order of `assets` when True or as they complete when False.
+        :param only_changes: Update each asset with `update_changes`, sending only the fields that changed.
+        :param current: Last known state of the assets by display ID for `update_changes`.  The assets missing from it
+            are requested.
+        """
+
+        def update_asset(asset) -> Dict:
+            display_id, data = self._bulk_update_data(asset)
+            if only_changes:
+                known = current.get(display_id) if current is not None else None
+                response = self.update_changes(data, display_id, current=known)
+            else:
+                response = self.send_request(self.item_url(display_id), method="PUT", data=data)
+            return response.get(self.single_resource_key)
+
+        return run_bulk(update_asset, assets, workers=workers, ordered=ordered)
+
+    def _bulk_update_data(self, asset: Union[Dict, AssetUpdate]) -> Tuple[int, Dict]:
+        """Display ID of an asset to update and the data to send, without the read only fields."""
+        data = dict(_asset_data(asset))
+        display_id = data.get("display_id")
+        if display_id is None:
+            raise ValueError("An asset to update must have a 'display_id'.")
+        return display_id, self._drop_read_only_fields(data)
+
+
+def _asset_data(asset: Union[Dict, BaseModel]) -> Dict:
+    """Dict of the fields set on an asset model, or the asset when it's already a dict."""
+    if isinstance(asset, BaseModel):
+        return asset.dict(exclude_unset=True)
+    return asset
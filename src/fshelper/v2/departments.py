@@ -0,0 +1,13 @@
+from typing import Any
+
+from ..api import RequestService
+from ..endpoints import GenericPluralEndpoint
+
+
+class DepartmentsEndPoint(GenericPluralEndpoint):
+    def __init__(self, request_service: RequestService, identifier: Any = None):
+        super(DepartmentsEndPoint, self).__init__(request_service=request_service)
+        self._endpoint = "/api/v2/departments"
+        self.plural_resource_key = "departments"
+        self.single_resource_key = "department"
+        self.identifier = identifier
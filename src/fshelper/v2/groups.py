@@ -0,0 +1,13 @@
+from typing import Any
+
+from ..api import RequestService
+from ..endpoints import GenericPluralEndpoint
+
+
+class GroupsEndPoint(GenericPluralEndpoint):
+    def __init__(self, request_service: RequestService, identifier: Any = None):
+        super(GroupsEndPoint, self).__init__(request_service=request_service)
+        self._endpoint = "/api/v2/groups"
+        self.plural_resource_key = "groups"
+        self.single_resource_key = "group"
+        self.identifier = identifier
@@ -2,6 +2,7 @@ from typing import Any
 
 from ..api import RequestService
 from ..endpoints import GenericPluralEndpoint
+from ..models import LocationData
 
 
 class LocationsEndPoint(GenericPluralEndpoint):
@@ -11,3 +12,4 @@ class LocationsEndPoint(GenericPluralEndpoint):
         self.plural_resource_key = "locations"
         self.single_resource_key = "location"
         self.identifier = identifier
+        self.model_class = LocationData
@@ -0,0 +1,13 @@
+from typing import Any
+
+from ..api import RequestService
+from ..endpoints import GenericPluralEndpoint
+
+
+class RequestersEndPoint(GenericPluralEndpoint):
+    def __init__(self, request_service: RequestService, identifier: Any = None):
+        super(RequestersEndPoint, self).__init__(request_service=request_service)
+        self._endpoint = "/api/v2/requesters"
+        self.plural_resource_key = "requesters"
+        self.single_resource_key = "requester"
+        self.identifier = identifier
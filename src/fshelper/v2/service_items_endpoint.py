@@ -10,6 +10,7 @@ class ServiceItemsEndPoint(GenericPluralEndpoint):
         self.single_resource_key = "service_item"
         self.display_id = display_id
         self.create_command = "place_request"
+        self.created_resource_key = "service_request"
 
     @property
     def extended_url(self):
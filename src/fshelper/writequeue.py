@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from .bulk import BulkResult
+from .diff import NESTED_FIELDS
+from .models import AssetUpdate
+from .v2 import AssetsEndPoint
+from .v2.assets import _asset_data
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateQueue:
+    """Write-behind queue merging the updates to the same asset into one PUT.
+
+    Updates are held for up to `window` seconds after the first pending update of their asset.  Updates to an asset
+    already pending are merged into it field by field, the last value written to a field winning, and `type_fields`
+    are merged field by field too.  Pending updates are sent by `AssetsEndPoint.bulk_update` when their window ends,
+    when `max_pending` assets are pending, on `flush()` and on `close()`.
+
+    One flush runs at a time, so the updates to an asset are sent in the order they were written.  Use this class with
+    a context manager or call close() when done so no pending update is lost.
+    """
+
+    def __init__(
+            self,
+            end_point: AssetsEndPoint,
+            window: float = 5.0,
+            max_pending: int = 100,
+            workers: Optional[int] = 4,
+    ):
+        """Constructor for an UpdateQueue object
+
+        :param end_point: AssetsEndPoint sending the updates.
+        :param window: Seconds an update is held waiting for more updates to the same asset.
+        :param max_pending: Number of pending assets flushing the queue at once when reached.
+        :param workers: Number of threads sending the updates of a flush at once.
+        """
+        if window < 0:
+            raise ValueError("The window of an UpdateQueue can't be negative.")
+        self.end_point = end_point
+        self.window = window
+        self.max_pending = max_pending
+        self.workers = workers
+        self.writes = 0
+        """Number of updates put in the queue."""
+        self.merged = 0
+        """Number of updates merged into an update already pending, the PUT requests saved."""
+        self.sent = 0
+        """Number of updates sent successfully."""
+        self.failures: List[BulkResult] = []
+        """Result of each update that failed to be sent."""
+        self._pending: "OrderedDict[int, Dict]" = OrderedDict()
+        self._due: Dict[int, float] = {}
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="fshelper-update-queue", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._pending)
+
+    def put(self, data: Union[Dict, AssetUpdate], display_id: Optional[int] = None):
+        """Queue an update of an asset, merged with the update already pending for it.
+
+        :param data: dict or AssetUpdate model with the fields to set.  Its `display_id` is used when not given.
+        :param display_id: Display ID of the asset to update.
+        """
+        data = dict(_asset_data(data))
+        if display_id is None:
+            display_id = data.get("display_id")
+        if display_id is None:
+            raise ValueError("An asset to update must have a 'display_id'.")
+        data["display_id"] = display_id
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Can't queue an update on a closed UpdateQueue.")
+            self.writes += 1
+            pending = self._pending.get(display_id)
+            if pending is None:
+                self._pending[display_id] = data
+                self._due[display_id] = time.monotonic() + self.window
+                self._condition.notify()
+            else:
+                self.merged += 1
+                _merge(pending, data)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush()
+
+    def flush(self) -> List[BulkResult]:
+        """Send every pending update now."""
+        return self._flush(due_before=None)
+
+    def close(self):
+        """Send the pending updates and stop the queue."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._condition:
+            return {
+                "writes": self.writes,
+                "merged": self.merged,
+                "sent": self.sent,
+                "failed": len(self.failures),
+                "pending": len(self._pending),
+            }
+
+    def _flush(self, due_before: Optional[float]) -> List[BulkResult]:
+        """Send the pending updates, only the ones due before `due_before` when given."""
+        with self._flush_lock:
+            with self._condition:
+                if due_before is None:
+                    updates = list(self._pending.values())
+                    self._pending.clear()
+                    self._due.clear()
+                else:
+                    updates = []
+                    for display_id in list(self._pending):
+                        if self._due[display_id] > due_before:
+                            break
+                        updates.append(self._pending.pop(display_id))
+                        del self._due[display_id]
+            if not updates:
+                return []
+            logger.debug("Sending %d merged asset updates", len(updates))
+            results = list(self.end_point.bulk_update(updates, workers=self.workers))
+            with self._condition:
+                self.sent += sum(1 for result in results if result.ok)
+                self.failures.extend(result for result in results if not result.ok)
+            return results
+
+    def _run(self):
+        """Flush the pending updates as their window ends, until the queue is closed."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    next_due = next(iter(self._due.values()), None)
+                    if next_due is not None and next_due <= time.monotonic():
+                        break
+                    self._condition.wait(None if next_due is None else next_due - time.monotonic())
+                if self._closed:
+                    return
+            self._flush(due_before=time.monotonic())
+
+
+def _merge(pending: Dict, data: Dict):
+    """Merge the fields of an update into the pending update of the same asset, the new values winning."""
+    for key, value in data.items():
+        if key in NESTED_FIELDS and isinstance(value, dict) and isinstance(pending.get(key), dict):
+            pending[key] = {**pending[key], **value}
+        else:
+            pending[key] = value
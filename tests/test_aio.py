@@ -0,0 +1,200 @@
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from fshelper.aio import AsyncAssetsEndPoint, AsyncAssetTypeEndPoint, AsyncRequestService, AsyncServiceItemsEndPoint
+
+
+def _mock_transport(requests_sent, nb_items=0, items_key="assets", items_per_page=100):
+    """httpx.MockTransport recording each request and returning pages of `nb_items` items in total.
+
+    Like the FreshService API, the 'link' header is only set when there is a next page.
+    """
+
+    def handler(request):
+        requests_sent.append(request)
+        page = int(request.url.params.get("page", 1))
+        start = (page - 1) * items_per_page
+        stop = min(page * items_per_page, nb_items)
+        headers = {}
+        if stop < nb_items:
+            headers["link"] = f'<{request.url.copy_merge_params({"page": page + 1})}>; rel="next"'
+        return httpx.Response(
+            200, headers=headers, json={items_key: [{"id": i} for i in range(start, max(start, stop))]}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_async_get_all_returns_all_items(fake_credential, fake_fs_domain):
+    requests_sent = []
+    nb_items = 250
+
+    async def collect():
+        transport = _mock_transport(requests_sent, nb_items)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            items = []
+            async for page in AsyncAssetsEndPoint(request_service).get_all():
+                items.extend(page)
+            return items
+
+    items = asyncio.run(collect())
+    assert [item["id"] for item in items] == list(range(nb_items))
+    assert len(requests_sent) == 3
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_async_get_all_concurrent_returns_all_items(fake_credential, fake_fs_domain, ordered):
+    requests_sent = []
+    nb_items = 730
+
+    async def collect():
+        transport = _mock_transport(requests_sent, nb_items)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            items = []
+            async for page in AsyncAssetsEndPoint(request_service).get_all(workers=4, ordered=ordered):
+                items.extend(page)
+            return items
+
+    ids = [item["id"] for item in asyncio.run(collect())]
+    assert sorted(ids) == list(range(nb_items))
+
+
+def test_async_get_all_concurrent_stops_at_full_page_without_next_link(fake_credential, fake_fs_domain):
+    requests_sent = []
+    nb_items = 400
+
+    async def collect():
+        transport = _mock_transport(requests_sent, nb_items)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            return [page async for page in AsyncAssetsEndPoint(request_service).get_all(workers=2)]
+
+    pages = asyncio.run(collect())
+    assert sum(len(page) for page in pages) == nb_items
+    assert max(int(request.url.params["page"]) for request in requests_sent) <= 5
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_async_get_all_does_not_yield_empty_pages(fake_credential, fake_fs_domain, workers):
+    """Like the sync version, the empty page after a last full page isn't yielded."""
+
+    async def collect(nb_items):
+        transport = _mock_transport([], nb_items)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            return [page async for page in AsyncAssetsEndPoint(request_service).get_all(workers=workers)]
+
+    assert [len(page) for page in asyncio.run(collect(200))] == [100, 100]
+    assert asyncio.run(collect(0)) == []
+
+
+def test_async_delete_permanently_sends_delete_then_put(fake_credential, fake_fs_domain, faker):
+    requests_sent = []
+    _id = faker.pyint()
+
+    async def delete():
+        transport = _mock_transport(requests_sent)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            await AsyncAssetsEndPoint(request_service).delete(_id, permanently=True)
+
+    asyncio.run(delete())
+    assert [request.method for request in requests_sent] == ["DELETE", "PUT"]
+    assert requests_sent[-1].url.path.endswith(f"/{_id}/delete_forever")
+
+
+def test_async_create_sends_create_command_in_url(fake_credential, fake_fs_domain):
+    requests_sent = []
+
+    async def create():
+        transport = _mock_transport(requests_sent)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            end_point = AsyncServiceItemsEndPoint(request_service, display_id=1)
+            await end_point.create({"email": "a@b.c", "quantity": None}, enabled=True)
+
+    asyncio.run(create())
+    assert requests_sent[0].url.path.endswith("/place_request")
+    assert json.loads(requests_sent[0].content) == {"email": "a@b.c"}
+
+
+def _echo_transport(requests_sent, assets=None):
+    """httpx.MockTransport answering GETs of an asset from `assets` and echoing the data of the writes."""
+
+    def handler(request):
+        requests_sent.append(request)
+        if request.method == "GET":
+            return httpx.Response(200, json={"asset": assets[int(request.url.path.rsplit("/", 1)[-1])]})
+        data = json.loads(request.content)
+        if data.get("name") == "failing":
+            return httpx.Response(400, json={"description": "Validation failed"})
+        return httpx.Response(200, json={"asset": dict(data, display_id=len(requests_sent))})
+
+    return httpx.MockTransport(handler)
+
+
+def test_async_bulk_create_awaits_each_create(fake_credential, fake_fs_domain):
+    requests_sent = []
+    assets = [{"name": f"laptop {i}", "asset_type_id": 1} for i in range(5)] + [{"name": "failing", "asset_type_id": 1}]
+
+    async def bulk_create():
+        transport = _echo_transport(requests_sent)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            end_point = AsyncAssetsEndPoint(request_service)
+            return [result async for result in end_point.bulk_create(assets, workers=2, enabled=True, ordered=True)]
+
+    results = asyncio.run(bulk_create())
+    assert [result.payload for result in results] == assets
+    assert [result.ok for result in results] == [True] * 5 + [False]
+    assert results[0].resource["name"] == "laptop 0"
+    assert len(requests_sent) == 6
+
+
+def test_async_bulk_update_only_changes_skips_unchanged(fake_credential, fake_fs_domain):
+    requests_sent = []
+    current = {1: {"display_id": 1, "name": "a"}, 2: {"display_id": 2, "name": "b"}}
+
+    async def bulk_update():
+        transport = _echo_transport(requests_sent, current)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            end_point = AsyncAssetsEndPoint(request_service)
+            updates = [{"display_id": 1, "name": "a"}, {"display_id": 2, "name": "c"}]
+            results = [result async for result in end_point.bulk_update(updates, only_changes=True)]
+            return results, end_point.updates_skipped
+
+    results, skipped = asyncio.run(bulk_update())
+    assert all(result.ok for result in results)
+    assert [request.method for request in requests_sent].count("PUT") == 1
+    assert json.loads([r for r in requests_sent if r.method == "PUT"][0].content) == {"name": "c"}
+    assert skipped == 1
+
+
+def test_async_get_fields_flattens_sections(fake_credential, fake_fs_domain):
+    def handler(request):
+        return httpx.Response(200, json={"asset_type_fields": [{"fields": [{"name": "cost_1"}]}, {"fields": []}]})
+
+    async def get_fields():
+        transport = httpx.MockTransport(handler)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            return await AsyncAssetTypeEndPoint(request_service).get_fields(5)
+
+    assert asyncio.run(get_fields()) == [{"name": "cost_1"}]
+
+
+def test_async_429_is_queued_again_by_rate_limiter_only(fake_credential, fake_fs_domain):
+    from fshelper import RateLimiter, RetryPolicy
+
+    requests_sent = []
+
+    def handler(request):
+        requests_sent.append(request)
+        return httpx.Response(429, headers={"Retry-After": "0"}, json={})
+
+    async def send():
+        async with AsyncRequestService(
+                fake_credential, fake_fs_domain, transport=httpx.MockTransport(handler),
+                rate_limiter=RateLimiter(max_requeues=2), retry_policy=RetryPolicy(max_attempts=3, backoff_base=0),
+        ) as request_service:
+            return await request_service.client.get(f"https://{fake_fs_domain}.freshservice.com/api/v2/assets")
+
+    assert asyncio.run(send()).status_code == 429
+    assert len(requests_sent) == 3
@@ -0,0 +1,42 @@
+import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from fshelper import RequestService
+from fshelper.adapters import FreshServiceAdapter
+
+
+def _adapter(request_service) -> FreshServiceAdapter:
+    return request_service.session.get_adapter(f"https://{request_service.domain}.freshservice.com")
+
+
+def test_request_service_pool_settings_given_to_adapter(fake_credential, fake_fs_domain):
+    with RequestService(fake_credential, fake_fs_domain, pool_maxsize=50, pool_block=True) as request_service:
+        pool_kwargs = _adapter(request_service).poolmanager.connection_pool_kw
+    assert pool_kwargs["maxsize"] == 50
+    assert pool_kwargs["block"] is True
+
+
+def test_request_service_keep_alive_socket_options(fake_credential, fake_fs_domain):
+    with RequestService(fake_credential, fake_fs_domain) as request_service:
+        socket_options = _adapter(request_service).poolmanager.connection_pool_kw["socket_options"]
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in socket_options
+    assert (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1) in socket_options
+
+
+def test_request_service_without_keep_alive_closes_connections(fake_credential, fake_fs_domain):
+    with RequestService(fake_credential, fake_fs_domain, keep_alive=False) as request_service:
+        assert request_service.session.headers["Connection"] == "close"
+        socket_options = _adapter(request_service).poolmanager.connection_pool_kw["socket_options"]
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) not in socket_options
+
+
+def test_request_service_shares_connection_pool_across_threads(fake_credential, fake_fs_domain):
+    """Every thread gets the same connection pool for the FreshService domain."""
+    url = f"https://{fake_fs_domain}.freshservice.com"
+    with RequestService(fake_credential, fake_fs_domain, pool_maxsize=16) as request_service:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            pools = list(
+                executor.map(lambda _: _adapter(request_service).poolmanager.connection_from_url(url), range(32))
+            )
+    assert len({id(pool) for pool in pools}) == 1
+    assert pools[0].pool.maxsize == 16
@@ -3,6 +3,7 @@ import re
 import pytest
 from unittest.mock import MagicMock, patch
 from requests import Request
+from requests.exceptions import HTTPError
 
 from fshelper import RequestService
 from fshelper.support.factories import CreateAssetFactory
@@ -184,3 +185,91 @@ class TestAssets:
                 "name"]  # the `name` in the data sent matches the `name` from the mock asset data
             with pytest.raises(KeyError):
                 _ = _data["discovery_enabled"]
+
+    def test_bulk_create_reports_each_item_without_aborting(self, mock_request_service):
+        """One asset failing to be created is reported in its result and the other assets are still created."""
+        _assets = [CreateAssetFactory.build() for _ in range(10)]
+        _failing_name = _assets[3].name
+
+        def fake_send_request(url, method="GET", data=None, **_):
+            if data["name"] == _failing_name:
+                raise HTTPError("400 Client Error")
+            return {"asset": {"id": hash(data["name"]), "display_id": len(data["name"]), "name": data["name"]}}
+
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = fake_send_request
+            results = list(end_point.bulk_create(_assets, workers=3, enabled=True, ordered=True))
+        assert [result.payload for result in results] == _assets
+        assert [result.ok for result in results].count(False) == 1
+        assert results[3].ok is False and isinstance(results[3].error, HTTPError)
+        assert results[0].resource["name"] == _assets[0].name
+
+    def test_bulk_create_dry_run_results_are_marked(self, mock_request_service, monkeypatch):
+        """Without sending enabled, each result is a dry run rather than a created asset."""
+        monkeypatch.delenv("ALLOW_FS_CREATE_REQUESTS", raising=False)
+        _assets = [CreateAssetFactory.build() for _ in range(3)]
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = MagicMock()
+            results = list(end_point.bulk_create(_assets, workers=2))
+        assert end_point.send_request.called is False
+        assert all(result.ok and result.dry_run for result in results)
+
+    def test_bulk_update_puts_to_display_id_without_read_only_fields(self, mock_request_service, faker):
+        _display_id = faker.pyint()
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = MagicMock(return_value={"asset": {"display_id": _display_id}})
+            results = list(end_point.bulk_update([{"display_id": _display_id, "name": "new name", "id": 1}]))
+        args, kwargs = end_point.send_request.call_args
+        assert args[0].endswith(f"/{_display_id}")
+        assert kwargs["method"] == "PUT"
+        assert kwargs["data"] == {"name": "new name"}
+        assert results[0].display_id == _display_id
+
+    def test_bulk_update_without_display_id_is_an_item_error(self, mock_request_service):
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = MagicMock()
+            results = list(end_point.bulk_update([{"name": "no display id"}]))
+        assert isinstance(results[0].error, ValueError)
+        assert end_point.send_request.called is False
+
+    def test_update_changes_sends_only_changed_fields(self, mock_request_service):
+        _current = {"display_id": 7, "name": "laptop", "location_id": 1, "type_fields": {"cost_1": 10, "os_1": "linux"}}
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = MagicMock(return_value={"asset": {"display_id": 7}})
+            end_point.update_changes(
+                {"display_id": 7, "name": "laptop", "location_id": 2, "type_fields": {"cost_1": 10, "os_1": "bsd"}},
+                current=_current,
+            )
+        args, kwargs = end_point.send_request.call_args
+        assert args[0].endswith("/7")
+        assert kwargs["data"] == {"location_id": 2, "type_fields": {"os_1": "bsd"}}
+        assert (end_point.updates_sent, end_point.updates_skipped) == (1, 0)
+
+    def test_update_changes_skips_request_without_changes(self, mock_request_service):
+        _current = {"display_id": 7, "name": "laptop", "type_fields": {"cost_1": 10}}
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = MagicMock(return_value={"asset": _current})
+            response = end_point.update_changes({"display_id": 7, "name": "laptop", "type_fields": {"cost_1": 10}})
+        end_point.send_request.assert_called_once()
+        args, _ = end_point.send_request.call_args
+        assert args[0].endswith("/7?include=type_fields")
+        assert response == {"asset": _current}
+        assert (end_point.updates_sent, end_point.updates_skipped) == (0, 1)
+
+    def test_bulk_update_only_changes_uses_known_state(self, mock_request_service):
+        _known = {1: {"display_id": 1, "name": "a"}, 2: {"display_id": 2, "name": "b"}}
+        with mock_request_service as mock_service:
+            end_point = AssetsEndPoint(mock_service)
+            end_point.send_request = MagicMock(return_value={"asset": {"display_id": 2, "name": "c"}})
+            _assets = [{"display_id": 1, "name": "a"}, {"display_id": 2, "name": "c"}]
+            results = list(end_point.bulk_update(_assets, ordered=True, only_changes=True, current=_known))
+        end_point.send_request.assert_called_once()
+        assert end_point.send_request.call_args[1]["data"] == {"name": "c"}
+        assert [result.display_id for result in results] == [1, 2]
+        assert end_point.updates_skipped == 1
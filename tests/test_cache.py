@@ -0,0 +1,85 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+from fshelper.adapters import FreshServiceAdapter
+from fshelper.cache import ResponseCache
+
+BASE_URL = "https://example.freshservice.com"
+
+
+def _request(method, path):
+    request = PreparedRequest()
+    request.prepare(method=method, url=f"{BASE_URL}{path}")
+    return request
+
+
+def _response(status_code=200, data=None, headers=None):
+    resp = Response()
+    resp.status_code = status_code
+    resp.headers.update(headers or {})
+    resp._content = json.dumps(data or {}).encode()
+    resp._content_consumed = True
+    return resp
+
+
+@patch.object(HTTPAdapter, "send")
+def test_fresh_response_served_from_cache(mock_send):
+    mock_send.return_value = _response(data={"location": {"id": 1}})
+    cache = ResponseCache()
+    adapter = FreshServiceAdapter(cache=cache)
+    first = adapter.send(_request("GET", "/api/v2/locations/1"))
+    second = adapter.send(_request("GET", "/api/v2/locations/1"))
+    assert mock_send.call_count == 1
+    assert second.json() == first.json()
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@patch("fshelper.cache.time.monotonic")
+@patch.object(HTTPAdapter, "send")
+def test_expired_response_revalidated_with_etag(mock_send, mock_monotonic):
+    mock_monotonic.return_value = 0
+    mock_send.side_effect = [_response(data={"id": 1}, headers={"ETag": '"abc"'}), _response(304)]
+    cache = ResponseCache(ttl=10)
+    adapter = FreshServiceAdapter(cache=cache)
+    adapter.send(_request("GET", "/api/v2/locations/1"))
+    mock_monotonic.return_value = 11
+    resp = adapter.send(_request("GET", "/api/v2/locations/1"))
+    assert mock_send.call_args.args[0].headers["If-None-Match"] == '"abc"'
+    assert resp.json() == {"id": 1}
+    assert cache.revalidations == 1
+
+
+@patch.object(HTTPAdapter, "send")
+def test_update_invalidates_resource_and_lists(mock_send):
+    mock_send.return_value = _response(data={"asset": {}})
+    cache = ResponseCache()
+    adapter = FreshServiceAdapter(cache=cache)
+    adapter.send(_request("GET", "/api/v2/assets/12"))
+    adapter.send(_request("GET", "/api/v2/assets?page=1&per_page=100"))
+    adapter.send(_request("GET", "/api/v2/assets/13"))
+    adapter.send(_request("PUT", "/api/v2/assets/12/restore"))
+    assert len(cache) == 1
+    assert cache.invalidations == 2
+
+
+@patch.object(HTTPAdapter, "send")
+def test_least_recently_used_response_evicted(mock_send):
+    mock_send.return_value = _response()
+    cache = ResponseCache(max_size=2)
+    adapter = FreshServiceAdapter(cache=cache)
+    for path in ("/api/v2/locations/1", "/api/v2/locations/2", "/api/v2/locations/1", "/api/v2/locations/3"):
+        adapter.send(_request("GET", path))
+    adapter.send(_request("GET", "/api/v2/locations/1"))
+    assert cache.evictions == 1
+    assert mock_send.call_count == 3
+
+
+def test_ttl_for_longest_matching_prefix():
+    cache = ResponseCache(ttl=60, ttls={"/api/v2/locations": 3600, "/api/v2": 120})
+    assert cache.ttl_for(f"{BASE_URL}/api/v2/locations/1") == 3600
+    assert cache.ttl_for(f"{BASE_URL}/api/v2/assets/1") == 120
+    assert cache.ttl_for(f"{BASE_URL}/api/v1/assets/1") == pytest.approx(60)
@@ -0,0 +1,97 @@
+import re
+
+import pytest
+
+from fshelper.checkpoint import Checkpoint, FileCheckpointStore, ResumableCrawl
+from fshelper.v2 import TicketsEndPoint
+
+
+class FakeTickets:
+    """Fake `send_request` paginating a list of tickets, failing once when asked for the page `fail_on_page`."""
+
+    def __init__(self, end_point, nb_tickets, fail_on_page=None):
+        self.end_point = end_point
+        self.tickets = [{"id": i, "updated_at": f"2023-05-01T10:00:{i % 60:02d}Z"} for i in range(nb_tickets)]
+        self.fail_on_page = fail_on_page
+        self.requested_pages = []
+
+    def __call__(self, url, **_):
+        page = int(re.search(r"[?&]page=(\d+)", url).group(1))
+        self.requested_pages.append(page)
+        if page == self.fail_on_page:
+            self.fail_on_page = None
+            raise ConnectionError("connection reset")
+        per_page = self.end_point.items_per_page
+        return {"tickets": self.tickets[(page - 1) * per_page:page * per_page]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FileCheckpointStore(str(tmp_path / "checkpoints.json"))
+
+
+def test_store_round_trip(store):
+    store.save("tickets", Checkpoint("include=stats", page=3, offset=2, last_id=62))
+    checkpoint = store.load("tickets")
+    assert (checkpoint.query, checkpoint.page, checkpoint.offset, checkpoint.last_id) == ("include=stats", 3, 2, 62)
+    store.delete("tickets")
+    assert store.load("tickets") is None
+
+
+def test_crawl_resumes_after_failure_without_duplicates(fake_request_service, store):
+    end_point = TicketsEndPoint(fake_request_service)
+    fake_tickets = FakeTickets(end_point, end_point.items_per_page * 5 + 7, fail_on_page=4)
+    end_point.send_request = fake_tickets
+    crawl = ResumableCrawl(end_point, store)
+    seen = []
+    with pytest.raises(ConnectionError):
+        for ticket in crawl:
+            seen.append(ticket["id"])
+    assert crawl.checkpoint.page == 3
+    assert not crawl.checkpoint.done
+    fake_tickets.requested_pages.clear()
+    seen.extend(ticket["id"] for ticket in crawl)
+    assert seen == [ticket["id"] for ticket in fake_tickets.tickets]
+    assert fake_tickets.requested_pages == [3, 4, 5, 6]
+    assert crawl.checkpoint.done
+    assert crawl.checkpoint.high_water_mark == max(ticket["updated_at"] for ticket in fake_tickets.tickets)
+
+
+def test_crawl_resumes_mid_page_after_caller_stops(fake_request_service, store):
+    end_point = TicketsEndPoint(fake_request_service)
+    fake_tickets = FakeTickets(end_point, end_point.items_per_page * 2)
+    end_point.send_request = fake_tickets
+    crawl = ResumableCrawl(end_point, store)
+    items = crawl.items()
+    seen = [next(items)["id"] for _ in range(5)]
+    items.close()
+    seen.extend(ticket["id"] for ticket in crawl)
+    assert seen == [ticket["id"] for ticket in fake_tickets.tickets]
+
+
+def test_crawl_finds_last_item_in_shifted_page(fake_request_service, store):
+    end_point = TicketsEndPoint(fake_request_service)
+    fake_tickets = FakeTickets(end_point, end_point.items_per_page * 2)
+    end_point.send_request = fake_tickets
+    crawl = ResumableCrawl(end_point, store)
+    items = crawl.items()
+    seen = [next(items)["id"] for _ in range(5)]
+    items.close()
+    fake_tickets.tickets.pop(0)
+    seen.extend(ticket["id"] for ticket in crawl)
+    assert seen == list(range(end_point.items_per_page * 2))
+
+
+def test_completed_crawl_starts_over(fake_request_service, store):
+    end_point = TicketsEndPoint(fake_request_service)
+    end_point.send_request = FakeTickets(end_point, 10)
+    crawl = ResumableCrawl(end_point, store, query="include=stats")
+    assert len(list(crawl)) == 10
+    assert len(list(crawl)) == 10
+    assert crawl.checkpoint.nb_items == 10
+
+
+def test_crawl_refuses_unordered_pages(fake_request_service, store):
+    crawl = ResumableCrawl(TicketsEndPoint(fake_request_service), store)
+    with pytest.raises(ValueError):
+        next(crawl.items(workers=2, ordered=False))
@@ -0,0 +1,40 @@
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+from requests import Response
+
+from fshelper import RequestService
+from fshelper.codec import JSONCodec, OrjsonCodec, default_codec
+from fshelper.endpoints import GenericEndPoint
+
+
+def test_json_codec_round_trip():
+    codec = JSONCodec()
+    data = {"asset": {"name": "laptop", "type_fields": {"product_1": 2}}}
+    assert codec.loads(codec.dumps(data)) == data
+
+
+def test_orjson_codec_used_when_installed():
+    pytest.importorskip("orjson")
+    assert isinstance(default_codec(), OrjsonCodec)
+    assert default_codec().loads(default_codec().dumps({"a": [1, None]})) == {"a": [1, None]}
+
+
+def test_endpoint_uses_request_service_codec(fake_credential, fake_fs_domain):
+    codec = MagicMock(JSONCodec)
+    codec.loads.return_value = {"asset": {}}
+    request_service = RequestService(fake_credential, fake_fs_domain, codec=codec)
+    end_point = GenericEndPoint(request_service)
+    resp = Response()
+    resp._content = b'{"asset": {}}'
+    assert end_point._decode_response(resp) == {"asset": {}}
+    codec.loads.assert_called_once_with(b'{"asset": {}}')
+
+
+def test_disabled_create_does_not_encode_data_for_log_below_info(fake_credential, fake_fs_domain, caplog):
+    codec = MagicMock(JSONCodec)
+    request_service = RequestService(fake_credential, fake_fs_domain, codec=codec)
+    with caplog.at_level(logging.WARNING):
+        GenericEndPoint(request_service).create({"name": "laptop"})
+    assert codec.dumps.called is False
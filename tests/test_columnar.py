@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from fshelper.endpoints import GenericPluralEndpoint
+from fshelper.models import create_type_field_model
+from fshelper.v2 import AssetsEndPoint
+
+pyarrow = pytest.importorskip("pyarrow")
+
+from fshelper.columnar import ColumnarExporter, arrow_schema  # noqa: E402
+
+
+def _assets(nb_assets):
+    return [
+        {"id": i, "display_id": i, "name": f"asset {i}", "asset_type_id": 5, "created_at": "2023-05-01T10:00:00Z",
+         "type_fields": {"serial_5": f"S{i}", "cost_5": "12.5"}}
+        for i in range(nb_assets)
+    ]
+
+
+def _fake_get_all(items, page_size=30):
+    def get_all(*_, **__):
+        for start in range(0, len(items), page_size):
+            yield items[start:start + page_size]
+
+    return get_all
+
+
+def test_arrow_schema_flattens_type_fields():
+    type_fields_model = create_type_field_model(5, [{"name": "cost_5", "data_type": "decimal"}])
+    from fshelper.models import AssetFullData
+
+    schema = arrow_schema(AssetFullData, {"type_fields": type_fields_model})
+    assert schema.field("display_id").type == pyarrow.int64()
+    assert schema.field("created_at").type == pyarrow.timestamp("us", tz="UTC")
+    assert schema.field("type_fields.cost_5").type == pyarrow.float64()
+
+
+def test_iter_batches_bounds_batch_size(fake_request_service):
+    end_point = AssetsEndPoint(fake_request_service)
+    exporter = ColumnarExporter(end_point, batch_size=50)
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(_assets(130))):
+        batches = list(exporter.iter_batches())
+    assert [batch.num_rows for batch in batches] == [60, 60, 10]
+    table = pyarrow.Table.from_batches(batches)
+    assert table.column("display_id").to_pylist() == list(range(130))
+    assert table.column("created_at")[0].as_py() == datetime(2023, 5, 1, 10, tzinfo=timezone.utc)
+    assert table.column("type_fields.serial_5")[3].as_py() == "S3"
+
+
+def test_typed_type_fields(fake_request_service):
+    type_fields_model = create_type_field_model(5, [{"name": "cost_5", "data_type": "decimal"}])
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service), type_fields_model=type_fields_model)
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(_assets(3))):
+        table = exporter.to_table()
+    assert table.column("type_fields.cost_5").to_pylist() == [12.5] * 3
+    assert "type_fields.serial_5" not in table.column_names
+
+
+def test_endpoint_without_model_infers_schema(fake_request_service):
+    end_point = GenericPluralEndpoint(fake_request_service)
+    items = [{"id": 1, "name": "a", "custom": {"x": 1}}, {"id": 2, "name": None, "custom": {"x": 2}}]
+    exporter = ColumnarExporter(end_point)
+    with patch.object(GenericPluralEndpoint, "get_all", side_effect=_fake_get_all(items)):
+        table = exporter.to_table()
+    assert table.column_names == ["id", "name", "custom.x"]
+    assert table.column("custom.x").to_pylist() == [1, 2]
+
+
+def test_write_parquet(fake_request_service, tmp_path):
+    pytest.importorskip("pyarrow.parquet")
+    import pyarrow.parquet
+
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service), batch_size=40)
+    path = tmp_path / "assets.parquet"
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(_assets(100))):
+        assert exporter.write_parquet(str(path)) == 100
+    parquet_file = pyarrow.parquet.ParquetFile(str(path))
+    assert parquet_file.metadata.num_rows == 100
+    assert parquet_file.metadata.num_row_groups == 2
+
+
+def test_to_dataframe(fake_request_service):
+    pytest.importorskip("pandas")
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service))
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(_assets(5))):
+        frame = exporter.to_dataframe()
+    assert list(frame["display_id"]) == list(range(5))
+
+
+def test_inferred_numeric_type_field_keeps_later_fractional_values(fake_request_service):
+    items = [{"id": i, "type_fields": {"cost_5": 10}} for i in range(2)] + [{"id": 2, "type_fields": {"cost_5": 10.5}}]
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service), batch_size=2)
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(items, page_size=2)):
+        table = exporter.to_table()
+    assert table.schema.field("type_fields.cost_5").type == pyarrow.float64()
+    assert table.column("type_fields.cost_5").to_pylist() == [10.0, 10.0, 10.5]
+
+
+def test_later_value_not_fitting_inferred_type_raises(fake_request_service):
+    items = [{"id": 0, "type_fields": {"cost_5": 10}}, {"id": 1, "type_fields": {"cost_5": "n/a"}}]
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service), batch_size=1)
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(items, page_size=1)):
+        with pytest.raises(ValueError, match="type_fields.cost_5"):
+            exporter.to_table()
+
+
+def test_declared_integer_column_is_never_truncated(fake_request_service):
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service))
+    with pytest.raises(ValueError, match="display_id"):
+        exporter.record_batch([{"id": 1, "display_id": 10.5}])
+
+
+def test_key_first_seen_in_later_batch_raises(fake_request_service):
+    items = [{"id": 0, "type_fields": {"cost_5": 10}}, {"id": 1, "type_fields": {"cost_5": 5, "serial_6": "S1"}}]
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service), batch_size=1)
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(items, page_size=1)):
+        with pytest.raises(ValueError, match="type_fields.serial_6"):
+            exporter.to_table()
+
+
+def test_given_schema_keeps_only_its_columns(fake_request_service):
+    items = [{"id": 0, "type_fields": {"cost_5": 10}}, {"id": 1, "type_fields": {"cost_5": 5, "serial_6": "S1"}}]
+    schema = pyarrow.schema([pyarrow.field("id", pyarrow.int64()), pyarrow.field("type_fields.cost_5", pyarrow.int64())])
+    exporter = ColumnarExporter(AssetsEndPoint(fake_request_service), batch_size=1, schema=schema)
+    with patch.object(AssetsEndPoint, "get_all", side_effect=_fake_get_all(items, page_size=1)):
+        table = exporter.to_table()
+    assert table.schema == schema
+    assert table.column("type_fields.cost_5").to_pylist() == [10, 5]
@@ -0,0 +1,122 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.adapters import HTTPAdapter
+
+from fshelper.adapters import FreshServiceAdapter
+from fshelper.deadline import Deadline
+from fshelper.endpoints import GenericEndPoint
+from fshelper.errors import DeadlineExceeded
+from fshelper.ratelimit import RateLimiter
+from fshelper.retry import RetryPolicy
+from fshelper.v2 import AssetsEndPoint
+
+
+def test_deadline_shortens_timeout_to_remaining_time():
+    deadline = Deadline(5)
+    assert deadline.timeout_for(30) == pytest.approx(5, abs=0.1)
+    assert deadline.timeout_for(2) == 2
+    connect, read = deadline.timeout_for((3.05, 30))
+    assert connect == 3.05
+    assert read == pytest.approx(5, abs=0.1)
+
+
+def test_deadline_raises_once_passed():
+    with pytest.raises(DeadlineExceeded):
+        Deadline(-1).timeout_for(30)
+
+
+def test_get_sends_timeout_override(fake_request_service, faker):
+    with fake_request_service as fake_rs:
+        end_point = GenericEndPoint(fake_rs)
+        _ = end_point.get(faker.pyint(), timeout=7)
+    assert end_point.request_service.session.send.call_args.kwargs["timeout"] == 7
+
+
+def test_get_all_past_deadline_not_sent(fake_request_service):
+    with fake_request_service as fake_rs:
+        end_point = AssetsEndPoint(fake_rs)
+        with pytest.raises(DeadlineExceeded):
+            next(end_point.get_all(deadline=Deadline(-1)))
+    assert end_point.request_service.session.send.called is False
+
+
+@patch("fshelper.deadline.time.monotonic")
+def test_delete_permanently_second_request_not_sent_past_deadline(mock_monotonic, fake_request_service, faker):
+    """The delete_forever request is not sent when the deadline passed during the first request."""
+    mock_monotonic.side_effect = [0, 1, 11]
+    with fake_request_service as fake_rs:
+        end_point = AssetsEndPoint(fake_rs)
+        with pytest.raises(DeadlineExceeded):
+            end_point.delete(faker.pyint(), permanently=True, timeout=30, deadline=10)
+    assert end_point.request_service.session.send.call_count == 1
+
+
+@patch.object(HTTPAdapter, "send")
+def test_adapter_sends_default_timeout_when_none_given(mock_send):
+    adapter = FreshServiceAdapter(timeout=(3.05, 30))
+    adapter.send(MagicMock(), timeout=None)
+    assert mock_send.call_args.kwargs["timeout"] == (3.05, 30)
+    adapter.send(MagicMock(), timeout=5)
+    assert mock_send.call_args.kwargs["timeout"] == 5
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch("fshelper.ratelimit.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_does_not_wait_for_retry_after_past_deadline(mock_send, mock_limiter_sleep, mock_sleep):
+    """A 429 response asking to wait longer than the time left raises DeadlineExceeded instead of waiting."""
+    mock_send.return_value = MagicMock(status_code=429, headers={"Retry-After": "60"})
+    request = MagicMock(method="GET", url="https://x.freshservice.com/api/v2/assets")
+    request.deadline = Deadline(5)
+    adapter = FreshServiceAdapter(rate_limiter=RateLimiter(), retry_policy=RetryPolicy())
+    with pytest.raises(DeadlineExceeded):
+        adapter.send(request, timeout=30)
+    assert mock_send.call_count == 1
+    assert mock_send.call_args.kwargs["timeout"] == pytest.approx(5, abs=0.1)
+    assert not mock_limiter_sleep.called and not mock_sleep.called
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_retry_policy_respects_deadline(mock_send, mock_sleep):
+    mock_send.return_value = MagicMock(status_code=503, headers={"Retry-After": "60"})
+    request = MagicMock(method="GET", url="https://x.freshservice.com/api/v2/assets")
+    request.deadline = Deadline(5)
+    adapter = FreshServiceAdapter(retry_policy=RetryPolicy())
+    with pytest.raises(DeadlineExceeded):
+        adapter.send(request)
+    assert mock_send.call_count == 1
+    assert not mock_sleep.called
+
+
+def test_get_all_deadline_reaches_adapter(fake_request_service):
+    with fake_request_service as fake_rs:
+        fake_rs.timeout = 30
+        fake_rs.session.send.return_value = MagicMock(content=b'{"assets": []}')
+        end_point = AssetsEndPoint(fake_rs)
+        deadline = Deadline(10)
+        list(end_point.get_all(deadline=deadline))
+    assert fake_rs.session.prepare_request.return_value.deadline is deadline
+
+
+def test_async_transport_does_not_wait_for_retry_after_past_deadline(fake_credential, fake_fs_domain):
+    httpx = pytest.importorskip("httpx")
+    import asyncio
+    from fshelper.aio import AsyncAssetsEndPoint, AsyncRequestService
+
+    requests_sent = []
+
+    def handler(request):
+        requests_sent.append(request)
+        return httpx.Response(429, headers={"Retry-After": "60"}, json={})
+
+    async def get_all():
+        transport = httpx.MockTransport(handler)
+        async with AsyncRequestService(fake_credential, fake_fs_domain, transport=transport) as request_service:
+            async for _ in AsyncAssetsEndPoint(request_service).get_all(deadline=5):
+                pass
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(asyncio.wait_for(get_all(), 5))
+    assert len(requests_sent) == 1
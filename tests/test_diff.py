@@ -0,0 +1,25 @@
+from fshelper.diff import changed_fields
+
+
+def test_changed_fields_keeps_only_different_values():
+    assert changed_fields({"name": "a", "impact": "low"}, {"name": "a", "impact": "high"}) == {"impact": "high"}
+
+
+def test_changed_fields_leaves_missing_fields_unchanged():
+    assert changed_fields({"name": "a", "impact": "low"}, {"name": "a"}) == {}
+
+
+def test_changed_fields_treats_missing_current_field_as_none():
+    assert changed_fields({"name": "a"}, {"name": "a", "user_id": None}) == {}
+    assert changed_fields({"name": "a", "user_id": 3}, {"user_id": None}) == {"user_id": None}
+
+
+def test_changed_fields_compares_type_fields_field_by_field():
+    current = {"type_fields": {"cost_1": 10, "os_1": "linux"}}
+    assert changed_fields(current, {"type_fields": {"cost_1": 10, "os_1": "bsd"}}) == {"type_fields": {"os_1": "bsd"}}
+    assert changed_fields(current, {"type_fields": {"cost_1": 10}}) == {}
+    assert changed_fields({}, {"type_fields": {"cost_1": 10}}) == {"type_fields": {"cost_1": 10}}
+
+
+def test_changed_fields_ignores_fields():
+    assert changed_fields({"id": 1}, {"id": 2, "display_id": 3}, ignore=("id", "display_id")) == {}
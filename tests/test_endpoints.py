@@ -1,7 +1,12 @@
+import json
+import re
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
 from requests import Session
+from requests.exceptions import HTTPError
 
 from fshelper import RequestService
 from fshelper.endpoints import GenericEndPoint, GenericPluralEndpoint
@@ -140,3 +145,194 @@ def test_create_does_not_send_read_only_fields(fake_request_service, ):
         assert _send_request_call_data["a"] == "a"  # the data from `a` field was sent;
         with pytest.raises(KeyError):
             _ = _send_request_call_data["c"]  # `c` is a read only field and should have been removed before being sent.
+
+
+def _fake_pages(plural_endpoint, nb_items, requested_pages):
+    """Fake `send_request` returning pages of `nb_items` items in total and recording the requested page numbers."""
+
+    def fake_send_request(url):
+        page = int(re.search(r"page=(\d+)", url).group(1))
+        requested_pages.append(page)
+        start = (page - 1) * plural_endpoint.items_per_page
+        stop = min(page * plural_endpoint.items_per_page, nb_items)
+        return {"items": [{"id": i} for i in range(start, max(start, stop))]}
+
+    return fake_send_request
+
+
+def _fake_page_responses(plural_endpoint, nb_items, requested_pages, total=None):
+    """Fake `_send` returning page responses like the FreshService API, recording the requested page numbers.
+
+    The 'link' header, and so the `links` of the response, only has a 'next' link when there is a next page, and the
+    response has no total count unless `total` is given.
+    """
+    lock = threading.Lock()
+
+    def fake_send(url, **_):
+        page = int(re.search(r"page=(\d+)", url).group(1))
+        with lock:
+            requested_pages.append(page)
+        start = (page - 1) * plural_endpoint.items_per_page
+        stop = min(page * plural_endpoint.items_per_page, nb_items)
+        body = {"items": [{"id": i} for i in range(start, max(start, stop))]}
+        if total is not None:
+            body["total"] = total
+        links = {"next": {"url": plural_endpoint.paginate_url(page=page + 1)}} if stop < nb_items else {}
+        return MagicMock(links=links, content=json.dumps(body).encode())
+
+    return fake_send
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_get_all_concurrent_returns_all_items(mock_request_service, ordered):
+    """Concurrent pagination follows the 'next' links of the pages and returns every item once."""
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    nb_items = plural_endpoint.items_per_page * 7 + 5
+    plural_endpoint._send = _fake_page_responses(plural_endpoint, nb_items, requested_pages)
+    pages = list(plural_endpoint.get_all(workers=3, ordered=ordered))
+    ids = [item["id"] for page in pages for item in page]
+    if ordered:
+        assert ids == list(range(nb_items))
+    assert sorted(ids) == list(range(nb_items))
+
+
+def test_get_all_concurrent_stops_at_full_page_without_next_link(mock_request_service):
+    """With an exact multiple of the page size, the full last page has no 'next' link and no page after it is
+    requested once it has been seen."""
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    nb_items = plural_endpoint.items_per_page * 4
+    plural_endpoint._send = _fake_page_responses(plural_endpoint, nb_items, requested_pages)
+    pages = list(plural_endpoint.get_all(workers=2, ordered=True))
+    assert sum(len(page) for page in pages) == nb_items
+    # Page 5 may already be in flight when page 4 arrives, but nothing is requested after that.
+    assert max(requested_pages) <= 5
+    assert sorted(set(requested_pages)) == sorted(requested_pages)
+
+
+def test_get_all_concurrent_skips_empty_final_page_with_total(mock_request_service):
+    """With a total given in the first response, no request is made for the empty page after the last full page."""
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    nb_items = plural_endpoint.items_per_page * 4
+    plural_endpoint._send = _fake_page_responses(plural_endpoint, nb_items, requested_pages, total=nb_items)
+    pages = list(plural_endpoint.get_all(workers=4))
+    assert sum(len(page) for page in pages) == nb_items
+    assert max(requested_pages) == 4
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_get_all_does_not_yield_empty_pages(mock_request_service, workers):
+    """Sequential and concurrent pagination agree: the empty page after a last full page isn't yielded."""
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    nb_items = plural_endpoint.items_per_page * 2
+    plural_endpoint.send_request = _fake_pages(plural_endpoint, nb_items, requested_pages)
+    plural_endpoint._send = _fake_page_responses(plural_endpoint, nb_items, requested_pages)
+    pages = list(plural_endpoint.get_all(workers=workers))
+    assert [len(page) for page in pages] == [plural_endpoint.items_per_page] * 2
+
+
+@pytest.mark.parametrize("workers", [None, 3])
+def test_get_all_of_empty_resource_yields_no_page(mock_request_service, workers):
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    plural_endpoint.send_request = _fake_pages(plural_endpoint, 0, [])
+    plural_endpoint._send = _fake_page_responses(plural_endpoint, 0, [])
+    assert list(plural_endpoint.get_all(workers=workers)) == []
+
+
+def test_iter_items_stream_rejects_concurrent_options(mock_request_service):
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    with pytest.raises(ValueError, match="workers, prefetch"):
+        next(plural_endpoint.iter_items(stream=True, workers=4, prefetch=2))
+
+
+def test_iter_items_yields_items_across_pages(mock_request_service):
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    nb_items = plural_endpoint.items_per_page * 2 + 3
+    plural_endpoint.send_request = _fake_pages(plural_endpoint, nb_items, requested_pages)
+    assert [item["id"] for item in plural_endpoint.iter_items()] == list(range(nb_items))
+
+
+def test_iter_items_limit_does_not_fetch_later_pages(mock_request_service):
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    plural_endpoint.send_request = _fake_pages(plural_endpoint, plural_endpoint.items_per_page * 5, requested_pages)
+    items = list(plural_endpoint.iter_items(limit=plural_endpoint.items_per_page + 1))
+    assert len(items) == plural_endpoint.items_per_page + 1
+    assert requested_pages == [1, 2]
+
+
+def test_iter_items_projects_fields(mock_request_service):
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    plural_endpoint.send_request = lambda _: {"items": [{"id": 1, "name": "a", "description": "b"}]}
+    assert list(plural_endpoint.iter_items(fields=("id", "name"))) == [{"id": 1, "name": "a"}]
+
+
+def test_get_all_prefetch_yields_pages_in_order(mock_request_service):
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    nb_items = plural_endpoint.items_per_page * 6 + 1
+    plural_endpoint.send_request = _fake_pages(plural_endpoint, nb_items, requested_pages)
+    pages = list(plural_endpoint.get_all(prefetch=2))
+    assert [item["id"] for page in pages for item in page] == list(range(nb_items))
+
+
+def test_get_all_prefetch_bounded_by_read_ahead_window(mock_request_service):
+    """With a caller that stops after the first page, no more than the window plus the page in flight are requested."""
+    requested_pages = []
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    plural_endpoint.send_request = _fake_pages(plural_endpoint, plural_endpoint.items_per_page * 50, requested_pages)
+    pages = plural_endpoint.get_all(prefetch=2)
+    next(pages)
+    time.sleep(0.3)
+    pages.close()
+    assert len(requested_pages) <= 1 + 2 + 1
+
+
+def test_get_all_prefetch_raises_request_error_to_caller(mock_request_service):
+    plural_endpoint = GenericPluralEndpoint(mock_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    plural_endpoint.send_request = MagicMock(side_effect=HTTPError("503 Server Error"))
+    with pytest.raises(HTTPError):
+        list(plural_endpoint.get_all(prefetch=2))
+
+
+def test_shared_endpoint_calls_do_not_change_identifier(mock_request_service):
+    generic_endpoint = GenericEndPoint(mock_request_service)
+    generic_endpoint._endpoint = "/api/v2/things"
+    generic_endpoint.send_request = MagicMock(side_effect=lambda url, **_: {"url": url})
+    generic_endpoint.get(1)
+    generic_endpoint.update({"name": "a"}, 2)
+    generic_endpoint.delete(3)
+    assert generic_endpoint.identifier is None
+    urls = [call.args[0] for call in generic_endpoint.send_request.call_args_list]
+    assert [url.rsplit("/", 1)[1] for url in urls] == ["1", "2", "3"]
+
+
+def test_shared_endpoint_is_thread_safe(mock_request_service):
+    from concurrent.futures import ThreadPoolExecutor
+
+    generic_endpoint = GenericEndPoint(mock_request_service)
+    generic_endpoint._endpoint = "/api/v2/things"
+
+    def fake_send_request(url, **_):
+        time.sleep(0.001)
+        return {"id": int(url.rsplit("/", 1)[1])}
+
+    generic_endpoint.send_request = fake_send_request
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(generic_endpoint.get, range(200)))
+    assert [result["id"] for result in results] == list(range(200))
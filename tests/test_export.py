@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from fshelper.export import export, main
+from fshelper.v2 import TicketsEndPoint
+
+TICKETS = [{"id": i, "subject": f"ticket {i}", "custom_fields": {"site": "HQ"}} for i in range(45)]
+
+
+@pytest.fixture
+def fake_tickets():
+    def iter_items(end_point, query=None, fields=None, **_):
+        for ticket in TICKETS:
+            yield {key: ticket[key] for key in fields} if fields else ticket
+
+    with patch.object(TicketsEndPoint, "iter_items", autospec=True, side_effect=iter_items) as mock:
+        yield mock
+
+
+def test_export_ndjson(fake_request_service, fake_tickets):
+    output = io.BytesIO()
+    report = export(TicketsEndPoint(fake_request_service), output, workers=4)
+    lines = output.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == TICKETS
+    assert report.nb_records == 45
+    assert report.nb_bytes == len(output.getvalue())
+    assert fake_tickets.call_args.kwargs["workers"] == 4
+
+
+def test_export_csv_with_projection(fake_request_service, fake_tickets):
+    output = io.BytesIO()
+    export(TicketsEndPoint(fake_request_service), output, "csv", fields=["subject", "id"])
+    rows = list(csv.reader(io.StringIO(output.getvalue().decode("utf-8"))))
+    assert rows[0] == ["subject", "id"]
+    assert rows[1] == ["ticket 0", "0"]
+    assert len(rows) == 46
+
+
+def test_export_gzip_file(fake_request_service, fake_tickets, tmp_path):
+    path = tmp_path / "tickets.ndjson.gz"
+    report = export(TicketsEndPoint(fake_request_service), str(path))
+    with gzip.open(str(path)) as file:
+        assert len(file.read()) == report.nb_bytes
+
+
+def test_export_csv_nested_values_are_json(fake_request_service, fake_tickets):
+    output = io.BytesIO()
+    export(TicketsEndPoint(fake_request_service), output, "csv")
+    row = next(csv.DictReader(io.StringIO(output.getvalue().decode("utf-8"))))
+    assert json.loads(row["custom_fields"]) == {"site": "HQ"}
+
+
+def test_export_csv_without_fields_raises_on_new_key(fake_request_service, fake_tickets):
+    tickets = [{"id": 1, "subject": "first"}, {"id": 2, "subject": "second", "due_by": "2023-05-01"}]
+    fake_tickets.side_effect = lambda *_, **__: iter(tickets)
+    output = io.BytesIO()
+    with pytest.raises(ValueError, match="due_by"):
+        export(TicketsEndPoint(fake_request_service), output, "csv")
+
+
+def test_export_unknown_format(fake_request_service):
+    with pytest.raises(ValueError):
+        export(TicketsEndPoint(fake_request_service), io.BytesIO(), "xml")
+
+
+def test_main(fake_tickets, tmp_path, capsys):
+    path = tmp_path / "tickets.csv"
+    with patch("fshelper.export.RequestService") as request_service:
+        assert main(["tickets", str(path), "--domain", "example", "--api-key", "key", "--fields", "id"]) == 0
+    assert request_service.call_args.args[1] == "example"
+    assert path.read_text().splitlines()[:2] == ["id", "0"]
+    assert "Exported 45 records" in capsys.readouterr().err
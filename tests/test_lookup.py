@@ -0,0 +1,80 @@
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from fshelper.errors import UnresolvedLookup
+from fshelper.lookup import LookupService, LookupTable
+from fshelper.models import AssetCreation
+from fshelper.v2 import LocationsEndPoint, RequestersEndPoint
+
+LOCATIONS = [{"id": 1, "name": "Head Office"}, {"id": 2, "name": "Warehouse"}]
+REQUESTERS = [
+    {"id": 10, "first_name": "Ada", "last_name": "Lovelace", "primary_email": "ada@example.com",
+     "secondary_emails": ["ada.l@example.com"]},
+]
+
+
+@pytest.fixture
+def fake_get_all():
+    """Fake `send_request` answering the paginated list requests, counting the first page requests."""
+    first_pages = []
+
+    def send_request(end_point, url, *_, **__):
+        items = {LocationsEndPoint: LOCATIONS, RequestersEndPoint: REQUESTERS}[type(end_point)]
+        page = int(parse_qs(urlparse(url).query)["page"][0])
+        if page == 1:
+            first_pages.append(url)
+        per_page = end_point.items_per_page
+        return {end_point.plural_resource_key: items[(page - 1) * per_page:page * per_page]}
+
+    with patch("fshelper.endpoints.GenericEndPoint.send_request", autospec=True, side_effect=send_request):
+        yield first_pages
+
+
+def test_lookup_table_is_case_insensitive(fake_request_service, fake_get_all):
+    table = LookupTable(LocationsEndPoint(fake_request_service))
+    assert table.get(" head office ") == 1
+    assert table.get("WAREHOUSE") == 2
+    assert table.get("Nowhere") is None
+    assert len(fake_get_all) == 1
+
+
+def test_lookup_table_reads_every_page(fake_request_service, fake_get_all):
+    end_point = LocationsEndPoint(fake_request_service)
+    end_point._items_per_page = 1
+    table = LookupTable(end_point)
+    assert table.get("Head Office") == 1
+    assert table.get("Warehouse") == 2
+
+
+def test_lookup_table_refreshes_after_ttl(fake_request_service, fake_get_all):
+    table = LookupTable(LocationsEndPoint(fake_request_service), ttl=60)
+    with patch("fshelper.lookup.time.monotonic") as monotonic:
+        for now in (0, 10, 100):
+            monotonic.return_value = now
+            table.get("Warehouse")
+    assert len(fake_get_all) == 2
+
+
+def test_resolve_payloads_loads_each_table_once(fake_request_service, fake_get_all):
+    lookup = LookupService(fake_request_service)
+    payloads = [
+        {"name": "laptop 1", "asset_type_id": 5, "location_id": "Warehouse", "user_id": "ADA@example.com"},
+        {"name": "laptop 2", "asset_type_id": 5, "location_id": "head office", "user_id": "Ada Lovelace"},
+        {"name": "laptop 3", "asset_type_id": 5, "location_id": 2, "user_id": "ada.l@example.com"},
+        AssetCreation(name="laptop 4", asset_type_id=5, location_id=1),
+    ]
+    resolved = lookup.resolve_payloads(payloads)
+    assert [payload["location_id"] for payload in resolved] == [2, 1, 2, 1]
+    assert [payload.get("user_id") for payload in resolved] == [10, 10, 10, None]
+    assert payloads[0]["location_id"] == "Warehouse"
+    assert len(fake_get_all) == 2
+
+
+def test_resolve_unknown_value_raises(fake_request_service, fake_get_all):
+    lookup = LookupService(fake_request_service)
+    with pytest.raises(UnresolvedLookup) as exc_info:
+        lookup.resolve_payload({"name": "laptop", "asset_type_id": 5, "location_id": "Moon base"})
+    assert exc_info.value.field == "location_id"
+    assert exc_info.value.value == "Moon base"
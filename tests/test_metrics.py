@@ -0,0 +1,146 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+
+from fshelper import RequestService
+from fshelper.adapters import FreshServiceAdapter
+from fshelper.cache import ResponseCache
+from fshelper.metrics import Histogram, RequestMetrics, endpoint_label
+from fshelper.ratelimit import RateLimiter
+from fshelper.retry import RetryPolicy
+
+BASE_URL = "https://example.freshservice.com"
+
+
+def _request(method, path, data=None):
+    request = PreparedRequest()
+    request.prepare(method=method, url=f"{BASE_URL}{path}", data=json.dumps(data) if data else None)
+    return request
+
+
+def _response(status_code=200, data=None, headers=None):
+    resp = Response()
+    resp.status_code = status_code
+    resp.headers.update(headers or {})
+    resp._content = json.dumps(data or {}).encode()
+    resp._content_consumed = True
+    return resp
+
+
+def test_endpoint_label_replaces_ids_and_drops_query():
+    assert endpoint_label(f"{BASE_URL}/api/v2/assets/12/requests?page=2") == "/api/v2/assets/:id/requests"
+    assert endpoint_label(f"{BASE_URL}/api/v2/assets?page=2&per_page=100") == "/api/v2/assets"
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+    for _ in range(98):
+        histogram.observe(0.05)
+    histogram.observe(5.0)
+    histogram.observe(5.0)
+    assert histogram.quantile(0.5) == pytest.approx(0.051, rel=0.01)
+    assert 1.0 < histogram.quantile(0.99) <= 10.0
+    assert Histogram().quantile(0.99) is None
+
+
+@patch.object(HTTPAdapter, "send")
+def test_adapter_records_requests_and_calls_hooks(mock_send):
+    mock_send.return_value = _response(data={"asset": {"id": 1}})
+    metrics = RequestMetrics()
+    before, after = MagicMock(), MagicMock()
+    adapter = FreshServiceAdapter(metrics=metrics, before_request=[before], after_request=[after])
+    request = _request("PUT", "/api/v2/assets/3", data={"name": "laptop"})
+    adapter.send(request)
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == {"PUT /api/v2/assets/:id 200": 1}
+    assert snapshot["latency"]["PUT /api/v2/assets/:id"]["count"] == 1
+    assert snapshot["bytes_sent"]["PUT /api/v2/assets/:id"] == len(request.body)
+    assert snapshot["bytes_received"]["PUT /api/v2/assets/:id"] == len(b'{"asset": {"id": 1}}')
+    before.assert_called_once_with(request)
+    assert after.call_args.args[1].status_code == 200
+    assert after.call_args.args[3] is None
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_records_retries_throttles_and_waits(mock_send, mock_sleep):
+    mock_send.side_effect = [
+        ConnectionError(), _response(429, headers={"Retry-After": "1"}), _response(503), _response(),
+    ]
+    metrics = RequestMetrics()
+    rate_limiter = RateLimiter(max_requeues=1)
+    rate_limiter.acquire = MagicMock(side_effect=[0.0, 0.5, 0.0, 0.0])
+    adapter = FreshServiceAdapter(
+        rate_limiter=rate_limiter, retry_policy=RetryPolicy(max_attempts=4, jitter=False), metrics=metrics
+    )
+    adapter.send(_request("GET", "/api/v2/assets"))
+    snapshot = metrics.snapshot()
+    assert snapshot["retries"] == {"GET ConnectionError": 1, "GET 503": 1}
+    assert snapshot["throttled"] == 1
+    assert (snapshot["rate_limit_waits"], snapshot["rate_limit_wait_seconds"]) == (1, 0.5)
+    assert snapshot["requests"] == {"GET /api/v2/assets 200": 1}
+
+
+@patch.object(HTTPAdapter, "send")
+def test_adapter_records_errors(mock_send):
+    mock_send.side_effect = ValueError("boom")
+    metrics = RequestMetrics()
+    after = MagicMock()
+    adapter = FreshServiceAdapter(metrics=metrics, after_request=[after])
+    with pytest.raises(ValueError):
+        adapter.send(_request("GET", "/api/v2/assets"))
+    assert metrics.snapshot()["requests"] == {"GET /api/v2/assets error": 1}
+    assert isinstance(after.call_args.args[3], ValueError)
+
+
+@patch.object(HTTPAdapter, "send")
+def test_adapter_records_cache_outcomes(mock_send):
+    mock_send.return_value = _response(data={"location": {"id": 1}})
+    metrics = RequestMetrics()
+    adapter = FreshServiceAdapter(cache=ResponseCache(), metrics=metrics)
+    adapter.send(_request("GET", "/api/v2/locations/1"))
+    adapter.send(_request("GET", "/api/v2/locations/1"))
+    snapshot = metrics.snapshot()
+    assert snapshot["cache"] == {"miss": 1, "hit": 1}
+    assert snapshot["requests"] == {"GET /api/v2/locations/:id 200": 1}
+    assert snapshot["latency"]["GET /api/v2/locations/:id"]["count"] == 1
+
+
+@patch("fshelper.cache.time.monotonic")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_records_revalidation_as_304(mock_send, mock_monotonic):
+    mock_monotonic.return_value = 0
+    mock_send.side_effect = [_response(data={"location": {"id": 1}}, headers={"ETag": '"abc"'}), _response(304)]
+    metrics = RequestMetrics()
+    adapter = FreshServiceAdapter(cache=ResponseCache(ttl=10), metrics=metrics)
+    adapter.send(_request("GET", "/api/v2/locations/1"))
+    mock_monotonic.return_value = 11
+    adapter.send(_request("GET", "/api/v2/locations/1"))
+    assert metrics.snapshot()["requests"] == {"GET /api/v2/locations/:id 200": 1, "GET /api/v2/locations/:id 304": 1}
+
+
+def test_prometheus_text():
+    metrics = RequestMetrics(latency_buckets=(0.1, 1.0))
+    metrics.observe_request("GET", f"{BASE_URL}/api/v2/assets?page=1", 200, 0.05, 0, 100)
+    metrics.observe_request("GET", f"{BASE_URL}/api/v2/assets?page=2", 429, 2.0)
+    metrics.observe_throttle()
+    text = metrics.to_prometheus()
+    assert 'fshelper_requests_total{endpoint="/api/v2/assets",method="GET",status="200"} 1' in text
+    assert 'fshelper_request_duration_seconds_bucket{endpoint="/api/v2/assets",method="GET",le="0.1"} 1' in text
+    assert 'fshelper_request_duration_seconds_bucket{endpoint="/api/v2/assets",method="GET",le="+Inf"} 2' in text
+    assert "fshelper_throttled_total 1" in text
+    assert "# TYPE fshelper_request_duration_seconds histogram" in text
+
+
+def test_request_service_gives_metrics_and_hooks_to_adapter(fake_credential, fake_fs_domain):
+    hook = MagicMock()
+    with RequestService(fake_credential, fake_fs_domain, after_request=[hook]) as request_service:
+        adapter = request_service.session.get_adapter("https://")
+        assert adapter.metrics is request_service.metrics
+        request_service.before_request_hooks.append(hook)
+        assert adapter.before_request == [hook]
+        assert adapter.after_request == [hook]
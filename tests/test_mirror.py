@@ -0,0 +1,125 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.exceptions import HTTPError
+
+from fshelper.mirror import InventoryMirror
+from fshelper.v2 import AssetsEndPoint, AssetTypeEndPoint, LocationsEndPoint
+
+
+def _asset(display_id, updated_at, name=None):
+    return {"id": display_id * 10, "display_id": display_id, "name": name or f"asset {display_id}",
+            "asset_type_id": 1, "updated_at": updated_at}
+
+
+class FakeInventory:
+    """Fake `iter_items` and asset GETs for the endpoints the mirror syncs, recording the asset requests."""
+
+    def __init__(self):
+        self.assets = []
+        self.trashed = []
+        self.current = {}
+        """Assets by display ID returned by a GET of a single asset, the others are not found."""
+        self.queries = []
+        self.requested = []
+
+    def iter_items(self, end_point, query=None, **_):
+        if isinstance(end_point, LocationsEndPoint):
+            return iter([{"id": 1, "name": "HQ"}])
+        if isinstance(end_point, AssetTypeEndPoint):
+            return iter([{"id": 1, "name": "Laptop"}])
+        self.queries.append(query)
+        return iter(self.trashed if query == "trashed=true" else self.assets)
+
+    def send_request(self, end_point, url, **_):
+        display_id = int(url.split("?")[0].rsplit("/", 1)[-1])
+        self.requested.append(display_id)
+        if display_id not in self.current:
+            raise HTTPError(response=MagicMock(status_code=404))
+        return {"asset": self.current[display_id]}
+
+
+@pytest.fixture
+def fake_inventory():
+    inventory = FakeInventory()
+    with patch.object(AssetsEndPoint, "iter_items", autospec=True, side_effect=inventory.iter_items), \
+            patch.object(LocationsEndPoint, "iter_items", autospec=True, side_effect=inventory.iter_items), \
+            patch.object(AssetTypeEndPoint, "iter_items", autospec=True, side_effect=inventory.iter_items), \
+            patch.object(AssetsEndPoint, "send_request", autospec=True, side_effect=inventory.send_request):
+        yield inventory
+
+
+def test_first_sync_stores_everything(fake_request_service, fake_inventory):
+    fake_inventory.assets = [_asset(1, "2023-05-01T10:00:00Z"), _asset(2, "2023-05-02T10:00:00Z")]
+    with InventoryMirror(":memory:", fake_request_service) as mirror:
+        counts = mirror.sync()
+        assert counts == {"locations": 1, "asset_types": 1, "assets": 2, "deleted": 0, "restored": 0}
+        assert mirror.high_water_mark == "2023-05-02T10:00:00Z"
+        assert [asset["display_id"] for asset in mirror.assets()] == [1, 2]
+        assert [location["name"] for location in mirror.locations()] == ["HQ"]
+    assert fake_inventory.queries[0] == "include=type_fields"
+
+
+def test_incremental_sync_requests_assets_updated_since_high_water_mark(fake_request_service, fake_inventory):
+    fake_inventory.assets = [_asset(1, "2023-05-01T10:00:00Z"), _asset(2, "2023-05-02T10:00:00Z")]
+    with InventoryMirror(":memory:", fake_request_service) as mirror:
+        mirror.sync()
+        fake_inventory.assets = [_asset(2, "2023-05-03T10:00:00Z", name="renamed")]
+        counts = mirror.sync()
+        assert counts["assets"] == 1
+        assert "updated_at" in fake_inventory.queries[-2] and "2023-05-01" in fake_inventory.queries[-2]
+        assert mirror.asset(2)["name"] == "renamed"
+        assert mirror.high_water_mark == "2023-05-03T10:00:00Z"
+
+
+def test_sync_applies_tombstones_and_restores(fake_request_service, fake_inventory):
+    fake_inventory.assets = [_asset(1, "2023-05-01T10:00:00Z"), _asset(2, "2023-05-02T10:00:00Z")]
+    with InventoryMirror(":memory:", fake_request_service) as mirror:
+        mirror.sync()
+        fake_inventory.assets = []
+        fake_inventory.trashed = [_asset(1, "2023-05-04T10:00:00Z")]
+        assert mirror.sync()["deleted"] == 1
+        assert [asset["display_id"] for asset in mirror.assets()] == [2]
+        assert len(list(mirror.assets(include_deleted=True))) == 2
+        fake_inventory.trashed = []
+        fake_inventory.assets = [_asset(1, "2023-05-05T10:00:00Z")]
+        mirror.sync()
+        assert [asset["display_id"] for asset in mirror.assets()] == [1, 2]
+
+
+def test_restore_without_update_clears_tombstone(fake_request_service, fake_inventory):
+    fake_inventory.assets = [_asset(1, "2023-05-01T10:00:00Z"), _asset(2, "2023-05-02T10:00:00Z")]
+    with InventoryMirror(":memory:", fake_request_service) as mirror:
+        mirror.sync()
+        fake_inventory.assets = []
+        fake_inventory.trashed = [_asset(1, "2023-05-01T10:00:00Z")]
+        mirror.sync()
+        fake_inventory.trashed = []
+        fake_inventory.current = {1: _asset(1, "2023-05-01T10:00:00Z")}
+        assert mirror.sync()["restored"] == 1
+        assert [asset["display_id"] for asset in mirror.assets()] == [1, 2]
+
+
+def test_asset_purged_from_trash_is_requested_once(fake_request_service, fake_inventory):
+    fake_inventory.assets = [_asset(1, "2023-05-01T10:00:00Z"), _asset(2, "2023-05-02T10:00:00Z")]
+    with InventoryMirror(":memory:", fake_request_service) as mirror:
+        mirror.sync()
+        fake_inventory.assets = []
+        fake_inventory.trashed = [_asset(1, "2023-05-01T10:00:00Z")]
+        mirror.sync()
+        fake_inventory.trashed = []
+        assert mirror.sync() == {"locations": 1, "asset_types": 1, "assets": 0, "deleted": 1, "restored": 0}
+        mirror.sync()
+        assert fake_inventory.requested == [1]
+        assert [asset["display_id"] for asset in mirror.assets()] == [2]
+        assert len(list(mirror.assets(include_deleted=True))) == 2
+
+
+def test_full_sync_marks_assets_missing_everywhere_purged(fake_request_service, fake_inventory):
+    fake_inventory.assets = [_asset(1, "2023-05-01T10:00:00Z"), _asset(2, "2023-05-02T10:00:00Z")]
+    with InventoryMirror(":memory:", fake_request_service) as mirror:
+        mirror.sync()
+        fake_inventory.assets = [_asset(2, "2023-05-02T10:00:00Z")]
+        assert mirror.sync()["deleted"] == 0
+        assert mirror.sync(full=True)["deleted"] == 1
+        assert [asset["display_id"] for asset in mirror.assets()] == [2]
@@ -0,0 +1,59 @@
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from fshelper.endpoints import GenericPluralEndpoint
+from fshelper.models import AssetFullData, TypeField, construct_trusted
+from fshelper.v2 import AssetsEndPoint
+
+ASSET = {
+    "id": 17,
+    "display_id": 3,
+    "name": "laptop",
+    "asset_type_id": 5,
+    "created_at": "2023-05-01T10:00:00Z",
+    "type_fields": {"serial_5": "A1"},
+    "not_a_field": True,
+}
+
+
+def test_construct_trusted_parses_datetimes_lazily():
+    asset = construct_trusted(AssetFullData, ASSET)
+    assert isinstance(asset, AssetFullData)
+    assert asset.dict()["created_at"] == "2023-05-01T10:00:00Z"
+    assert asset.created_at == datetime.fromisoformat("2023-05-01T10:00:00+00:00")
+    assert asset.dict()["created_at"] == asset.created_at
+    assert asset.updated_at is None
+
+
+def test_construct_trusted_builds_nested_models_and_drops_unknown_fields():
+    asset = construct_trusted(AssetFullData, ASSET)
+    assert isinstance(asset.type_fields, TypeField)
+    assert asset.type_fields.serial_5 == "A1"
+    assert not hasattr(asset, "not_a_field")
+
+
+@pytest.mark.parametrize("trusted", [True, False])
+def test_iter_models_yields_the_model_of_the_endpoint(fake_request_service, trusted):
+    end_point = AssetsEndPoint(fake_request_service)
+    with patch.object(AssetsEndPoint, "iter_items", return_value=iter([ASSET, dict(ASSET, id=18)])) as iter_items:
+        assets = list(end_point.iter_models("include=type_fields", trusted=trusted, limit=2))
+    assert [asset.id for asset in assets] == [17, 18]
+    assert all(isinstance(asset.created_at, datetime) for asset in assets)
+    assert iter_items.call_args.kwargs == {"limit": 2}
+
+
+def test_iter_models_validates_unless_trusted(fake_request_service):
+    end_point = AssetsEndPoint(fake_request_service)
+    invalid = dict(ASSET, asset_type_id="not a number")
+    with patch.object(AssetsEndPoint, "iter_items", side_effect=lambda *_, **__: iter([invalid])):
+        with pytest.raises(ValidationError):
+            list(end_point.iter_models())
+        assert list(end_point.iter_models(trusted=True))[0].asset_type_id == "not a number"
+
+
+def test_iter_models_without_model_raises(fake_request_service):
+    with pytest.raises(ValueError):
+        list(GenericPluralEndpoint(fake_request_service).iter_models())
@@ -0,0 +1,94 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.adapters import HTTPAdapter
+
+from fshelper import RequestService
+from fshelper.adapters import FreshServiceAdapter
+from fshelper.deadline import Deadline
+from fshelper.errors import DeadlineExceeded
+from fshelper.ratelimit import RateLimiter
+from fshelper.retry import RetryPolicy
+
+
+def test_rate_limiter_no_wait_while_tokens_remain():
+    rate_limiter = RateLimiter(requests_per_minute=60)
+    waits = [rate_limiter.reserve() for _ in range(60)]
+    assert all(wait == 0 for wait in waits)
+
+
+def test_rate_limiter_queues_callers_once_bucket_is_empty():
+    """Each request past the bucket size waits one more refill interval than the caller before it."""
+    rate_limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        rate_limiter.reserve()
+    first_wait = rate_limiter.reserve()
+    second_wait = rate_limiter.reserve()
+    assert first_wait == pytest.approx(1, abs=0.1)
+    assert second_wait == pytest.approx(2, abs=0.1)
+    assert rate_limiter.nb_waits == 2
+
+
+def test_rate_limiter_learns_limit_from_headers():
+    rate_limiter = RateLimiter()
+    assert rate_limiter.reserve() == 0
+    rate_limiter.update(200, {"X-RateLimit-Total": "120", "X-RateLimit-Remaining": "0"})
+    assert rate_limiter.requests_per_minute == 120
+    assert rate_limiter.reserve() == pytest.approx(0.5, abs=0.1)
+
+
+def test_rate_limiter_pauses_for_retry_after_on_429():
+    rate_limiter = RateLimiter()
+    rate_limiter.update(429, {"Retry-After": "30"})
+    assert rate_limiter.reserve() == pytest.approx(30, abs=0.1)
+
+
+def test_rate_limiter_gives_token_back_when_deadline_is_exceeded():
+    rate_limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(60):
+        rate_limiter.reserve()
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            rate_limiter.acquire(Deadline(0.5))
+    assert rate_limiter.reserve() == pytest.approx(1, abs=0.1)
+    assert rate_limiter.nb_waits == 1
+
+
+@patch("fshelper.ratelimit.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_sends_again_after_429(mock_send, mock_sleep):
+    throttled = MagicMock(status_code=429, headers={"Retry-After": "2"})
+    ok = MagicMock(status_code=200, headers={"X-RateLimit-Remaining": "10"})
+    mock_send.side_effect = [throttled, ok]
+    adapter = FreshServiceAdapter(rate_limiter=RateLimiter())
+    resp = adapter.send(MagicMock())
+    assert resp is ok
+    assert mock_send.call_count == 2
+    assert mock_sleep.call_args.args[0] == pytest.approx(2, abs=0.1)
+
+
+@patch("fshelper.ratelimit.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_handles_429_with_rate_limiter_only(mock_send, mock_sleep):
+    """A 429 response is queued again `max_requeues` times and not retried by the RetryPolicy on top of it."""
+    mock_send.return_value = MagicMock(status_code=429, headers={"Retry-After": "1"})
+    adapter = FreshServiceAdapter(rate_limiter=RateLimiter(max_requeues=3), retry_policy=RetryPolicy(max_attempts=3))
+    resp = adapter.send(MagicMock(method="GET"))
+    assert resp.status_code == 429
+    assert mock_send.call_count == 4
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_retries_429_without_rate_limiter(mock_send, mock_sleep):
+    mock_send.return_value = MagicMock(status_code=429, headers={"Retry-After": "1"})
+    adapter = FreshServiceAdapter(retry_policy=RetryPolicy(max_attempts=3))
+    adapter.send(MagicMock(method="GET"))
+    assert mock_send.call_count == 3
+
+
+def test_request_service_shares_rate_limiter_with_session_adapter(fake_credential, fake_fs_domain):
+    with RequestService(fake_credential, fake_fs_domain) as request_service:
+        adapter = request_service.session.get_adapter(f"https://{fake_fs_domain}.freshservice.com")
+        assert isinstance(adapter, FreshServiceAdapter)
+        assert adapter.rate_limiter is request_service.rate_limiter
@@ -0,0 +1,110 @@
+from unittest.mock import patch
+
+import pytest
+
+from fshelper.reconcile import Reconciler
+from fshelper.v2 import AssetsEndPoint
+
+
+def _asset(display_id, asset_tag, name, **fields):
+    return {"id": display_id * 10, "display_id": display_id, "asset_tag": asset_tag, "name": name,
+            "asset_type_id": 1, "updated_at": "2024-01-01T00:00:00Z", **fields}
+
+
+CURRENT = [
+    _asset(1, "TAG-1", "laptop 1", type_fields={"cost_1": 10}),
+    _asset(2, "TAG-2", "laptop 2"),
+    _asset(3, "TAG-3", "retired laptop"),
+    _asset(4, None, "untagged"),
+]
+TRASHED = [_asset(5, "TAG-5", "trashed laptop")]
+
+
+class FakeAssets:
+    """Fake requests of the AssetsEndPoint, recording the writes."""
+
+    def __init__(self):
+        self.writes = []
+
+    def iter_items(self, end_point, query=None, **_):
+        return iter(TRASHED if "trashed=true" in query else CURRENT)
+
+    def create(self, end_point, data, enabled=False, **_):
+        self.writes.append(("create", None, data))
+        return {"asset": dict(data, display_id=100)}
+
+    def update(self, end_point, data, identifier=None, **_):
+        self.writes.append(("update", identifier, data))
+        return {"asset": dict(data, display_id=identifier)}
+
+    def restore(self, end_point, display_id=None, **_):
+        self.writes.append(("restore", display_id, None))
+        return {}
+
+    def delete(self, end_point, display_id=None, **_):
+        self.writes.append(("delete", display_id, None))
+        if display_id == 3:
+            raise RuntimeError("boom")
+        return {}
+
+
+@pytest.fixture
+def fake_assets():
+    fake = FakeAssets()
+    with patch.object(AssetsEndPoint, "iter_items", autospec=True, side_effect=fake.iter_items), \
+            patch.object(AssetsEndPoint, "create", autospec=True, side_effect=fake.create), \
+            patch.object(AssetsEndPoint, "update", autospec=True, side_effect=fake.update), \
+            patch.object(AssetsEndPoint, "restore", autospec=True, side_effect=fake.restore), \
+            patch.object(AssetsEndPoint, "delete", autospec=True, side_effect=fake.delete):
+        yield fake
+
+
+DESIRED = [
+    {"asset_tag": "TAG-1", "name": "laptop 1", "type_fields": {"cost_1": 12}},
+    {"asset_tag": "TAG-2", "name": "laptop 2"},
+    {"asset_tag": "TAG-5", "name": "trashed laptop"},
+    {"asset_tag": "TAG-6", "name": "new laptop", "asset_type_id": 1},
+    {"name": "no tag"},
+]
+
+
+def test_plan_sorts_desired_assets_into_actions(fake_request_service, fake_assets):
+    reconciler = Reconciler(AssetsEndPoint(fake_request_service), delete_missing=True)
+    plan = reconciler.plan(DESIRED)
+    assert plan.updates == [(1, {"type_fields": {"cost_1": 12}})]
+    assert plan.restores == [(5, {})]
+    assert plan.creates == [DESIRED[3]]
+    assert plan.deletes == [3]
+    assert plan.unchanged == 1
+    assert plan.invalid == [DESIRED[4]]
+
+
+def test_plan_keeps_current_assets_without_delete_missing(fake_request_service, fake_assets):
+    plan = Reconciler(AssetsEndPoint(fake_request_service)).plan(DESIRED)
+    assert plan.deletes == []
+
+
+def test_dry_run_reports_planned_actions_without_sending(fake_request_service, fake_assets, monkeypatch):
+    monkeypatch.delenv("ALLOW_FS_CREATE_REQUESTS", raising=False)
+    report = Reconciler(AssetsEndPoint(fake_request_service), delete_missing=True).reconcile(DESIRED)
+    assert report.dry_run is True
+    assert fake_assets.writes == []
+    assert (report.created, report.updated, report.restored, report.deleted) == (1, 1, 1, 1)
+    assert str(report).startswith("Dry run")
+
+
+def test_reconcile_sends_plan_and_reports_failures(fake_request_service, fake_assets):
+    report = Reconciler(AssetsEndPoint(fake_request_service), delete_missing=True, workers=2).reconcile(
+        DESIRED, enabled=True
+    )
+    assert sorted(fake_assets.writes, key=repr) == sorted([
+        ("create", None, DESIRED[3]),
+        ("update", 1, {"type_fields": {"cost_1": 12}}),
+        ("restore", 5, None),
+        ("delete", 3, None),
+    ], key=repr)
+    assert report.to_dict() == {
+        "dry_run": False, "created": 1, "updated": 1, "restored": 1, "deleted": 0, "unchanged": 1, "invalid": 1,
+        "failed": 1, "elapsed": report.elapsed,
+    }
+    assert report.failures[0].payload == ("delete", 3, None)
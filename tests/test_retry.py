@@ -0,0 +1,72 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+
+from fshelper.adapters import FreshServiceAdapter
+from fshelper.retry import RetryPolicy
+
+
+def test_retry_delay_none_after_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.retry_delay("GET", 2, 503) is not None
+    assert policy.retry_delay("GET", 3, 503) is None
+
+
+def test_retry_delay_none_for_post_unless_enabled():
+    assert RetryPolicy().retry_delay("POST", 1, 503) is None
+    assert RetryPolicy(retry_non_idempotent=True).retry_delay("POST", 1, 503) is not None
+
+
+def test_retry_delay_none_for_status_not_retried():
+    assert RetryPolicy().retry_delay("GET", 1, 404) is None
+
+
+def test_retry_delay_exponential_backoff_capped():
+    policy = RetryPolicy(max_attempts=10, backoff_base=1, backoff_cap=5, jitter=False)
+    assert [policy.retry_delay("GET", attempt, 503) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+
+def test_retry_delay_jitter_within_backoff():
+    policy = RetryPolicy(max_attempts=10, backoff_base=1, backoff_cap=5)
+    assert all(0 <= policy.retry_delay("GET", 3, 503) <= 4 for _ in range(20))
+
+
+def test_retry_delay_at_least_retry_after():
+    policy = RetryPolicy(backoff_base=1)
+    assert policy.retry_delay("GET", 1, 503, {"Retry-After": "12"}) == pytest.approx(12)
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_retries_transient_status_and_calls_hook(mock_send, _):
+    on_retry = MagicMock()
+    unavailable = MagicMock(status_code=503, headers={})
+    ok = MagicMock(status_code=200, headers={})
+    mock_send.side_effect = [unavailable, ok]
+    adapter = FreshServiceAdapter(retry_policy=RetryPolicy(on_retry=on_retry))
+    resp = adapter.send(MagicMock(method="GET", url="https://x.freshservice.com/api/v2/assets"))
+    assert resp is ok
+    assert on_retry.call_count == 1
+    method, _, attempt, _, reason = on_retry.call_args.args
+    assert (method, attempt, reason) == ("GET", 1, 503)
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_retries_connection_error(mock_send, _):
+    ok = MagicMock(status_code=200, headers={})
+    mock_send.side_effect = [ConnectionError("Connection reset by peer"), ok]
+    adapter = FreshServiceAdapter(retry_policy=RetryPolicy())
+    assert adapter.send(MagicMock(method="GET")) is ok
+
+
+@patch("fshelper.adapters.time.sleep")
+@patch.object(HTTPAdapter, "send")
+def test_adapter_does_not_retry_post(mock_send, _):
+    mock_send.side_effect = [ConnectionError("Connection reset by peer")]
+    adapter = FreshServiceAdapter(retry_policy=RetryPolicy())
+    with pytest.raises(ConnectionError):
+        adapter.send(MagicMock(method="POST"))
+    assert mock_send.call_count == 1
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+from fshelper.adapters import FreshServiceAdapter
+from fshelper.deadline import Deadline
+from fshelper.errors import DeadlineExceeded, InFlightTimeout
+from fshelper.metrics import RequestMetrics
+from fshelper.singleflight import AsyncSingleFlight, SingleFlight
+
+BASE_URL = "https://example.freshservice.com"
+
+
+def _request(method, path):
+    request = PreparedRequest()
+    request.prepare(method=method, url=f"{BASE_URL}{path}")
+    return request
+
+
+def _slow_response(*_, **__):
+    time.sleep(0.05)
+    resp = Response()
+    resp.status_code = 200
+    resp._content = json.dumps({"asset_type": {"id": 1}}).encode()
+    resp._content_consumed = True
+    return resp
+
+
+def test_single_flight_shares_result_of_concurrent_calls():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(single_flight.do, "key", slow)
+        started.wait()
+        followers = [executor.submit(single_flight.do, "key", slow) for _ in range(4)]
+        while single_flight.coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        assert leader.result() == ("result", False)
+        assert [future.result() for future in followers] == [("result", True)] * 4
+    assert (single_flight.calls, single_flight.coalesced) == (1, 4)
+    assert single_flight.do("key", lambda: "again") == ("again", False)
+
+
+def test_single_flight_raises_error_to_every_caller():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait()
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(single_flight.do, "key", failing) for _ in range(2)]
+        while single_flight.calls + single_flight.coalesced < 2:
+            time.sleep(0.001)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result()
+
+
+@patch.object(HTTPAdapter, "send", side_effect=_slow_response)
+def test_adapter_coalesces_identical_gets(mock_send):
+    metrics = RequestMetrics()
+    adapter = FreshServiceAdapter(single_flight=SingleFlight(), metrics=metrics)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda _: adapter.send(_request("GET", "/api/v2/asset_types/1")), range(8)))
+    assert mock_send.call_count < 8
+    assert all(resp.json() == {"asset_type": {"id": 1}} for resp in responses)
+    assert len({id(resp) for resp in responses}) == 8
+    assert metrics.coalesced == 8 - mock_send.call_count
+    assert sum(metrics.snapshot()["requests"].values()) == mock_send.call_count
+
+
+def test_single_flight_follower_stops_waiting_after_timeout():
+    single_flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(single_flight.do, "key", slow)
+        started.wait(5)
+        with pytest.raises(InFlightTimeout):
+            single_flight.do("key", slow, timeout=0.01)
+        release.set()
+        assert leader.result() == ("result", False)
+
+
+@patch.object(HTTPAdapter, "send")
+def test_adapter_follower_does_not_wait_past_its_deadline(mock_send):
+    release = threading.Event()
+
+    def blocked_response(*args, **kwargs):
+        release.wait(5)
+        return _slow_response()
+
+    mock_send.side_effect = blocked_response
+    adapter = FreshServiceAdapter(single_flight=SingleFlight())
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        leader = executor.submit(adapter.send, _request("GET", "/api/v2/asset_types/1"), timeout=30)
+        while not mock_send.called:
+            time.sleep(0.001)
+        follower = _request("GET", "/api/v2/asset_types/1")
+        follower.deadline = Deadline(0.05)
+        with pytest.raises(DeadlineExceeded):
+            adapter.send(follower, timeout=30)
+        release.set()
+        assert leader.result().status_code == 200
+
+
+@patch.object(HTTPAdapter, "send", side_effect=_slow_response)
+def test_adapter_does_not_coalesce_writes(mock_send):
+    adapter = FreshServiceAdapter(single_flight=SingleFlight())
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda _: adapter.send(_request("PUT", "/api/v2/assets/1")), range(4)))
+    assert mock_send.call_count == 4
+
+
+def test_async_single_flight_shares_result():
+    single_flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        return await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert sorted(results) == [("result", False)] + [("result", True)] * 4
+    assert len(calls) == 1
+    assert single_flight.coalesced == 4
+
+
+def test_async_single_flight_leader_cancellation_does_not_cancel_followers():
+    single_flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight.do("key", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(single_flight.do("key", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower, leader.cancelled()
+
+    assert asyncio.run(run()) == (("result", True), True)
+
+
+def test_async_single_flight_follower_stops_waiting_after_timeout():
+    single_flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        leader = asyncio.ensure_future(single_flight.do("key", fetch))
+        await asyncio.sleep(0)
+        with pytest.raises(InFlightTimeout):
+            await single_flight.do("key", fetch, timeout=0.01)
+        return await leader
+
+    assert asyncio.run(run()) == ("result", False)
+
+
+def test_async_request_service_coalesces_identical_gets(fake_credential, fake_fs_domain):
+    httpx = pytest.importorskip("httpx")
+    from fshelper.aio import AsyncAssetTypeEndPoint, AsyncRequestService
+
+    requests_sent = []
+
+    async def handler(request):
+        requests_sent.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"asset_type": {"id": 1}})
+
+    async def run():
+        transport = httpx.MockTransport(handler)
+        async with AsyncRequestService(
+                fake_credential, fake_fs_domain, transport=transport, coalesce_requests=True
+        ) as request_service:
+            end_point = AsyncAssetTypeEndPoint(request_service)
+            results = await asyncio.gather(*(end_point.get(1) for _ in range(6)))
+            return results, request_service.metrics.snapshot()
+
+    results, snapshot = asyncio.run(run())
+    assert results == [{"asset_type": {"id": 1}}] * 6
+    assert len(requests_sent) == 1
+    assert snapshot["coalesced"] == 5
+    assert snapshot["requests"] == {"GET /api/v2/asset_types/:id 200": 1}
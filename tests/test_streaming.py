@@ -0,0 +1,49 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from fshelper.endpoints import GenericPluralEndpoint
+from fshelper.streaming import iter_json_array
+
+
+def _chunks(data: bytes, size: int):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_array_yields_items_across_chunks(chunk_size):
+    items = [{"id": i, "name": f"asset é {i}", "type_fields": {"a": [1, 2, {"b": None}]}} for i in range(20)]
+    body = json.dumps({"assets": items, "total": 20}).encode("utf-8")
+    assert list(iter_json_array(_chunks(body, chunk_size), "assets")) == items
+
+
+def test_iter_json_array_number_split_across_chunks():
+    assert list(iter_json_array([b'{"ids": [12', b'34, 5', b"6]}"], "ids")) == [1234, 56]
+
+
+def test_iter_json_array_missing_key_yields_nothing():
+    assert list(iter_json_array([b'{"asset": {"id": 1}}'], "assets")) == []
+
+
+def test_iter_json_array_unterminated_array_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'{"assets": [{"id": 1}, '], "assets"))
+
+
+def test_iter_items_stream_parses_pages_incrementally(fake_request_service):
+    plural_endpoint = GenericPluralEndpoint(fake_request_service)
+    plural_endpoint.plural_resource_key = "items"
+    per_page = plural_endpoint.items_per_page
+    pages = [list(range(per_page)), list(range(per_page, per_page + 3))]
+
+    def fake_send(url, stream=False, **_):
+        assert stream is True
+        page = pages.pop(0)
+        resp = MagicMock(links={"next": {}} if pages else {})
+        resp.iter_content.return_value = _chunks(json.dumps({"items": [{"id": i} for i in page]}).encode(), 10)
+        return resp
+
+    plural_endpoint._send = fake_send
+    items = list(plural_endpoint.iter_items(stream=True, fields=("id",)))
+    assert [item["id"] for item in items] == list(range(per_page + 3))
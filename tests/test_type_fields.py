@@ -0,0 +1,88 @@
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from fshelper.models import AssetUpdate, TypeField, create_type_field_model
+from fshelper.type_fields import TypeFieldModels
+from fshelper.v2 import AssetTypeEndPoint
+
+FIELDS = [
+    {"name": "serial_5", "data_type": "text", "mandatory": True},
+    {"name": "cost_5", "data_type": "decimal"},
+    {"name": "purchased_5", "data_type": "date"},
+]
+
+
+@pytest.fixture
+def fake_get_fields():
+    with patch.object(AssetTypeEndPoint, "get_fields", return_value=FIELDS) as mock:
+        yield mock
+
+
+def test_get_fields_flattens_sections(fake_request_service):
+    end_point = AssetTypeEndPoint(fake_request_service)
+    response = {"asset_type_fields": [{"field_header": "General", "fields": FIELDS[:1]},
+                                      {"field_header": "Cost", "fields": FIELDS[1:]}]}
+    with patch.object(AssetTypeEndPoint, "send_request", return_value=response) as send_request:
+        assert end_point.get_fields(5) == FIELDS
+    assert send_request.call_args.args[0].endswith("/api/v2/asset_types/5/fields")
+
+
+def test_model_is_compiled_once_per_asset_type(fake_request_service, fake_get_fields):
+    models = TypeFieldModels(fake_request_service)
+    model = models.model(5)
+    assert issubclass(model, TypeField)
+    assert models.model(5) is model
+    assert fake_get_fields.call_count == 1
+    assert (models.hits, models.misses) == (1, 1)
+
+
+def test_model_cache_is_bounded(fake_request_service, fake_get_fields):
+    models = TypeFieldModels(fake_request_service, max_size=2)
+    for asset_type_id in (1, 2, 1, 3):
+        models.model(asset_type_id)
+    assert len(models) == 2
+    assert 2 not in models and 1 in models and 3 in models
+
+
+def test_validate_types_the_type_fields(fake_request_service, fake_get_fields):
+    models = TypeFieldModels(fake_request_service)
+    asset = models.validate(
+        {"name": "laptop", "asset_type_id": 5, "display_id": 3,
+         "type_fields": {"serial_5": "A1", "cost_5": "999.5", "purchased_5": "2023-01-02T00:00:00Z"}},
+        AssetUpdate,
+    )
+    assert isinstance(asset, AssetUpdate)
+    assert asset.type_fields.cost_5 == 999.5
+    assert isinstance(asset.type_fields.purchased_5, datetime)
+
+
+def test_update_may_set_only_some_type_fields(fake_request_service, fake_get_fields):
+    models = TypeFieldModels(fake_request_service)
+    asset = models.validate({"name": "laptop", "asset_type_id": 5, "type_fields": {"cost_5": "10"}}, AssetUpdate)
+    assert asset.type_fields.cost_5 == 10.0
+    assert asset.dict(exclude_unset=True)["type_fields"] == {"cost_5": 10.0}
+    with pytest.raises(ValidationError):
+        models.validate({"name": "laptop", "asset_type_id": 5, "type_fields": {"cost_5": "10"}})
+    assert fake_get_fields.call_count == 1
+
+
+def test_date_fields_keep_dates_without_time():
+    model = create_type_field_model(5, FIELDS[2:])
+    assert model(purchased_5="2023-01-02").purchased_5 == date(2023, 1, 2)
+    assert model(purchased_5="2023-01-02T10:00:00Z").purchased_5.hour == 10
+
+
+def test_validate_many_collects_errors(fake_request_service, fake_get_fields):
+    models = TypeFieldModels(fake_request_service)
+    valid, errors = models.validate_many([
+        {"name": "laptop 1", "asset_type_id": 5, "type_fields": {"serial_5": "A1"}},
+        {"name": "laptop 2", "asset_type_id": 5, "type_fields": {"cost_5": "cheap"}},
+        {"name": "laptop 3", "asset_type_id": 5},
+    ])
+    assert [asset.name for asset in valid] == ["laptop 1", "laptop 3"]
+    assert [index for index, _ in errors] == [1]
+    assert isinstance(errors[0][1], ValidationError)
+    assert fake_get_fields.call_count == 1
@@ -0,0 +1,70 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from fshelper.writequeue import UpdateQueue
+from fshelper.v2 import AssetsEndPoint
+
+
+@pytest.fixture
+def end_point(fake_request_service):
+    end_point = AssetsEndPoint(fake_request_service)
+    end_point.sent = []
+    lock = threading.Lock()
+
+    def fake_send_request(url, method="GET", data=None, **_):
+        with lock:
+            end_point.sent.append((url.rsplit("/", 1)[-1], data))
+        return {"asset": dict(data)}
+
+    end_point.send_request = MagicMock(side_effect=fake_send_request)
+    return end_point
+
+
+def test_updates_to_the_same_asset_are_merged_last_writer_wins(end_point):
+    with UpdateQueue(end_point, window=60) as update_queue:
+        update_queue.put({"display_id": 1, "user_id": 5, "type_fields": {"state_1": "In Use", "cost_1": 10}})
+        update_queue.put({"location_id": 2, "type_fields": {"state_1": "In Stock"}}, display_id=1)
+        update_queue.put({"display_id": 1, "user_id": 6})
+        update_queue.put({"display_id": 2, "user_id": 7})
+        assert end_point.sent == []
+    assert sorted(end_point.sent) == [
+        ("1", {"user_id": 6, "location_id": 2, "type_fields": {"state_1": "In Stock", "cost_1": 10}}),
+        ("2", {"user_id": 7}),
+    ]
+    assert update_queue.stats() == {"writes": 4, "merged": 2, "sent": 2, "failed": 0, "pending": 0}
+
+
+def test_queue_flushes_when_max_pending_is_reached(end_point):
+    with UpdateQueue(end_point, window=60, max_pending=2) as update_queue:
+        update_queue.put({"display_id": 1, "name": "a"})
+        update_queue.put({"display_id": 2, "name": "b"})
+        assert len(end_point.sent) == 2
+        assert len(update_queue) == 0
+
+
+def test_queue_flushes_updates_at_the_end_of_their_window(end_point):
+    with UpdateQueue(end_point, window=0.05) as update_queue:
+        update_queue.put({"display_id": 1, "name": "a"})
+        deadline = time.monotonic() + 2
+        while not end_point.sent and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert end_point.sent == [("1", {"name": "a"})]
+
+
+def test_failed_updates_are_kept(end_point):
+    end_point.send_request.side_effect = RuntimeError("boom")
+    update_queue = UpdateQueue(end_point, window=60)
+    update_queue.put({"display_id": 1, "name": "a"})
+    update_queue.close()
+    assert len(update_queue.failures) == 1
+    with pytest.raises(RuntimeError):
+        update_queue.put({"display_id": 1, "name": "b"})
+
+
+def test_put_without_display_id_raises(end_point):
+    with UpdateQueue(end_point) as update_queue:
+        with pytest.raises(ValueError):
+            update_queue.put({"name": "a"})